@@ -30,7 +30,7 @@ Q=@
 
 GEN_VNFD_PKG := $(TOOLS_DIR)/gen_vnfd_pkg.sh
 GEN_NSD_PKG  := $(TOOLS_DIR)/gen_nsd_pkg.sh
-GEN_PKG      := $(TOOLS_DIR)/generate_descriptor_pkg.sh
+GEN_PKG      := $(TOOLS_DIR)/build_descriptor_pkg.py
 TEST_PKG     := $(TOOLS_DIR)/validate_descriptor.py
 BUILD_VNFD   := $(shell readlink -f .|sed -e 's/\/.*descriptor-packages//' | grep vnfd)
 
@@ -39,12 +39,12 @@ DEP_FILES = $(wildcard src/*)
 ifdef BUILD_VNFD
 $(BUILD_DIR)/$(PKG_BASE_NAME): src
 	$(Q)mkdir -p $@
-	$(Q)cp -rf $</. $@
+	$(Q)cp -rpf $</. $@
 	$(Q)$(GEN_VNFD_PKG) $< $@
 else
 $(BUILD_DIR)/$(PKG_BASE_NAME): src
 	$(Q)mkdir -p $@
-	$(Q)cp -rf $</. $@
+	$(Q)cp -rpf $</. $@
 	$(Q)$(GEN_NSD_PKG) $< $@
 endif
 
@@ -52,7 +52,7 @@ ifdef VNFD_CHARM
 $(BUILD_DIR)/$(PKG_NAME): $(DEP_FILES) $(CHARM_BUILD_DIR)/$(VNFD_CHARM)
 	$(Q)echo "building $(PKG_BASE_NAME) with charm $(VNFD_CHARM)"
 	$(Q)$(MAKE) --no-print-directory $(BUILD_DIR)/$(PKG_BASE_NAME)
-	$(Q)cp -rf $(CHARM_BUILD_DIR)/$(VNFD_CHARM) $(BUILD_DIR)/$(PKG_BASE_NAME)/charms
+	$(Q)cp -rpf $(CHARM_BUILD_DIR)/$(VNFD_CHARM) $(BUILD_DIR)/$(PKG_BASE_NAME)/charms
 	$(Q)$(GEN_PKG) --no-remove-files -d $(BUILD_DIR) $(BUILD_DIR)/$(PKG_BASE_NAME)
 else
 $(BUILD_DIR)/$(PKG_NAME): $(DEP_FILES)
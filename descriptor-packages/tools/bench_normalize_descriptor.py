@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+##
+from __future__ import print_function
+import copy
+import getopt
+import sys
+import timeit
+from normalize_descriptor import remove_prefix
+
+"""
+Micro-benchmark of normalize_descriptor.remove_prefix against the former recursive implementation, using a
+generated prefixed VNFD
+"""
+
+
+def usage():
+    print("Usage: {} [options]".format(sys.argv[0]))
+    print(" Times the prefix removal of a generated vnfd with many vdus and interfaces")
+    print(" OPTIONS:")
+    print("      -h|--help: shows this help")
+    print("      --vdus N: number of vdus of the generated vnfd. Default 2000")
+    print("      --interfaces N: number of interfaces per vdu. Default 8")
+    print("      --repeat N: number of timed runs, the best one is reported. Default 5")
+    return
+
+
+def recursive_remove_prefix(desc, prefix):
+    """
+    Former recursive implementation, kept as baseline
+    """
+    prefix_len = len(prefix)
+    if isinstance(desc, dict):
+        prefixed_list = []
+        for k, v in desc.items():
+            if isinstance(v, (list, tuple, dict)):
+                recursive_remove_prefix(v, prefix)
+            if isinstance(k, str) and k.startswith(prefix) and k != prefix:
+                prefixed_list.append(k)
+        for k in prefixed_list:
+            desc[k[prefix_len:]] = desc.pop(k)
+    elif isinstance(desc, (list, tuple)):
+        for i in desc:
+            if isinstance(desc, (list, tuple, dict)):
+                recursive_remove_prefix(i, prefix)
+
+
+def make_vnfd(vdus, interfaces):
+    """
+    Generates a vnfd catalog with "vnfd:" and "rw-vnfd:" prefixed keys
+    :param vdus: number of vdus
+    :param interfaces: number of interfaces per vdu
+    :return: vnfd catalog content
+    """
+    vdu_list = []
+    for vdu_index in range(vdus):
+        vdu_list.append({
+            "vnfd:id": "vdu{}".format(vdu_index),
+            "vnfd:name": "vdu{}".format(vdu_index),
+            "vnfd:count": 1,
+            "vnfd:image": "ubuntu",
+            "vnfd:vm-flavor": {"vnfd:vcpu-count": 1, "vnfd:memory-mb": 1024, "vnfd:storage-gb": 10},
+            "rw-vnfd:meta": "generated",
+            "vnfd:interface": [{
+                "vnfd:name": "eth{}".format(i),
+                "vnfd:type": "EXTERNAL",
+                "vnfd:virtual-interface": {"vnfd:type": "PARAVIRT"},
+                "vnfd:external-connection-point-ref": "vdu{}-cp{}".format(vdu_index, i),
+                "rw-vnfd:floating-ip-needed": False,
+            } for i in range(interfaces)],
+        })
+    return {"vnfd:vnfd-catalog": {"vnfd:vnfd": [{
+        "vnfd:id": "bench_vnfd",
+        "vnfd:name": "bench_vnfd",
+        "vnfd:mgmt-interface": {"vnfd:cp": "vdu0-cp0"},
+        "vnfd:vdu": vdu_list,
+    }]}}
+
+
+def recursive_remove_prefixes(desc, prefixes):
+    """
+    Baseline for several prefixes: the recursive implementation needs a full walk per prefix
+    """
+    for prefix in prefixes:
+        recursive_remove_prefix(desc, prefix)
+
+
+def bench(function, desc, prefix, repeat):
+    copies = [copy.deepcopy(desc) for _ in range(repeat)]
+    return min(timeit.repeat(lambda: function(copies.pop(), prefix), number=1, repeat=repeat))
+
+
+def make_deep(depth):
+    desc = {}
+    node = desc
+    for _ in range(depth):
+        node["vnfd:level"] = {}
+        node = node["vnfd:level"]
+    return desc
+
+
+if __name__ == "__main__":
+    vdus = 2000
+    interfaces = 8
+    repeat = 5
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "h", ["help", "vdus=", "interfaces=", "repeat="])
+        for o, a in opts:
+            if o in ("-h", "--help"):
+                usage()
+                sys.exit()
+            elif o == "--vdus":
+                vdus = int(a)
+            elif o == "--interfaces":
+                interfaces = int(a)
+            elif o == "--repeat":
+                repeat = int(a)
+    except (getopt.GetoptError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        exit(1)
+
+    desc = make_vnfd(vdus, interfaces)
+    prefixes = ("vnfd:", "rw-vnfd:")
+    for prefix, baseline in (("vnfd:", recursive_remove_prefix), (prefixes, recursive_remove_prefixes)):
+        expected = copy.deepcopy(desc)
+        baseline(expected, prefix)
+        result = copy.deepcopy(desc)
+        remove_prefix(result, prefix)
+        if result != expected:
+            print("Error: results differ from the recursive implementation", file=sys.stderr)
+            exit(1)
+
+    print("vnfd with {} vdus, {} interfaces per vdu. Best of {} runs".format(vdus, interfaces, repeat))
+    for prefix, baseline in (("vnfd:", recursive_remove_prefix), (prefixes, recursive_remove_prefixes)):
+        recursive_time = bench(baseline, desc, prefix, repeat)
+        iterative_time = bench(remove_prefix, desc, prefix, repeat)
+        print("  prefixes {}".format(prefix))
+        print("    recursive: {:.4f} s".format(recursive_time))
+        print("    iterative: {:.4f} s ({:.2f}x)".format(iterative_time, recursive_time / iterative_time))
+
+    depth = sys.getrecursionlimit() * 2
+    try:
+        recursive_remove_prefix(make_deep(depth), "vnfd:")
+        print("  depth {}: recursive ok".format(depth))
+    except RecursionError:
+        print("  depth {}: recursive fails with RecursionError".format(depth))
+    remove_prefix(make_deep(depth), "vnfd:")
+    print("  depth {}: iterative ok".format(depth))
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+##
+from __future__ import print_function
+import collections
+import getopt
+import hashlib
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import tarfile
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from validate_descriptor import DEFAULT_CACHE_FILE, ValidationCache, validate_file_cached
+
+try:
+    import zstandard
+except ImportError:     # zstd compression is optional
+    zstandard = None
+
+"""
+Builds OSM descriptor packages: checksums.txt and a reproducible tar.gz (or tar.zst) of the package folder.
+Same folder rules as generate_descriptor_pkg.sh, but files are hashed in parallel, checksums of unchanged files are
+reused from the previous build and compression uses all the cpus
+"""
+__version__ = "0.0.1"
+
+# Supported folders for VNFD. From https://osm.etsi.org/wikipub/index.php/Release_0_Data_Model_Details
+VNFD_FOLDERS = ("images", "scripts", "icons", "charms", "cloud_init")
+# Supported folders for NSD
+NSD_FOLDERS = ("scripts", "charms", "icons", "ns_config", "vnf_config")
+# Other files allowed in the package base folder. Files containing any of ALLOWED_FILES_WILDCARDS are allowed too
+ALLOWED_FILES = ("README",)
+ALLOWED_FILES_WILDCARDS = ("README",)
+
+DESC_TYPES = ("vnfd", "nsd")
+DESC_EXTN = ("yml", "yaml", "json", "xml")
+CHKSUM = "checksums.txt"
+
+# Checksums of the previous build, by package, stored next to the archive
+CHKSUM_CACHE = ".{}.checksums.json"
+# Read size when hashing archive members, that cannot be memory mapped
+HASH_BUFFER_SIZE = 1 << 20
+# Uncompressed size of each block compressed in parallel. Output only depends on it and on the level, not on the
+# number of jobs
+COMPRESS_CHUNK_SIZE = 1 << 20
+COMPRESSIONS = {"gzip": ".tar.gz", "zstd": ".tar.zst"}
+DEFAULT_LEVEL = {"gzip": 6, "zstd": 3}
+
+
+class ArgumentParserError(Exception):
+    pass
+
+
+class PackageError(Exception):
+    pass
+
+
+def usage():
+    print("Usage: {} [options] [BASE_DIR] PACKAGE".format(sys.argv[0]))
+    print("       {} [options] --verify PACKAGE|ARCHIVE ...".format(sys.argv[0]))
+    print(" Generates checksums.txt and the archive of a vnfd or nsd descriptor package folder")
+    print(" BASE_DIR: folder where PACKAGE is. By default the folder of PACKAGE")
+    print(" PACKAGE: package folder name (full path if BASE_DIR is not specified)")
+    print(" OPTIONS:")
+    print("      -v|--version: prints current version")
+    print("      -h|--help: shows this help")
+    print("      --verbose: prints progress details")
+    print("      -t|--package-type vnfd|nsd: descriptor package type. By default it is guessed")
+    print("      -d|--destination-dir DIR: folder where the archive is created. By default BASE_DIR")
+    print("      -N|--no-remove-files: keeps the package folder after creating the archive")
+    print("      -n|--dry-run: only checks and validates the package folder")
+    print("      -j|--jobs N: number of threads used to hash and compress. By default the number of cpus")
+    print("      --compression gzip|zstd: archive compression. By default gzip")
+    print("      --level N: compression level. By default {}".format(
+        ", ".join("{} for {}".format(v, k) for k, v in DEFAULT_LEVEL.items())))
+    print("      --no-checksum-cache: hashes all files, even those unchanged since the previous build")
+    print("      --no-cache: validates the descriptor even if it was already validated with the same content")
+    print("      --verify: checks the files of built package folders or archives (.tar.gz, .tar.zst) against their")
+    print("                checksums.txt. Archives are read as a stream, without extracting them")
+    print(" SOURCE_DATE_EPOCH environment variable, if set, is used as the time of the archived files. Otherwise 0")
+    return
+
+
+def _descriptor_re(desc_type):
+    # (type|*_type|*_type_*).(yml|yaml|json|xml)
+    return re.compile(r"^(.*_)?{}(_.*)?\.({})$".format(desc_type, "|".join(DESC_EXTN)))
+
+
+def find_descriptor(package_dir, desc_type=None):
+    """
+    Looks for the descriptor file of a package, at the base folder or at the vnfd|nsd subfolder
+    :param package_dir: package folder
+    :param desc_type: "vnfd" or "nsd". If None, the type is guessed from the descriptor found
+    :return: tuple with descriptor type, descriptor path relative to package_dir and descriptor subfolder (or None)
+    """
+    base_files = sorted(f for f in os.listdir(package_dir) if os.path.isfile(os.path.join(package_dir, f)))
+    for ty in (desc_type,) if desc_type else DESC_TYPES:
+        desc_re = _descriptor_re(ty)
+        descriptors = [f for f in base_files if desc_re.match(f)]
+        desc_sub_dir = None
+        if not descriptors and os.path.isdir(os.path.join(package_dir, ty)):
+            any_re = _descriptor_re(".*")
+            descriptors = sorted(os.path.join(ty, f) for f in os.listdir(os.path.join(package_dir, ty))
+                                 if any_re.match(f) and os.path.isfile(os.path.join(package_dir, ty, f)))
+            desc_sub_dir = ty
+        if len(descriptors) > 1:
+            raise PackageError("Found multiple files of type {} in {}: {}".format(ty, package_dir,
+                                                                                  " ".join(descriptors)))
+        if descriptors:
+            return ty, descriptors[0], desc_sub_dir
+    if desc_type:
+        raise PackageError("Did not find descriptor file of type {} in {}".format(desc_type, package_dir))
+    raise PackageError("Unable to determine the descriptor type")
+
+
+def list_package_files(package_dir, desc_type, descriptor, desc_sub_dir=None, warn=None):
+    """
+    Obtains the files of a package that go to checksums.txt: the descriptor and all files of the supported folders
+    :param package_dir: package folder
+    :param desc_type: "vnfd" or "nsd"
+    :param descriptor: descriptor path, relative to package_dir
+    :param desc_sub_dir: folder where the descriptor is, if not at the base folder
+    :param warn: function called with the text of each unsupported file or folder found
+    :return: list of paths relative to package_dir, descriptor first and then sorted
+    """
+    folders = NSD_FOLDERS if desc_type == "nsd" else VNFD_FOLDERS
+    files = [descriptor]
+    for name in sorted(os.listdir(package_dir)):
+        path = os.path.join(package_dir, name)
+        if os.path.isdir(path):
+            if name in folders:
+                for root, dirs, walk_files in os.walk(path):
+                    dirs.sort()
+                    for file_name in sorted(walk_files):
+                        files.append(os.path.relpath(os.path.join(root, file_name), package_dir))
+            elif name != desc_sub_dir and warn:
+                warn("{} is not part of standard folders for descriptor type {} in {}".format(
+                    name, desc_type, os.path.basename(package_dir)))
+        elif name not in (descriptor, CHKSUM) and name not in ALLOWED_FILES and \
+                not any(w in name for w in ALLOWED_FILES_WILDCARDS) and warn:
+            warn("Unsupported file {} found".format(name))
+    return files
+
+
+def md5_file(path):
+    """
+    :param path: file to hash
+    :return: md5 hex digest. The file is memory mapped and hashed in a single call, that releases the GIL and does
+        not copy the content into python buffers
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return hashlib.md5().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            if hasattr(m, "madvise"):
+                m.madvise(mmap.MADV_SEQUENTIAL)
+            return hashlib.md5(m).hexdigest()
+
+
+def compute_checksums(package_dir, files, jobs=None, previous=None):
+    """
+    Computes the md5 of the package files in a pool of threads. hashlib releases the GIL, so hashing is parallel
+    :param package_dir: package folder
+    :param files: paths relative to package_dir
+    :param jobs: number of threads. By default the number of cpus
+    :param previous: checksums of a previous build, as returned by this function. Files with the same size and
+        modification time are not read again
+    :return: dictionary with path: [size, mtime_ns, md5], and the number of checksums reused
+    """
+    previous = previous or {}
+    checksums = {}
+    pending = {}
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        for name in files:
+            st = os.stat(os.path.join(package_dir, name))
+            old = previous.get(name)
+            if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                checksums[name] = old
+            else:
+                checksums[name] = [st.st_size, st.st_mtime_ns, None]
+                pending[name] = executor.submit(md5_file, os.path.join(package_dir, name))
+        for name, future in pending.items():
+            checksums[name][2] = future.result()
+    return checksums, len(files) - len(pending)
+
+
+def load_checksum_cache(cache_file):
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def save_checksum_cache(cache_file, checksums):
+    try:
+        with open(cache_file, "w") as f:
+            json.dump(checksums, f)
+    except IOError as e:
+        print("WARN: Cannot write checksum cache '{}': {}".format(cache_file, e), file=sys.stderr)
+
+
+def _deflate(chunk, dictionary, level, last):
+    # raw deflate block. The previous chunk tail is used as dictionary, as the decompressor has it in its window
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(chunk) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class ParallelGzipWriter(object):
+    """
+    File like object that writes a single member gzip stream, compressing blocks of COMPRESS_CHUNK_SIZE in a pool of
+    threads, as pigz does. zlib releases the GIL, so all cpus are used. The header has no name nor time, so the
+    output only depends on the content and the compression level
+    """
+
+    def __init__(self, output, level=DEFAULT_LEVEL["gzip"], jobs=None, chunk_size=COMPRESS_CHUNK_SIZE):
+        self.output = output
+        self.level = level
+        self.chunk_size = chunk_size
+        jobs = jobs or os.cpu_count()
+        self._executor = ThreadPoolExecutor(max_workers=jobs)
+        self._max_pending = 2 * jobs
+        self._pending = collections.deque()
+        self._buffer = bytearray()
+        self._dictionary = None
+        self._crc = 0
+        self._size = 0
+        # magic, deflate, no flags, mtime 0, no extra flags, unknown OS
+        output.write(b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff")
+
+    def _submit(self, chunk, last):
+        self._crc = zlib.crc32(chunk, self._crc)
+        self._size += len(chunk)
+        self._pending.append(self._executor.submit(_deflate, chunk, self._dictionary, self.level, last))
+        self._dictionary = chunk[-32768:]
+        while len(self._pending) > self._max_pending:
+            self.output.write(self._pending.popleft().result())
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            chunk = bytes(self._buffer[:self.chunk_size])
+            del self._buffer[:self.chunk_size]
+            self._submit(chunk, False)
+        return len(data)
+
+    def close(self):
+        self._submit(bytes(self._buffer), True)
+        self._buffer = bytearray()
+        while self._pending:
+            self.output.write(self._pending.popleft().result())
+        self.output.write(struct.pack("<II", self._crc & 0xffffffff, self._size & 0xffffffff))
+        self._executor.shutdown()
+
+
+def _compressed_writer(output, compression, level, jobs):
+    if compression == "zstd":
+        if not zstandard:
+            raise PackageError("zstd compression needs the python 'zstandard' package")
+        # multithreaded zstd output does not depend on the number of workers, as far as there is at least one
+        return zstandard.ZstdCompressor(level=level, threads=jobs or os.cpu_count()).stream_writer(output,
+                                                                                                  closefd=False)
+    return ParallelGzipWriter(output, level, jobs)
+
+
+def _reproducible(tarinfo, mtime):
+    tarinfo.mtime = mtime
+    tarinfo.uid = tarinfo.gid = 0
+    tarinfo.uname = tarinfo.gname = ""
+    tarinfo.mode = 0o755 if tarinfo.isdir() or tarinfo.mode & 0o111 else 0o644
+    return tarinfo
+
+
+def write_archive(package_dir, archive_file, compression="gzip", level=None, jobs=None, mtime=0):
+    """
+    Writes a reproducible archive of the whole package folder: entries are sorted and have fixed owner, time and
+    permissions, so the same content always gives the same archive bytes. It is written to a temporary file that
+    replaces archive_file at the end
+    :param package_dir: package folder. It is archived with its name as top folder
+    :param archive_file: archive to write
+    :param compression: "gzip" or "zstd"
+    :param level: compression level. By default DEFAULT_LEVEL of the compression
+    :param jobs: number of compression threads. By default the number of cpus
+    :param mtime: time of all the archived files
+    :return: None
+    """
+    if level is None:
+        level = DEFAULT_LEVEL[compression]
+    package_dir = os.path.abspath(package_dir)
+    name = os.path.basename(package_dir)
+    folder, archive_name = os.path.split(os.path.abspath(archive_file))
+    fd, tmp_file_name = tempfile.mkstemp(prefix="." + archive_name + ".", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            writer = _compressed_writer(f, compression, level, jobs)
+            with tarfile.open(fileobj=writer, mode="w|", format=tarfile.GNU_FORMAT) as tar:
+                for root, dirs, files in os.walk(package_dir):
+                    dirs.sort()
+                    arc_root = os.path.join(name, os.path.relpath(root, package_dir)) if root != package_dir \
+                        else name
+                    tar.addfile(_reproducible(tar.gettarinfo(root, arc_root), mtime))
+                    # symlinks to folders are archived as links, not walked
+                    for entry in sorted(files + [d for d in dirs if os.path.islink(os.path.join(root, d))]):
+                        path = os.path.join(root, entry)
+                        tarinfo = _reproducible(tar.gettarinfo(path, os.path.join(arc_root, entry)), mtime)
+                        if tarinfo.isreg():
+                            with open(path, "rb") as entry_file:
+                                tar.addfile(tarinfo, entry_file)
+                        else:
+                            tar.addfile(tarinfo)
+            writer.close()
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_file_name, 0o644)
+        os.replace(tmp_file_name, archive_file)
+    except BaseException:
+        os.remove(tmp_file_name)
+        raise
+
+
+def build_package(package_dir, dest_dir=None, desc_type=None, dry_run=False, remove_files=True, jobs=None,
+                  compression="gzip", level=None, checksum_cache=True, validation_cache=None, verbose=False):
+    """
+    Checks, validates and archives a descriptor package folder, as generate_descriptor_pkg.sh does
+    :param package_dir: package folder
+    :param dest_dir: folder where the archive is created. By default the parent of package_dir
+    :param desc_type: "vnfd" or "nsd". By default it is guessed
+    :param dry_run: only checks and validates, nothing is written
+    :param remove_files: removes package_dir once archived
+    :param jobs: number of hashing and compression threads. By default the number of cpus
+    :param compression: "gzip" or "zstd"
+    :param level: compression level
+    :param checksum_cache: reuse the checksums of the previous build for unchanged files
+    :param validation_cache: ValidationCache used to skip the validation of already validated descriptors
+    :param verbose: prints progress details
+    :return: archive file path, None if dry_run
+    """
+    package_dir = os.path.abspath(package_dir)
+    if not os.path.isdir(package_dir):
+        raise PackageError("Package folder {} not found!".format(package_dir))
+    dest_dir = os.path.abspath(dest_dir or os.path.dirname(package_dir))
+    name = os.path.basename(package_dir)
+
+    def warn(text):
+        print("WARN: " + text)
+
+    desc_type, descriptor, desc_sub_dir = find_descriptor(package_dir, desc_type)
+    if verbose:
+        print("INFO: Found {} descriptor package: {}".format(desc_type, descriptor))
+    files = list_package_files(package_dir, desc_type, descriptor, desc_sub_dir, warn)
+
+    _, error = validate_file_cached(os.path.join(package_dir, descriptor), cache=validation_cache)
+    if error:
+        raise PackageError("validating descriptor for {}: {}".format(name, error))
+    if dry_run:
+        return None
+
+    start = time.time()
+    cache_file = os.path.join(dest_dir, CHKSUM_CACHE.format(name))
+    previous = load_checksum_cache(cache_file) if checksum_cache else None
+    checksums, reused = compute_checksums(package_dir, files, jobs, previous)
+    with open(os.path.join(package_dir, CHKSUM), "w") as f:
+        for file_name in files:
+            f.write("{}  {}\n".format(checksums[file_name][2], file_name))
+    if verbose:
+        print("INFO: {} files hashed in {:.2f}s, {} checksums reused".format(len(files) - reused,
+                                                                          time.time() - start, reused))
+
+    start = time.time()
+    os.makedirs(dest_dir, exist_ok=True)
+    archive_file = os.path.join(dest_dir, name + COMPRESSIONS[compression])
+    write_archive(package_dir, archive_file, compression, level, jobs, int(os.environ.get("SOURCE_DATE_EPOCH", 0)))
+    if verbose:
+        print("INFO: Created {} in {:.2f}s".format(archive_file, time.time() - start))
+    if remove_files:
+        shutil.rmtree(package_dir)
+    elif checksum_cache:
+        save_checksum_cache(cache_file, checksums)
+    return archive_file
+
+
+def read_checksums(lines):
+    """
+    Parses checksums.txt content, in md5sum format
+    :param lines: iterable of text lines
+    :return: dictionary with path: md5, in the file order
+    """
+    checksums = collections.OrderedDict()
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        md5, _, name = line.partition(" ")
+        name = name.lstrip(" ").lstrip("*")
+        if name.startswith("./"):
+            name = name[2:]
+        checksums[name] = md5.lower()
+    return checksums
+
+
+def _compare(checksums, found):
+    errors = []
+    for name, md5 in checksums.items():
+        if name not in found:
+            errors.append("{}: missing".format(name))
+        elif found[name] != md5:
+            errors.append("{}: checksum does not match".format(name))
+    return errors
+
+
+def verify_folder(package_dir, jobs=None):
+    """
+    Checks the files of a package folder against its checksums.txt, hashing them in parallel
+    :param package_dir: package folder
+    :param jobs: number of threads. By default the number of cpus
+    :return: tuple with list of error texts, number of files and bytes hashed
+    """
+    with open(os.path.join(package_dir, CHKSUM)) as f:
+        checksums = read_checksums(f)
+    found = {}
+    size = 0
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = {}
+        for name in checksums:
+            path = os.path.join(package_dir, name)
+            if os.path.isfile(path):
+                size += os.path.getsize(path)
+                futures[name] = executor.submit(md5_file, path)
+        for name, future in futures.items():
+            found[name] = future.result()
+    return _compare(checksums, found), len(found), size
+
+
+def _open_archive_stream(archive_file, f):
+    if archive_file.endswith(".zst"):
+        if not zstandard:
+            raise PackageError("zstd archives need the python 'zstandard' package")
+        return tarfile.open(fileobj=zstandard.ZstdDecompressor().stream_reader(f), mode="r|")
+    return tarfile.open(fileobj=f, mode="r|*")
+
+
+def verify_archive(archive_file):
+    """
+    Checks the files of a package archive against its checksums.txt. The archive is read once, as a stream, hashing
+    each member as it is decompressed, so nothing is written to disk
+    :param archive_file: .tar.gz or .tar.zst package
+    :return: tuple with list of error texts, number of files and bytes hashed
+    """
+    found = {}
+    checksums = None
+    size = 0
+    buffer = bytearray(HASH_BUFFER_SIZE)
+    with open(archive_file, "rb") as f, _open_archive_stream(archive_file, f) as tar:
+        for member in tar:
+            if not member.isreg():
+                continue
+            # remove the package top folder
+            name = member.name.partition("/")[2]
+            member_file = tar.extractfile(member)
+            if name == CHKSUM:
+                checksums = read_checksums(member_file.read().decode("utf-8").splitlines())
+                continue
+            md5 = hashlib.md5()
+            while True:
+                read = member_file.readinto(buffer)
+                if not read:
+                    break
+                md5.update(memoryview(buffer)[:read])
+            found[name] = md5.hexdigest()
+            size += member.size
+    if checksums is None:
+        return ["{}: missing".format(CHKSUM)], len(found), size
+    return _compare(checksums, found), len(found), size
+
+
+def verify(paths, jobs=None, verbose=False):
+    """
+    Verifies package folders or archives, printing the errors found and the throughput
+    :param paths: list of package folders or archives
+    :param jobs: number of hashing threads for folders. By default the number of cpus
+    :param verbose: prints also a line for the packages that are right
+    :return: number of packages with errors
+    """
+    failed = 0
+    for path in paths:
+        start = time.time()
+        if os.path.isdir(path):
+            errors, files, size = verify_folder(path, jobs)
+        else:
+            errors, files, size = verify_archive(path)
+        elapsed = time.time() - start
+        for error in errors:
+            print("FAILED: {}: {}".format(path, error))
+        if errors:
+            failed += 1
+        elif verbose:
+            print("INFO: {} OK".format(path))
+        print("INFO: {}: {} files, {:.1f} MB hashed in {:.2f}s ({:.1f} MB/s)".format(
+            path, files, size / 1e6, elapsed, size / 1e6 / elapsed if elapsed else 0.0))
+    return failed
+
+
+if __name__ == "__main__":
+    desc_type = None
+    dest_dir = None
+    remove_files = True
+    dry_run = False
+    verbose = False
+    jobs = None
+    compression = "gzip"
+    level = None
+    checksum_cache = True
+    use_cache = True
+    cache = None
+    verify_mode = False
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hvt:d:Nnj:", ["help", "version", "verbose", "package-type=",
+                                                                "destination-dir=", "no-remove-files", "dry-run",
+                                                                "jobs=", "compression=", "level=",
+                                                                "no-checksum-cache", "no-cache", "verify"])
+        for o, a in opts:
+            if o in ("-v", "--version"):
+                print("build descriptor package version " + __version__)
+                sys.exit()
+            elif o in ("-h", "--help"):
+                usage()
+                sys.exit()
+            elif o == "--verbose":
+                verbose = True
+            elif o in ("-t", "--package-type"):
+                if a not in DESC_TYPES:
+                    raise ArgumentParserError("Unknown descriptor type {}!".format(a))
+                desc_type = a
+            elif o in ("-d", "--destination-dir"):
+                dest_dir = a
+            elif o in ("-N", "--no-remove-files"):
+                remove_files = False
+            elif o in ("-n", "--dry-run"):
+                dry_run = True
+            elif o in ("-j", "--jobs"):
+                jobs = int(a)
+                if jobs < 1:
+                    raise ArgumentParserError("--jobs must be a positive number")
+            elif o == "--compression":
+                if a not in COMPRESSIONS:
+                    raise ArgumentParserError("--compression must be one of {}".format(", ".join(COMPRESSIONS)))
+                compression = a
+            elif o == "--level":
+                level = int(a)
+            elif o == "--no-checksum-cache":
+                checksum_cache = False
+            elif o == "--no-cache":
+                use_cache = False
+            elif o == "--verify":
+                verify_mode = True
+            else:
+                assert False, "Unhandled option"
+        if verify_mode:
+            if not args:
+                raise ArgumentParserError("Need to specify the package to verify. Type --help for more info")
+            exit(1 if verify(args, jobs, verbose) else 0)
+        if len(args) == 1:
+            package_dir = args[0]
+        elif len(args) == 2:
+            package_dir = os.path.join(args[0], os.path.basename(args[1]))
+        else:
+            raise ArgumentParserError("Need to specify the package name. Type --help for more info")
+
+        if use_cache:
+            cache = ValidationCache(DEFAULT_CACHE_FILE)
+        build_package(package_dir, dest_dir, desc_type, dry_run, remove_files, jobs, compression, level,
+                      checksum_cache, cache, verbose)
+        if cache:
+            cache.close()
+        exit(0)
+
+    except (ArgumentParserError, getopt.GetoptError) as e:
+        print(str(e), file=sys.stderr)
+    except PackageError as e:
+        print("ERROR: " + str(e), file=sys.stderr)
+    except (IOError, OSError) as e:
+        print("ERROR: " + str(e), file=sys.stderr)
+    except ValueError as e:
+        print("Invalid parameter value: {}".format(e), file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    exit(1)
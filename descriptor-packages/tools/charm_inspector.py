@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+##
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+##
+
+"""
+Inspection of the juju charms included in descriptor packages. Each charm folder is scanned once and its metadata,
+actions, config options and layers are kept, so that all the primitives of a descriptor are checked against them
+without reading the charm again
+"""
+
+import os
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Files and folders that every charm must have
+REQUIRED_FILES = ("layer.yaml", "metadata.yaml", "actions.yaml", "actions", "hooks")
+# Files read from the charm, whose modification invalidates the scan
+SCANNED_FILES = ("layer.yaml", "metadata.yaml", "actions.yaml", "config.yaml")
+# Present in charms built with 'charm build'. Their actions and config include those of all their layers
+BUILD_MANIFEST = ".build.manifest"
+# Descriptor primitive that sets the charm config options instead of running an action
+CONFIG_PRIMITIVE = "config"
+# Descriptor parameter data-type, and the actions.yaml or config.yaml types it can be given to
+DATA_TYPES = {
+    "STRING": ("string",),
+    "INTEGER": ("integer", "number"),
+    "BOOLEAN": ("boolean",),
+}
+
+# CharmInfo by charm folder
+_charms = {}
+
+
+class CharmError(Exception):
+    pass
+
+
+def _load_yaml(path):
+    with open(path) as f:
+        return yaml.load(f, Loader=SafeLoader) or {}
+
+
+class CharmInfo(object):
+    """
+    Content of a charm folder, read once
+    """
+
+    def __init__(self, charm_dir):
+        self.path = charm_dir
+        self.name = os.path.basename(charm_dir)
+        self.files = set(os.listdir(charm_dir))
+        self.signature = self._signature()
+        self.action_files = set(os.listdir(os.path.join(charm_dir, "actions"))) \
+            if os.path.isdir(os.path.join(charm_dir, "actions")) else set()
+        self.metadata = self._load("metadata.yaml")
+        self.actions = self._load("actions.yaml")
+        self.options = self._load("config.yaml").get("options") or {}
+        self.layers = self._load("layer.yaml").get("includes") or []
+        # Source layers get actions and options from the layers they include, so only their own ones are known
+        self.complete = BUILD_MANIFEST in self.files or not self.layers
+
+    def _load(self, name):
+        if name not in self.files:
+            return {}
+        try:
+            return _load_yaml(os.path.join(self.path, name))
+        except yaml.YAMLError as e:
+            raise CharmError("Invalid {} at charm {}: {}".format(name, self.name, e))
+
+    def _signature(self):
+        # modification time of the folder (files added or removed) and of the scanned files, to detect changes
+        # without reading them
+        return (os.stat(self.path).st_mtime_ns,) + tuple(
+            os.stat(os.path.join(self.path, name)).st_mtime_ns if name in self.files else None
+            for name in SCANNED_FILES)
+
+    def is_modified(self):
+        try:
+            return self._signature() != self.signature
+        except OSError:
+            return True
+
+
+def get_charm(charm_dir):
+    """
+    Obtains the content of a charm folder, scanning it only the first time or when its files change
+    :param charm_dir: charm folder
+    :return: CharmInfo
+    """
+    charm_dir = os.path.abspath(charm_dir)
+    charm = _charms.get(charm_dir)
+    if charm is None or charm.is_modified():
+        if not os.path.isdir(charm_dir):
+            raise CharmError("Provided charm:{} does not exist in descriptor.".format(os.path.basename(charm_dir)))
+        charm = CharmInfo(charm_dir)
+        _charms[charm_dir] = charm
+    return charm
+
+
+def _check_parameters(charm, primitive, position, params, required=()):
+    errors = []
+    given = set()
+    for parameter in primitive.get("parameter") or ():
+        name = parameter.get("name")
+        given.add(name)
+        param_position = "{}:parameter[{}]".format(position, name)
+        if name not in params:
+            if charm.complete:
+                errors.append("{}: unknown parameter for charm {}".format(param_position, charm.name))
+            continue
+        data_type = str(parameter.get("data-type", "")).upper()
+        charm_type = (params[name] or {}).get("type")
+        if data_type in DATA_TYPES and charm_type and charm_type not in DATA_TYPES[data_type]:
+            errors.append("{}: data-type {} does not match charm type '{}'".format(param_position, data_type,
+                                                                                   charm_type))
+    for name in required:
+        if name not in given:
+            errors.append("{}: missing required parameter '{}'".format(position, name))
+    return errors
+
+
+def check_configuration(configuration, charm_dir, position=""):
+    """
+    Checks a vnf-configuration or vdu-configuration against its charm: required files, and primitives and their
+    parameters against the charm actions.yaml and config.yaml
+    :param configuration: vnf-configuration or vdu-configuration content
+    :param charm_dir: folder of the charm referenced by the configuration
+    :param position: location of the configuration in the descriptor, used in the error texts
+    :return: list of error texts, empty if right
+    """
+    charm = get_charm(charm_dir)
+    required_files = REQUIRED_FILES + (("metrics.yaml",) if configuration.get("metrics") else ())
+    missing = [name for name in required_files if name not in charm.files]
+    if missing:
+        return ["Invalid charm {}: missing {}".format(charm.name, ", ".join(missing))]
+
+    errors = []
+    for key in ("initial-config-primitive", "config-primitive", "terminate-config-primitive"):
+        for primitive in configuration.get(key) or ():
+            name = primitive.get("name")
+            primitive_position = "{}{}[{}]".format(position + ":" if position else "", key, name)
+            if name == CONFIG_PRIMITIVE:
+                errors += _check_parameters(charm, primitive, primitive_position, charm.options)
+                continue
+            action = charm.actions.get(name)
+            if action is None:
+                if charm.complete:
+                    errors.append("{}: unknown action for charm {}".format(primitive_position, charm.name))
+                continue
+            if name not in charm.action_files:
+                errors.append("{}: charm {} has no actions/{} file".format(primitive_position, charm.name, name))
+            errors += _check_parameters(charm, primitive, primitive_position, action.get("params") or {},
+                                        action.get("required") or ())
+    return errors
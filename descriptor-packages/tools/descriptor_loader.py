@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+##
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+##
+
+"""
+Loading and dumping of OSM descriptor files, shared by the descriptor tools
+"""
+
+import glob
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import yaml
+
+# libyaml based loader and dumper are much faster. Pure python ones are used when PyYAML is built without libyaml
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# Files taken as descriptors when walking folders, following generate_descriptor_pkg.sh naming
+DESCRIPTOR_NAME_RE = re.compile(r"^(.*_)?(vnfd|nsd|nst)(_.*)?\.(yaml|yml|json)$")
+# Folders not walked: package build outputs and charm sources
+SKIP_FOLDERS = ("build", "charms", ".git")
+
+try:
+    import resource
+except ImportError:     # not available out of unix
+    resource = None
+
+
+def load_descriptor(input_file_name, descriptor_str=None):
+    """
+    Reads a yaml or json descriptor. Files with yaml or json extension are parsed straight from the file handle,
+    without keeping a copy of the whole text. Otherwise the text is read to guess the format
+    :param input_file_name: descriptor file
+    :param descriptor_str: descriptor text. If provided, it is used instead of reading the file
+    :return: tuple with the descriptor content and True if it is yaml, False if json
+    """
+    is_yaml = input_file_name.endswith('.yaml') or input_file_name.endswith('.yml')
+    is_json = input_file_name.endswith('.json')
+    if descriptor_str is None and (is_yaml or is_json):
+        with open(input_file_name, 'r') as f:
+            if is_yaml:
+                return yaml.load(f, Loader=SafeLoader), True
+            return json.load(f), False
+
+    if descriptor_str is None:
+        with open(input_file_name, 'r') as f:
+            descriptor_str = f.read()
+    if is_yaml or not (is_json or '\t' in descriptor_str):
+        return yaml.load(descriptor_str, Loader=SafeLoader), True
+    else:   # json
+        return json.loads(descriptor_str), False
+
+
+def dump_descriptor(data, output, format_output_yaml=True):
+    """
+    Writes a descriptor in yaml or json format
+    :param data: descriptor content
+    :param output: file where to write
+    :param format_output_yaml: True for yaml, False for json
+    :return: None
+    """
+    if format_output_yaml:
+        yaml.dump(data, output, Dumper=SafeDumper, indent=4, default_flow_style=False)
+    else:
+        json.dump(data, output)
+
+
+def dump_descriptor_file(data, file_name, format_output_yaml=True):
+    """
+    Writes a descriptor file atomically: content is written to a temporary file in the same folder that then
+    replaces the destination, so readers never see a partially written descriptor
+    :param data: descriptor content
+    :param file_name: destination file. Permissions are kept if it already exists
+    :param format_output_yaml: True for yaml, False for json
+    :return: None
+    """
+    folder, name = os.path.split(os.path.abspath(file_name))
+    fd, tmp_file_name = tempfile.mkstemp(prefix="." + name + ".", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            dump_descriptor(data, f, format_output_yaml)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_name):
+            shutil.copymode(file_name, tmp_file_name)
+        os.replace(tmp_file_name, file_name)
+    except Exception:
+        os.remove(tmp_file_name)
+        raise
+
+
+def find_descriptors(paths):
+    """
+    Expands paths into the list of descriptor files they contain
+    :param paths: list of files, directories or glob patterns. Directories are walked recursively
+    :return: sorted list of descriptor files, without duplicates
+    """
+    found = set()
+    for path in paths:
+        matches = glob.glob(path) if glob.has_magic(path) else [path]
+        if not matches:
+            raise IOError("No file matches '{}'".format(path))
+        for match in matches:
+            if not os.path.isdir(match):
+                found.add(match)
+                continue
+            for root, dirs, files in os.walk(match):
+                dirs[:] = [d for d in dirs if d not in SKIP_FOLDERS]
+                for name in files:
+                    if DESCRIPTOR_NAME_RE.match(name):
+                        found.add(os.path.join(root, name))
+    return sorted(found)
+
+
+def _max_rss_mb():
+    # ru_maxrss is in kilobytes in linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0 if resource else 0.0
+
+
+def profile_call(profile, name, function, *args, **kwargs):
+    """
+    Calls a function, recording its duration and the process peak memory. Peak memory is taken from the resident set
+    size, so it also accounts for libyaml allocations and adds no overhead to the measured time
+    :param profile: dictionary where "<name>_time" (seconds), "<name>_peak_growth_mb" (increase of the process peak
+        memory during the call) and "peak_memory_mb" are stored. If None, the function is just called
+    :param name: label of the measure
+    :param function: function to call, with the rest of arguments
+    :return: the function result
+    """
+    if profile is None:
+        return function(*args, **kwargs)
+    start_rss = _max_rss_mb()
+    start = time.time()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        profile[name + "_time"] = round(time.time() - start, 4)
+        end_rss = _max_rss_mb()
+        profile[name + "_peak_growth_mb"] = round(end_rss - start_rss, 2)
+        profile["peak_memory_mb"] = round(end_rss, 2)
+
+
+def format_profile(profile):
+    """
+    :param profile: dictionary filled by profile_call
+    :return: one line text with the measures
+    """
+    return "Profile: " + ", ".join("{}={}".format(k, v) for k, v in sorted(profile.items()))
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+##
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+##
+
+"""
+Registry of the OSM descriptor format migrations, and the engine that applies them.
+Each MigrationStep converts one catalog type from a release format to the next one. Steps declare the paths of the
+nodes they change, so that all the steps needed from the source to the target release are applied in a single
+traversal that only visits those paths
+"""
+
+from normalize_descriptor import remove_prefix
+
+# Known descriptor formats, oldest first
+VERSIONS = ("TWO", "THREE")
+TARGET_VERSION = VERSIONS[-1]
+
+# Catalog key and namespace prefix, by catalog type
+CATALOGS = {
+    "vnfd": ("vnfd-catalog", "vnfd:"),
+    "nsd": ("nsd-catalog", "nsd:"),
+}
+
+_steps = []
+
+
+class MigrationError(Exception):
+    """
+    A descriptor cannot be migrated. position is the list of nodes where it failed, as "vnfd[id]"
+    """
+
+    def __init__(self, position, error):
+        Exception.__init__(self, error)
+        self.position = position
+
+
+class MigrationStep(object):
+    """
+    Conversion of a catalog type from one release format to the next one.
+    Rules are functions called as rule(node, context) for the nodes at a path. Paths are tuples of keys from the
+    catalog content, where "*" stands for every item of a list, e.g. ("vnfd", "*", "vdu", "*") is each vdu of each
+    vnfd. Enter rules are called before visiting the children of the node, exit rules after that. context is a
+    dictionary shared by all the rules of a migration, to pass information between them
+    """
+
+    def __init__(self, catalog, from_version, to_version, enter_rules=None, exit_rules=None):
+        self.catalog = catalog
+        self.from_version = from_version
+        self.to_version = to_version
+        self.enter_rules = enter_rules or {}
+        self.exit_rules = exit_rules or {}
+
+    @property
+    def paths(self):
+        return set(self.enter_rules) | set(self.exit_rules)
+
+
+def register(step):
+    """
+    Adds a migration step to the registry
+    :param step: MigrationStep
+    :return: the step
+    """
+    _steps.append(step)
+    return step
+
+
+def get_steps(catalog, from_version, to_version=TARGET_VERSION):
+    """
+    Obtains the chain of steps to convert a catalog type between two releases
+    :param catalog: "vnfd" or "nsd"
+    :param from_version: source release, one of VERSIONS
+    :param to_version: target release, one of VERSIONS
+    :return: list of MigrationStep, in the order they must be applied. Empty if versions are the same
+    """
+    for version in (from_version, to_version):
+        if version not in VERSIONS:
+            raise ValueError("Unknown descriptor version '{}'. Must be one of {}".format(version, ", ".join(VERSIONS)))
+    if VERSIONS.index(from_version) > VERSIONS.index(to_version):
+        raise ValueError("Cannot downgrade descriptor from version {} to {}".format(from_version, to_version))
+    chain = []
+    version = from_version
+    while version != to_version:
+        step = next((s for s in _steps if s.catalog == catalog and s.from_version == version), None)
+        if not step:
+            raise ValueError("No {} migration registered from version {}".format(catalog, version))
+        chain.append(step)
+        version = step.to_version
+    return chain
+
+
+def get_catalog(data):
+    """
+    :param data: descriptor content
+    :return: "vnfd" or "nsd". None if it is not a known catalog
+    """
+    for catalog, (catalog_key, prefix) in CATALOGS.items():
+        if catalog_key in data or prefix + catalog_key in data:
+            return catalog
+    return None
+
+
+def detect_version(data):
+    """
+    Guesses the release format of a descriptor, looking for the keys removed by later releases. Only the first levels
+    of the descriptor are inspected. Prefixes must be already removed
+    :param data: descriptor content
+    :return: one of VERSIONS
+    """
+    catalog = get_catalog(data)
+    catalog_key = CATALOGS[catalog][0] if catalog else None
+    for desc in (data.get(catalog_key) or {}).get(catalog) or ():
+        if catalog == "vnfd":
+            configuration = desc.get("vnf-configuration") or {}
+            if "rw-vnfd:meta" in desc or "service-primitive" in configuration or \
+                    "config-attributes" in configuration or (desc.get("mgmt-interface") or {}).get("vdu-id"):
+                return "TWO"
+            for vdu in desc.get("vdu") or ():
+                if "external-interface" in vdu or "internal-interface" in vdu:
+                    return "TWO"
+        elif catalog == "nsd":
+            if "rw-nsd:meta" in desc or "rw-meta" in desc or "initial-config-primitive" in desc:
+                return "TWO"
+    return TARGET_VERSION
+
+
+def _position(key, node, index):
+    if isinstance(node, dict):
+        name = node.get("id", node.get("name"))
+        if name is not None:
+            return "{}[{}]".format(key, name)
+    return "{}[{}]".format(key, index)
+
+
+def migrate(data, from_version=None, to_version=TARGET_VERSION):
+    """
+    Converts a descriptor to another release format, in a single traversal
+    :param data: descriptor content. It is changed
+    :param from_version: source release. By default it is detected, and all the steps from the oldest release are
+        applied, as the detection only looks for some old keys. The rules keep the nodes already in a later format,
+        and complete them as a conversion from the oldest release would, e.g. with the positions of the interfaces
+    :param to_version: target release. By default the last one
+    :return: the source release, given or detected
+    """
+    catalog = get_catalog(data)
+    if not catalog:
+        raise MigrationError(["global"], "This is not neither nsd-catalog nor vnfd-catalog descriptor")
+    catalog_key, prefix = CATALOGS[catalog]
+    remove_prefix(data, prefix)
+    source_version = from_version or detect_version(data)
+    try:
+        steps = get_steps(catalog, source_version, to_version)
+        if not from_version:
+            steps = get_steps(catalog, VERSIONS[0], to_version)
+    except ValueError as e:
+        raise MigrationError(["global"], e)
+    if not steps:
+        return source_version
+
+    enter_rules = {}
+    exit_rules = {}
+    for step in steps:
+        for path, rule in step.enter_rules.items():
+            enter_rules.setdefault(path, []).append(rule)
+        for path, rule in step.exit_rules.items():
+            exit_rules.setdefault(path, []).append(rule)
+    # paths to visit: those with rules and all their ancestors
+    visit = set()
+    for path in set(enter_rules) | set(exit_rules):
+        for i in range(len(path) + 1):
+            visit.add(path[:i])
+
+    context = {}
+    position = [catalog_key]
+
+    def walk(node, path):
+        for rule in enter_rules.get(path, ()):
+            rule(node, context)
+        if isinstance(node, dict):
+            for key in list(node):
+                child_path = path + (key,)
+                if child_path in visit and key in node:
+                    position.append(key)
+                    walk(node[key], child_path)
+                    position.pop()
+        elif isinstance(node, (list, tuple)):
+            child_path = path + ("*",)
+            if child_path in visit:
+                key = position.pop()
+                for index, item in enumerate(node):
+                    position.append(_position(key, item, index))
+                    walk(item, child_path)
+                    position.pop()
+                position.append(key)
+        for rule in exit_rules.get(path, ()):
+            rule(node, context)
+
+    try:
+        walk(data[catalog_key], ())
+    except MigrationError:
+        raise
+    except Exception as e:
+        raise MigrationError(position, e)
+    return source_version
+
+
+# Release TWO to THREE rules
+
+def _two_three_vnfd(vnfd, context):
+    context["vdu2mgmt_cp"] = {}  # internal dict to indicate management interface for each vdu
+    # Remove vnf-configuration:config-attributes
+    if "vnf-configuration" in vnfd and "config-attributes" in vnfd["vnf-configuration"]:
+        del vnfd["vnf-configuration"]["config-attributes"]
+    # Remove "rw-nsd:meta"
+    if "rw-vnfd:meta" in vnfd:
+        del vnfd["rw-vnfd:meta"]
+    # Change vnf-configuration:service-primitive into vnf-configuration:config-primitive
+    if "vnf-configuration" in vnfd and "service-primitive" in vnfd["vnf-configuration"]:
+        vnfd["vnf-configuration"]["config-primitive"] = vnfd["vnf-configuration"].pop("service-primitive")
+
+
+def _two_three_vnfd_mgmt_interface(vnfd, context):
+    # change mgmt-interface, once all the vdu interfaces are known
+    if vnfd.get("mgmt-interface"):
+        vdu_id = vnfd["mgmt-interface"].pop("vdu-id", None)
+        if vdu_id:
+            vnfd["mgmt-interface"]["cp"] = context["vdu2mgmt_cp"][vdu_id]
+
+
+def _two_three_internal_vld(internal_vld, context):
+    # Remove interval-vld:vendor
+    if "vendor" in internal_vld:
+        del internal_vld["vendor"]
+
+
+def _two_three_primitive_parameter(parameter, context):
+    # Convert to capital letters vnf-configuration:config-primitive:parameter:data-type
+    parameter["data-type"] = str(parameter["data-type"]).upper()
+
+
+def _two_three_vdu(vdu, context):
+    # Change external/internal interface
+    interface_list = []
+    for external_interface in vdu.pop("external-interface", ()):
+        if "rw-vnfd:floating-ip-needed" in external_interface:
+            del external_interface["rw-vnfd:floating-ip-needed"]
+        external_interface["type"] = "EXTERNAL"
+        external_interface["external-connection-point-ref"] = \
+            external_interface.pop("vnfd-connection-point-ref")
+        if external_interface.get("virtual-interface", {}).get("type") == "OM-MGMT":
+            external_interface["virtual-interface"]["type"] = "VIRTIO"
+            if vdu["id"] not in context["vdu2mgmt_cp"]:
+                context["vdu2mgmt_cp"][vdu["id"]] = external_interface["external-connection-point-ref"]
+        interface_list.append(external_interface)
+    for internal_interface in vdu.pop("internal-interface", ()):
+        internal_interface["type"] = "INTERNAL"
+        internal_interface["internal-connection-point-ref"] = \
+            internal_interface.pop("vdu-internal-connection-point-ref")
+        interface_list.append(internal_interface)
+
+    # Removing "rw-vnfd:floating-ip-needed" items from V3 descriptors
+    for iface in vdu.pop("interface", ()):
+        if "rw-vnfd:floating-ip-needed" in iface:
+            del iface["rw-vnfd:floating-ip-needed"]
+        interface_list.append(iface)
+
+    # order interface alphabetically and set position
+    if interface_list:
+        interface_list = sorted(interface_list,
+                                key=lambda k: k.get('external-connection-point-ref',
+                                                    k.get('internal-connection-point-ref')))
+        for index, i in enumerate(interface_list, 1):
+            i["position"] = str(index)
+        vdu["interface"] = interface_list
+
+
+def _two_three_nsd(nsd, context):
+    # set mgmt-network to true
+    for vld in nsd.get("vld", ()):
+        if "mgmt" in vld["name"].lower() or "management" in vld["name"].lower():
+            vld['mgmt-network'] = 'true'
+            break
+    # Change initial-config-primitive into initial-service-primitive
+    if "initial-config-primitive" in nsd:
+        nsd['initial-service-primitive'] = nsd.pop("initial-config-primitive")
+    # Remove "rw-nsd:meta"
+    if "rw-nsd:meta" in nsd:
+        del nsd["rw-nsd:meta"]
+    # Remove "rw-meta"
+    if "rw-meta" in nsd:
+        del nsd["rw-meta"]
+
+
+def _two_three_vld(vld, context):
+    if "provider-network" in vld and "overlay-type" in vld["provider-network"]:
+        del vld["provider-network"]["overlay-type"]
+
+
+register(MigrationStep(
+    "vnfd", "TWO", "THREE",
+    enter_rules={
+        ("vnfd", "*"): _two_three_vnfd,
+        ("vnfd", "*", "internal-vld", "*"): _two_three_internal_vld,
+        ("vnfd", "*", "vnf-configuration", "config-primitive", "*", "parameter", "*"): _two_three_primitive_parameter,
+        ("vnfd", "*", "vdu", "*"): _two_three_vdu,
+    },
+    exit_rules={
+        ("vnfd", "*"): _two_three_vnfd_mgmt_interface,
+    },
+))
+
+register(MigrationStep(
+    "nsd", "TWO", "THREE",
+    enter_rules={
+        ("nsd", "*"): _two_three_nsd,
+        ("nsd", "*", "vld", "*"): _two_three_vld,
+    },
+))
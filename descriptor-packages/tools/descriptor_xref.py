@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+##
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+##
+
+"""
+Catalog level cross reference checks between OSM descriptors: NSD references to VNFDs, their connection points and
+their member indexes, and VNFD scaling group references to its VDUs.
+All the VNFDs are indexed in one pass, so that each reference is then checked with a dictionary or set lookup
+"""
+
+from collections import namedtuple
+from descriptor_loader import load_descriptor
+from normalize_descriptor import remove_prefix
+
+XrefError = namedtuple("XrefError", ("file", "position", "message"))
+
+
+class VnfdIndex(object):
+    """
+    Identifiers of one VNFD that other descriptors can reference
+    """
+
+    def __init__(self, vnfd, file_name):
+        self.file = file_name
+        self.connection_points = set()
+        for cp in vnfd.get("connection-point") or ():
+            self.connection_points.update(str(cp[k]) for k in ("name", "id") if cp.get(k) is not None)
+        self.vdus = set(str(vdu["id"]) for vdu in vnfd.get("vdu") or () if vdu.get("id") is not None)
+        self.scaling_groups = set(str(sg["name"]) for sg in vnfd.get("scaling-group-descriptor") or ()
+                                  if sg.get("name") is not None)
+
+
+def _items(desc, key):
+    """
+    Iterates a list of the descriptor, with the text used to show its position
+    """
+    for index, item in enumerate(desc.get(key) or ()):
+        if not isinstance(item, dict):
+            continue
+        name = item.get("id", item.get("name", index))
+        yield "{}[{}]".format(key, name), item
+
+
+class CatalogIndex(object):
+    """
+    Index of all the VNFDs of a catalog, to check the references of every descriptor against it
+    """
+
+    def __init__(self):
+        self.vnfds = {}
+        self.errors = []
+        self._nsds = []
+
+    def _error(self, file_name, position, message):
+        self.errors.append(XrefError(file_name, ":".join(position), message))
+
+    def add(self, data, file_name):
+        """
+        Adds the content of a descriptor file. VNFDs are indexed now, NSDs are kept to be checked by check()
+        :param data: descriptor content. Prefixes are removed
+        :param file_name: descriptor file, to report errors
+        :return: None
+        """
+        remove_prefix(data, ("vnfd:", "nsd:"))
+        for vnfd_position, vnfd in _items(data.get("vnfd-catalog") or {}, "vnfd"):
+            vnfd_id = str(vnfd.get("id"))
+            if vnfd_id in self.vnfds:
+                self._error(file_name, ["vnfd-catalog", vnfd_position],
+                            "vnfd id already defined at '{}'".format(self.vnfds[vnfd_id].file))
+                continue
+            index = VnfdIndex(vnfd, file_name)
+            self.vnfds[vnfd_id] = index
+            for sg_position, sg in _items(vnfd, "scaling-group-descriptor"):
+                for vdu_position, vdu_ref in _items(sg, "vdu"):
+                    if str(vdu_ref.get("vdu-id-ref")) not in index.vdus:
+                        self._error(file_name, ["vnfd-catalog", vnfd_position, sg_position, vdu_position],
+                                    "unknown vdu-id-ref '{}'".format(vdu_ref.get("vdu-id-ref")))
+        for _, nsd in _items(data.get("nsd-catalog") or {}, "nsd"):
+            self._nsds.append((nsd, file_name))
+
+    def _check_nsd(self, nsd, file_name):
+        nsd_position = ["nsd-catalog", "nsd[{}]".format(nsd.get("id"))]
+        # member-vnf-index -> vnfd id
+        members = {}
+        for cvnfd_position, cvnfd in _items(nsd, "constituent-vnfd"):
+            position = nsd_position + ["constituent-vnfd[{}]".format(cvnfd.get("member-vnf-index"))]
+            member = str(cvnfd.get("member-vnf-index"))
+            vnfd_id = str(cvnfd.get("vnfd-id-ref"))
+            if member in members:
+                self._error(file_name, position, "duplicated member-vnf-index '{}'".format(member))
+            members[member] = vnfd_id
+            if vnfd_id not in self.vnfds:
+                self._error(file_name, position, "unknown vnfd-id-ref '{}'".format(vnfd_id))
+
+        for vld_position, vld in _items(nsd, "vld"):
+            for index, cp_ref in enumerate(vld.get("vnfd-connection-point-ref") or ()):
+                position = nsd_position + [vld_position, "vnfd-connection-point-ref[{}]".format(index)]
+                member = str(cp_ref.get("member-vnf-index-ref"))
+                if member not in members:
+                    self._error(file_name, position, "unknown member-vnf-index-ref '{}'".format(member))
+                    continue
+                vnfd_id = str(cp_ref.get("vnfd-id-ref", members[member]))
+                if vnfd_id != members[member]:
+                    self._error(file_name, position, "vnfd-id-ref '{}' does not match '{}' of member-vnf-index "
+                                                     "'{}'".format(vnfd_id, members[member], member))
+                    continue
+                vnfd = self.vnfds.get(vnfd_id)
+                cp = str(cp_ref.get("vnfd-connection-point-ref"))
+                if vnfd and cp not in vnfd.connection_points:
+                    self._error(file_name, position, "unknown vnfd-connection-point-ref '{}' in vnfd '{}'".format(
+                        cp, vnfd_id))
+
+        for sg_position, sg in _items(nsd, "scaling-group-descriptor"):
+            for index, member_ref in enumerate(sg.get("vnfd-member") or ()):
+                member = str(member_ref.get("member-vnf-index-ref"))
+                if member not in members:
+                    self._error(file_name, nsd_position + [sg_position, "vnfd-member[{}]".format(index)],
+                                "unknown member-vnf-index-ref '{}'".format(member))
+
+    def check(self):
+        """
+        Checks the references of all the NSDs added, against all the VNFDs added
+        :return: list of XrefError, including those found while adding descriptors
+        """
+        for nsd, file_name in self._nsds:
+            self._check_nsd(nsd, file_name)
+        self._nsds = []
+        return self.errors
+
+
+def check_files(file_list):
+    """
+    Checks the cross references among a set of descriptor files. Files that cannot be read or parsed are skipped, as
+    the format validation already reports them
+    :param file_list: list of descriptor files
+    :return: list of XrefError
+    """
+    index = CatalogIndex()
+    for file_name in file_list:
+        try:
+            data, _ = load_descriptor(file_name)
+        except Exception:
+            continue
+        if isinstance(data, dict):
+            index.add(data, file_name)
+    return index.check()
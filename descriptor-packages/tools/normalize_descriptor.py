@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+##
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+##
+
+"""
+Normalization of OSM descriptors content, shared by the descriptor tools
+"""
+
+_CONTAINERS = (dict, list, tuple)
+
+
+def remove_prefix(desc, prefix):
+    """
+    Removes namespace prefixes from keys, at any depth. The descriptor is walked once, iteratively, so that very
+    big or deep descriptors do not hit the recursion limit
+    :param desc: dictionary or list to change
+    :param prefix: prefix to remove, e.g. "vnfd:". It can be a list or tuple of prefixes, e.g. ("vnfd:", "rw-vnfd:"),
+        all of them removed in the same pass. A key equal to a prefix is kept
+    :return: None, param desc is changed
+    """
+    prefixes = (prefix,) if isinstance(prefix, str) else tuple(prefix)
+    stack = [desc]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        node = pop()
+        if isinstance(node, dict):
+            prefixed = None     # only allocated for the dictionaries with keys to rename
+            for k, v in node.items():
+                if isinstance(v, _CONTAINERS):
+                    push(v)
+                if isinstance(k, str) and k.startswith(prefixes):
+                    if prefixed is None:
+                        prefixed = [k]
+                    else:
+                        prefixed.append(k)
+            if prefixed:
+                for k in prefixed:
+                    for p in prefixes:
+                        if k.startswith(p) and k != p:
+                            node[k[len(p):]] = node.pop(k)
+                            break
+        else:
+            for v in node:
+                if isinstance(v, _CONTAINERS):
+                    push(v)
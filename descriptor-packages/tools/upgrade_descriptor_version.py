@@ -1,4 +1,4 @@
-#!/usr/bin/env python2
+#!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
 ##
@@ -18,14 +18,20 @@
 #
 ##
 from __future__ import print_function
+import copy
 import json
 import yaml
 # import logging
 import sys
 import getopt
+from concurrent.futures import ProcessPoolExecutor
+from descriptor_loader import dump_descriptor, dump_descriptor_file, find_descriptors, format_profile, \
+    load_descriptor, profile_call
+from descriptor_migrations import MigrationError, TARGET_VERSION, VERSIONS, migrate
+from validate_descriptor import get_descriptor_type, validate
 
 """
-Converts OSM VNFD, NSD descriptor from release TWO to release THREE format
+Converts OSM VNFD, NSD descriptor from older releases to the last known release format
 """
 __author__ = "Alfonso Tierno, Guillermo Calvino"
 __date__ = "2017-10-14"
@@ -39,7 +45,8 @@ class ArgumentParserError(Exception):
 
 def usage():
     print("Usage: {} [options] FILE".format(sys.argv[0]))
-    print(" EXPERIMENTAL: Upgrade vnfd, nsd descriptor from old versions to release THREE version")
+    print("       {} [options] --bulk FILE|DIR|GLOB ...".format(sys.argv[0]))
+    print(" EXPERIMENTAL: Upgrade vnfd, nsd descriptor from old versions to release {} version".format(TARGET_VERSION))
     print(" FILE: a yaml or json vnfd-catalog or nsd-catalog descriptor")
     print(" OPTIONS:")
     print("      -v|--version: prints current version")
@@ -47,30 +54,73 @@ def usage():
     print("      -i|--input FILE: (same as param FILE) descriptor file to be upgraded")
     print("      -o|--output FILE: where to write generated descriptor. By default stdout")
     print("      --test: Content is tested to check wrong format or unknown keys")
+    print("      --profile: reports descriptor parse time and peak memory")
+    print("      --from VERSION: release format of the descriptor, one of {}. By default it is detected, and all the".format(
+        ", ".join(VERSIONS)))
+    print("              conversions from the oldest format are applied")
+    print("      --to VERSION: release format to convert to. By default {}".format(TARGET_VERSION))
+    print("      --bulk: upgrades in place, in parallel, all the descriptors found at the FILE, DIR (walked")
+    print("              recursively) or GLOB params. Each file is replaced atomically. A json result line is")
+    print("              printed per file")
+    print("      -j|--jobs N: number of parallel workers in bulk mode. By default the number of cpus")
     return
 
 
-def remove_prefix(desc, prefix):
+def upgrade_file(input_file_name, from_version=None, to_version=TARGET_VERSION):
     """
-    Recursively removes prefix from keys
-    :param desc: dictionary or list to change
-    :param prefix: prefix to remove. Must
-    :return: None, param desc is changed
+    Upgrades a descriptor file in place. The file is not written if the upgrade does not change its content
+    :param input_file_name: descriptor file
+    :param from_version: release format of the descriptor. By default it is detected
+    :param to_version: release format to convert to
+    :return: tuple with the release format detected, or from_version, and whether the file was changed
     """
-    prefix_len = len(prefix)
-    if isinstance(desc, dict):
-        prefixed_list=[]
-        for k,v in desc.items():
-            if isinstance(v, (list, tuple, dict)):
-                remove_prefix(v, prefix)
-            if isinstance(k, str) and k.startswith(prefix) and k != prefix:
-                prefixed_list.append(k)
-        for k in prefixed_list:
-            desc[k[prefix_len:]] = desc.pop(k)
-    elif isinstance(desc, (list, tuple)):
-        for i in desc:
-            if isinstance(desc, (list, tuple, dict)):
-                remove_prefix(i, prefix)
+    data, format_output_yaml = load_descriptor(input_file_name)
+    original = copy.deepcopy(data)
+    source_version = migrate(data, from_version, to_version)
+    changed = data != original
+    if changed:
+        dump_descriptor_file(data, input_file_name, format_output_yaml)
+    return source_version, changed
+
+
+def _upgrade_file_result(args):
+    input_file_name, from_version, to_version = args
+    result = {"file": input_file_name, "to": to_version}
+    try:
+        result["from"], changed = upgrade_file(input_file_name, from_version, to_version)
+        result["result"] = "upgraded" if changed else "unchanged"
+    except MigrationError as e:
+        result["result"] = "error"
+        result["error"] = "Descriptor error at '{}': {}".format(":".join(e.position), e)
+    except yaml.YAMLError as e:
+        result["result"] = "error"
+        result["error"] = "yaml format error {}".format(e)
+    except Exception as e:
+        result["result"] = "error"
+        result["error"] = "Error loading file '{}': {}".format(input_file_name, e)
+    return result
+
+
+def upgrade_bulk(paths, from_version=None, to_version=TARGET_VERSION, jobs=None, output=sys.stdout):
+    """
+    Upgrades in place all descriptors found at paths, using a pool of processes. One json result line is written per
+    file, in the same order as the files are found
+    :param paths: list of files, directories or glob patterns
+    :param from_version: release format of the descriptors. By default it is detected for each one
+    :param to_version: release format to convert to
+    :param jobs: number of worker processes. By default the number of cpus
+    :param output: where to write the result lines
+    :return: number of descriptors that could not be upgraded
+    """
+    errors = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for result in executor.map(_upgrade_file_result,
+                                   [(f, from_version, to_version) for f in find_descriptors(paths)]):
+            if result["result"] == "error":
+                errors += 1
+            print(json.dumps(result), file=output)
+            output.flush()
+    return errors
 
 
 if __name__=="__main__":
@@ -79,10 +129,17 @@ if __name__=="__main__":
     input_file_name = None
     output_file_name = None
     test_file = None
+    descriptor = None
     file_name = None
+    profile = None
+    from_version = None
+    to_version = TARGET_VERSION
+    bulk = False
+    jobs = None
     try:
         # load parameters and configuration
-        opts, args = getopt.getopt(sys.argv[1:], "hvi:o:", ["input=", "help", "version", "output=", "test",])
+        opts, args = getopt.getopt(sys.argv[1:], "hvi:o:j:", ["input=", "help", "version", "output=", "test",
+                                                              "profile", "from=", "to=", "bulk", "jobs="])
 
         for o, a in opts:
             if o in ("-v", "--version"):
@@ -97,8 +154,35 @@ if __name__=="__main__":
                 output_file_name = a
             elif o == "--test":
                 test_file = True
+            elif o == "--profile":
+                profile = {}
+            elif o in ("--from", "--to"):
+                if a.upper() not in VERSIONS:
+                    raise ArgumentParserError("Invalid {} value '{}'. Must be one of {}".format(o, a,
+                                                                                              ", ".join(VERSIONS)))
+                if o == "--from":
+                    from_version = a.upper()
+                else:
+                    to_version = a.upper()
+            elif o == "--bulk":
+                bulk = True
+            elif o in ("-j", "--jobs"):
+                try:
+                    jobs = int(a)
+                except ValueError:
+                    jobs = 0
+                if jobs < 1:
+                    raise ArgumentParserError("--jobs must be a positive number")
             else:
                 assert False, "Unhandled option"
+        if bulk:
+            if output_file_name or test_file:
+                raise ArgumentParserError("--output and --test cannot be used with --bulk")
+            if input_file_name:
+                args.insert(0, input_file_name)
+            if not args:
+                raise ArgumentParserError("missing DESCRIPTOR_FILE parameter. Type --help for more info")
+            exit(1 if upgrade_bulk(args, from_version, to_version, jobs) else 0)
         if not input_file_name:
             if not args:
                 raise ArgumentParserError("missing DESCRIPTOR_FILE parameter. Type --help for more info")
@@ -106,212 +190,28 @@ if __name__=="__main__":
 
         # Open files
         file_name = input_file_name
-        with open(file_name, 'r') as f:
-            descriptor_str = f.read()
-        if output_file_name:
-            file_name = output_file_name
-            output = open(file_name, 'w')
-        else:
-            output = sys.stdout
+        data, format_output_yaml = profile_call(profile, "parse", load_descriptor, input_file_name)
+        if profile:
+            print(format_profile(profile), file=sys.stderr)
         file_name = None
 
-        if input_file_name.endswith('.yaml') or input_file_name.endswith('.yml') or not \
-            (input_file_name.endswith('.json') or '\t' in descriptor_str):
-            data = yaml.load(descriptor_str)
-        else:   # json
-            data = json.loads(descriptor_str)
-            format_output_yaml = False
-
         if test_file:
-            import osm_im.vnfd as vnfd_catalog
-            import osm_im.nsd as nsd_catalog
-            from pyangbind.lib.serialise import pybindJSONDecoder
-
-            if "vnfd:vnfd-catalog" in data or "vnfd-catalog" in data:
-                descriptor = "VNF"
-                #Check if mgmt-interface is defined:
-                remove_prefix(data, "vnfd:")
-                vnfd_descriptor = data["vnfd-catalog"]
-                vnfd_list = vnfd_descriptor["vnfd"]
-                mgmt_iface = False
-                for vnfd in vnfd_list:
-                    vdu_list = vnfd["vdu"]
-                    for vdu in vdu_list:
-                        interface_list = []
-                        external_interface_list = vdu.pop("external-interface", ())
-                        for external_interface in external_interface_list:
-                            if external_interface.get("virtual-interface", {}).get("type") == "OM-MGMT":
-                                raise KeyError(
-                                    "Wrong 'Virtual-interface type': Deprecated 'OM-MGMT' value. Please, use 'VIRTIO' instead")
-                        interface_list = vdu.pop("interface", ())
-                        for interface in interface_list:
-                            if interface.get("virtual-interface", {}).get("type") == "OM-MGMT":
-                                raise KeyError(
-                                    "Wrong 'Virtual-interface type': Deprecated 'OM-MGMT' value. Please, use 'VIRTIO' instead")
-                    if vnfd.get("mgmt-interface"):
-                        mgmt_iface = True
-                        if vnfd["mgmt-interface"].get("vdu-id"):
-                            raise KeyError("'mgmt-iface': Deprecated 'vdu-id' field. Please, use 'cp' field instead")
-                if not mgmt_iface:
-                    raise KeyError("'mgmt-iface' is a mandatory field and it is not defined")
-                myvnfd = vnfd_catalog.vnfd()
-                pybindJSONDecoder.load_ietf_json(data, None, None, obj=myvnfd)
-            elif "nsd:nsd-catalog" in data or "nsd-catalog" in data:
-                descriptor = "NS"
-                mynsd = nsd_catalog.nsd()
-                pybindJSONDecoder.load_ietf_json(data, None, None, obj=mynsd)
-            else:
-                descriptor = None
-                raise KeyError("This is not neither nsd-catalog nor vnfd-catalog descriptor")
+            descriptor = get_descriptor_type(data)
+            validate(data, input_file_name)
             exit(0)
 
         # Convert version
-        if "vnfd:vnfd-catalog" in data or "vnfd-catalog" in data:
-            remove_prefix(data, "vnfd:")
-            error_position.append("vnfd-catalog")
-            vnfd_descriptor = data["vnfd-catalog"]
-            vnfd_list = vnfd_descriptor["vnfd"]
-            error_position.append("vnfd")
-            for vnfd in vnfd_list:
-                error_position[-1] = "vnfd[{}]".format(vnfd["id"])
-                # Remove vnf-configuration:config-attributes
-                if "vnf-configuration" in vnfd and "config-attributes" in vnfd["vnf-configuration"]:
-                    del vnfd["vnf-configuration"]["config-attributes"]
-                # Remove interval-vld:vendor
-                if "internal-vld" in vnfd:
-                    internal_vld_list = vnfd.get("internal-vld", ())
-                    for internal_vld in internal_vld_list:
-                        if "vendor" in internal_vld:
-                            del internal_vld["vendor"]
-                # Remove "rw-nsd:meta"
-                if "rw-vnfd:meta" in vnfd:
-                    del vnfd["rw-vnfd:meta"]
-                # Change vnf-configuration:service-primitive into vnf-configuration:config-primitive
-                if "vnf-configuration" in vnfd and "service-primitive" in vnfd["vnf-configuration"]:
-                    vnfd["vnf-configuration"]["config-primitive"] = vnfd["vnf-configuration"].pop("service-primitive")
-
-                # Convert to capital letters vnf-configuration:service-primitive:parameter:data-type
-                if "vnf-configuration" in vnfd and "config-primitive" in vnfd["vnf-configuration"]:
-                    error_position.append("vnf-configuration")
-                    error_position.append("config-primitive")
-                    primitive_list = vnfd["vnf-configuration"].get("config-primitive", ())
-
-                    for primitive in primitive_list:
-                        if "parameter" in primitive:
-                            parameter_list = primitive.get("parameter", ())
-                            for parameter in parameter_list:
-                                parameter["data-type"] = str(parameter["data-type"]).upper()
-
-                    vnfd["vnf-configuration"]["config-primitive"] = primitive_list
-                    error_position.pop()
-                    error_position.pop()
-                # Iterate with vdu:interfaces
-                vdu_list = vnfd["vdu"]
-                error_position.append("vdu")
-                vdu2mgmt_cp = {}  # internal dict to indicate management interface for each vdu
-                for vdu in vdu_list:
-                    error_position[-1] = "vdu[{}]".format(vdu["id"])
-                    # Change external/internal interface
-                    interface_list = []
-                    external_interface_list = vdu.pop("external-interface", ())
-                    error_position.append("external-interface")
-                    for external_interface in external_interface_list:
-                        error_position[-1] = "external-interface[{}]".format(external_interface["name"])
-                        if "rw-vnfd:floating-ip-needed" in external_interface:
-                            del external_interface["rw-vnfd:floating-ip-needed"]
-                        external_interface["type"] = "EXTERNAL"
-                        external_interface["external-connection-point-ref"] = \
-                            external_interface.pop("vnfd-connection-point-ref")
-                        if external_interface.get("virtual-interface", {}).get("type") == "OM-MGMT":
-                            external_interface["virtual-interface"]["type"] = "VIRTIO"
-                            if vdu["id"] not in vdu2mgmt_cp:
-                                vdu2mgmt_cp[vdu["id"]] = external_interface["external-connection-point-ref"]
-                        interface_list.append(external_interface)
-                    error_position.pop()
-                    internal_interface_list = vdu.pop("internal-interface", ())
-                    error_position.append("internal-interface")
-                    for internal_interface in internal_interface_list:
-                        error_position[-1] = "internal-interface[{}]".format(internal_interface["name"])
-                        internal_interface["type"] = "INTERNAL"
-                        internal_interface["internal-connection-point-ref"] = \
-                            internal_interface.pop("vdu-internal-connection-point-ref")
-                        interface_list.append(internal_interface)
-                    error_position.pop()
-
-                    #Removing "rw-vnfd:floating-ip-needed" items from V3 descriptors
-                    interfaces = vdu.pop("interface", ())
-                    for iface in interfaces:
-                        if "rw-vnfd:floating-ip-needed" in iface:
-                            del iface["rw-vnfd:floating-ip-needed"]
-                        interface_list.append(iface)
-
-                    # order interface alphabetically and set position
-                    if interface_list:
-                        interface_list = sorted(interface_list,
-                                                key=lambda k: k.get('external-connection-point-ref',
-                                                                    k.get('internal-connection-point-ref')))
-                        index = 1
-                        for i in interface_list:
-                            i["position"] = str(index)
-                            index += 1
-
-                        vdu["interface"] = interface_list
-                error_position.pop()
-                # change mgmt-interface
-                if vnfd.get("mgmt-interface"):
-                    error_position.append("mgmt-interface")
-                    vdu_id = vnfd["mgmt-interface"].pop("vdu-id", None)
-                    if vdu_id:
-                        error_position.append("vdu-id")
-                        vnfd["mgmt-interface"]["cp"] = vdu2mgmt_cp[vdu_id]
-                        error_position.pop()
-                    error_position.pop()
-            error_position = []
-        elif "nsd:nsd-catalog" in data or "nsd-catalog" in data:
-            remove_prefix(data, "nsd:")
-            error_position.append("nsd-catalog")
-            nsd_descriptor = data["nsd-catalog"]
-            nsd_list = nsd_descriptor["nsd"]
-            error_position.append("nsd")
-            for nsd in nsd_list:
-                error_position[-1] = "nsd[{}]".format(nsd["id"])
-                # set mgmt-network to true
-                error_position.append("vld")
-                vld_list = nsd.get("vld", ())
-                for vld in vld_list:
-                    error_position[-1] = "vld[{}]".format(vld["id"])
-                    if "mgmt" in vld["name"].lower() or "management" in vld["name"].lower():
-                        vld['mgmt-network'] = 'true'
-                        break
-                error_position.pop()
-                # Change initial-config-primitive into initial-service-primitive
-                if "initial-config-primitive" in nsd:
-                    nsd['initial-service-primitive'] = nsd.pop("initial-config-primitive")
-                # Remove "rw-nsd:meta"
-                if "rw-nsd:meta" in nsd:
-                    del nsd["rw-nsd:meta"]
-                # Remove "rw-meta"
-                if "rw-meta" in nsd:
-                    del nsd["rw-meta"]
-                # Iterate with vld:id
-                error_position.append("vld")
-                vld_list = nsd.get("vld",())
-                for vld in vld_list:
-                    error_position[-1] = "vld[{}]".format(vld["id"])
-                    if "provider-network" in vld and "overlay-type" in vld["provider-network"]:
-                        del vld["provider-network"]["overlay-type"]
-                error_position.pop()
-                if vld_list:
-                    nsd["vld"] = vld_list
-            error_position = []
-        else:
-            error_position = ["global"]
-            raise KeyError("This is not neither nsd-catalog nor vnfd-catalog descriptor")
+        try:
+            migrate(data, from_version, to_version)
+        except MigrationError as e:
+            error_position = e.position
+            raise
 
-        if format_output_yaml:
-            yaml.dump(data, output, indent=4, default_flow_style=False)
+        if output_file_name:
+            file_name = output_file_name
+            dump_descriptor_file(data, output_file_name, format_output_yaml)
         else:
-            json.dump(data, output)
+            dump_descriptor(data, sys.stdout, format_output_yaml)
         exit(0)
 
     except yaml.YAMLError as exc:
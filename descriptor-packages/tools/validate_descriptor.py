@@ -22,7 +22,18 @@ import json
 import yaml
 import sys
 import getopt
+import glob
+import hashlib
+import importlib
 import os
+import socketserver
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from charm_inspector import CharmError, check_configuration
+from descriptor_loader import find_descriptors, format_profile, load_descriptor, profile_call
+from descriptor_xref import check_files
+from normalize_descriptor import remove_prefix
 
 """
 Tests the format of OSM VNFD and NSD descriptors
@@ -32,6 +43,17 @@ __date__ = "2018-04-16"
 __version__ = "0.0.1"
 version_date = "Apr 2018"
 
+# osm_im module and pyangbind class used to validate each descriptor type
+DESCRIPTOR_MODELS = {
+    "VNF": ("osm_im.vnfd", "vnfd"),
+    "NS": ("osm_im.nsd", "nsd"),
+    "NST": ("osm_im.nst", "nst"),
+}
+# pyangbind classes already imported, by descriptor type
+_model_cache = {}
+# Default location of the validation cache, relative to the current folder
+DEFAULT_CACHE_FILE = os.path.join("build", "validate_descriptor_cache.sqlite")
+
 
 class ArgumentParserError(Exception):
     pass
@@ -40,75 +62,454 @@ class DescriptorValidationError(Exception):
     pass
 
 def usage():
-    print("Usage: {} [options] FILE".format(sys.argv[0]))
+    print("Usage: {} [options] FILE [FILE|DIR|GLOB ...]".format(sys.argv[0]))
     print(" Validates vnfd, nsd and nst descriptors format")
     print(" FILE: a yaml or json vnfd-catalog, nsd-catalog or nst descriptor")
+    print(" DIR, GLOB: folders (walked recursively) or patterns with descriptors. Implies --batch")
     print(" OPTIONS:")
     print("      -v|--version: prints current version")
     print("      -h|--help: shows this help")
     print("      -i|--input FILE: (same as param FILE) descriptor file to be upgraded")
     print("      -c|--charms: looks for the charms folder and validates its coherency with the descriptor")
+    print("      -b|--batch: validates all the descriptors in one process, printing a json result line per file")
+    print("      -j|--jobs N: number of parallel workers in batch mode. By default the number of cpus")
+    print("      -s|--server: keeps the models loaded and validates the json requests read from stdin, one per line:")
+    print("                   {\"file\": FILE, \"charms\": false, \"content\": optional descriptor text}")
+    print("      --socket PATH: same as --server, but listening for requests at the unix socket PATH")
+    print("      --no-cache: validates all descriptors, even those already validated with the same content")
+    print("      --cache-file PATH: validation cache location. By default {}".format(DEFAULT_CACHE_FILE))
+    print("      --cache-stats: prints the validation cache hit rate at the end")
+    print("      --profile: reports parse and validation time and peak memory. In batch mode, on each result line")
+    print("      --xref: also checks nsd references to the vnfds (ids, member indexes, connection points) among all")
+    print("              the descriptors, printing a json line per wrong reference. Implies --batch")
     return
 
 
-def remove_prefix(desc, prefix):
-    """
-    Recursively removes prefix from keys
-    :param desc: dictionary or list to change
-    :param prefix: prefix to remove. Must
-    :return: None, param desc is changed
-    """
-    prefix_len = len(prefix)
-    if isinstance(desc, dict):
-        prefixed_list=[]
-        for k,v in desc.items():
-            if isinstance(v, (list, tuple, dict)):
-                remove_prefix(v, prefix)
-            if isinstance(k, str) and k.startswith(prefix) and k != prefix:
-                prefixed_list.append(k)
-        for k in prefixed_list:
-            desc[k[prefix_len:]] = desc.pop(k)
-    elif isinstance(desc, (list, tuple)):
-        for i in desc:
-            if isinstance(desc, (list, tuple, dict)):
-                remove_prefix(i, prefix)
-
-
 # Mrityunjay Yadav: Function to verify charm included in VNF Package
-def validate_charm(charm, desc_file):
+def validate_charm(charm, desc_file, position=""):
     """
-    Verify charm included in VNF Package and raised error if invalid
+    Verify charm included in VNF Package and raised error if invalid. Charm folders are scanned once per process, and
+    the primitives and their parameters are checked against the charm actions and config options
     :param charm: vnf-configuration/vdu-configuration
     :param desc_file: descriptor file
+    :param position: location of the configuration in the descriptor, used in the error text
     :return: None
     """
-    check_list = ['layer.yaml', 'metadata.yaml', 'actions.yaml', 'actions', 'hooks']
     charm_name = charm['juju']['charm']
     charm_dir = os.path.join(os.path.abspath(os.path.dirname(desc_file)), 'charms', charm_name)
+    try:
+        errors = check_configuration(charm, charm_dir, position)
+    except CharmError as e:
+        raise DescriptorValidationError("Error. Invalid charm in '{}': {}".format(desc_file, e))
+    if errors:
+        raise DescriptorValidationError("Error. Invalid charm in '{}': {}".format(desc_file, "; ".join(errors)))
+
+
+def get_osm_im_version():
+    """
+    Obtains the installed osm_im version from the package metadata, without importing its big modules
+    :return: version text, or "unknown" if it cannot be obtained
+    """
+    try:
+        from importlib.metadata import version
+        for distribution in ("osm_im", "osm-im"):
+            try:
+                return version(distribution)
+            except Exception:
+                pass
+    except ImportError:
+        pass
+    return "unknown"
+
+
+class ValidationCache(object):
+    """
+    On disk index of the descriptors that passed validation, keyed by a hash of the descriptor content, the osm_im
+    version and the validator version. Invalid descriptors are never stored, so their errors are always reported
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.hits = 0
+        self.misses = 0
+        self.enabled = True
+        self._db = None
+        self._salt = "{}\0{}\0".format(get_osm_im_version(), __version__).encode("utf-8")
+
+    def _connect(self):
+        if self._db is None and self.enabled:
+            try:
+                cache_dir = os.path.dirname(self.cache_file)
+                if cache_dir and not os.path.isdir(cache_dir):
+                    os.makedirs(cache_dir)
+                self._db = sqlite3.connect(self.cache_file, timeout=30)
+                self._db.execute("CREATE TABLE IF NOT EXISTS validated (key TEXT PRIMARY KEY, descriptor TEXT)")
+            except (sqlite3.Error, OSError) as e:
+                print("Validation cache '{}' disabled: {}".format(self.cache_file, e), file=sys.stderr)
+                self.enabled = False
+                self._db = None
+        return self._db
+
+    def get_key(self, input_file_name, validate_charms=False):
+        """
+        Computes the cache key of a descriptor file
+        :param input_file_name: descriptor file
+        :param validate_charms: charms folder content is not part of the key, so these validations are not cached
+        :return: key text, or None if this validation cannot be cached
+        """
+        if validate_charms:
+            return None
+        try:
+            with open(input_file_name, 'rb') as f:
+                return hashlib.sha256(self._salt + f.read()).hexdigest()
+        except IOError:
+            return None
+
+    def get(self, key):
+        """
+        Looks for an already validated descriptor
+        :param key: cache key, as returned by get_key
+        :return: the descriptor type if found, None otherwise
+        """
+        db = self._connect() if key else None
+        row = db.execute("SELECT descriptor FROM validated WHERE key = ?", (key,)).fetchone() if db else None
+        if row:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def add(self, key, descriptor):
+        """
+        Stores a descriptor that passed validation
+        :param key: cache key, as returned by get_key
+        :param descriptor: descriptor type
+        :return: None
+        """
+        db = self._connect() if key else None
+        if db:
+            with db:
+                db.execute("INSERT OR REPLACE INTO validated (key, descriptor) VALUES (?, ?)", (key, descriptor))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return "Validation cache: {} hits, {} misses, {:.1f}% hit rate".format(
+            self.hits, self.misses, 100.0 * self.hits / total if total else 0.0)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def get_descriptor_type(data):
+    """
+    Guess the descriptor type from its top level keys
+    :param data: descriptor content
+    :return: "VNF", "NS", "NST" or None if unknown
+    """
+    if "vnfd:vnfd-catalog" in data or "vnfd-catalog" in data:
+        return "VNF"
+    elif "nsd:nsd-catalog" in data or "nsd-catalog" in data:
+        return "NS"
+    elif "nst:nst" in data or "nst" in data:
+        return "NST"
+    return None
+
+
+def get_model(descriptor):
+    """
+    Returns the pyangbind class for a descriptor type. The generated osm_im modules are big, so only the one needed
+    is imported, and only the first time
+    :param descriptor: "VNF", "NS" or "NST"
+    :return: pyangbind class
+    """
+    model = _model_cache.get(descriptor)
+    if not model:
+        module_name, class_name = DESCRIPTOR_MODELS[descriptor]
+        model = getattr(importlib.import_module(module_name), class_name)
+        _model_cache[descriptor] = model
+    return model
+
+
+def validate(data, input_file_name, validate_charms=False):
+    """
+    Validates the content of a vnfd, nsd or nst descriptor. Raises an exception if invalid
+    :param data: descriptor content. It is changed, as prefixes are removed
+    :param input_file_name: descriptor file, used to locate the charms folder
+    :param validate_charms: when True, charms referenced by the descriptor are validated
+    :return: the descriptor type: "VNF", "NS" or "NST"
+    """
+    descriptor = get_descriptor_type(data)
+    if descriptor == "VNF":
+        # Check if mgmt-interface is defined:
+        remove_prefix(data, "vnfd:")
+        vnfd_descriptor = data["vnfd-catalog"]
+        vnfd_list = vnfd_descriptor["vnfd"]
+        mgmt_iface = False
+        for vnfd in vnfd_list:
+            if "vdu" not in vnfd and "kdu" not in vnfd:
+                raise DescriptorValidationError("vdu or kdu not present in the descriptor")
+            vdu_list = vnfd.get("vdu",[])
+            for vdu in vdu_list:
+                interface_list = []
+                external_interface_list = vdu.pop("external-interface", ())
+                for external_interface in external_interface_list:
+                    if external_interface.get("virtual-interface", {}).get("type") == "OM-MGMT":
+                        raise KeyError(
+                            "Wrong 'Virtual-interface type': Deprecated 'OM-MGMT' value. Please, use 'PARAVIRT' instead")
+                interface_list = vdu.get("interface", ())
+                for interface in interface_list:
+                    if interface.get("virtual-interface", {}).get("type") == "OM-MGMT":
+                        raise KeyError(
+                            "Wrong 'Virtual-interface type': Deprecated 'OM-MGMT' value. Please, use 'PARAVIRT' instead")
+                # Mrityunjay yadav: Verify charm if included in vdu
+                if vdu.get("vdu-configuration", False) and validate_charms:
+                    validate_charm(vdu["vdu-configuration"], input_file_name,
+                                   "vnfd[{}]:vdu[{}]:vdu-configuration".format(vnfd.get("id"), vdu.get("id")))
+            if vnfd.get("mgmt-interface"):
+                mgmt_iface = True
+                if vnfd["mgmt-interface"].get("vdu-id"):
+                    raise KeyError("'mgmt-iface': Deprecated 'vdu-id' field. Please, use 'cp' field instead")
+            # Mrityunjay yadav: Verify charm if included in vnf
+            if vnfd.get("vnf-configuration", False) and validate_charms:
+                validate_charm(vnfd["vnf-configuration"], input_file_name,
+                               "vnfd[{}]:vnf-configuration".format(vnfd.get("id")))
+            kdu_list = vnfd.get("kdu",[])
+
+        if not mgmt_iface:
+            raise KeyError("'mgmt-interface' is a mandatory field and it is not defined")
+    elif not descriptor:
+        raise KeyError("This is not neither nsd-catalog nor vnfd-catalog descriptor")
+
+    from pyangbind.lib.serialise import pybindJSONDecoder
+    pybindJSONDecoder.load_ietf_json(data, None, None, obj=get_model(descriptor)())
+    return descriptor
+
+
+def validate_file(input_file_name, validate_charms=False, descriptor_str=None, profile=None):
+    """
+    Loads and validates a descriptor file, converting any failure into an error text
+    :param input_file_name: descriptor file
+    :param validate_charms: when True, charms referenced by the descriptor are validated
+    :param descriptor_str: descriptor text. If provided, it is used instead of reading the file
+    :param profile: if a dictionary is provided, parse and validation time and memory are stored there
+    :return: tuple with the descriptor type (None if unknown) and the error text (None if valid)
+    """
+    file_name = input_file_name
+    descriptor = None
+    try:
+        data, _ = profile_call(profile, "parse", load_descriptor, input_file_name, descriptor_str)
+        file_name = None
+        descriptor = get_descriptor_type(data)
+        profile_call(profile, "validate", validate, data, input_file_name, validate_charms)
+        return descriptor, None
+    except yaml.YAMLError as exc:
+        error_pos = ""
+        if hasattr(exc, 'problem_mark'):
+            mark = exc.problem_mark
+            error_pos = "at line:%s column:%s" % (mark.line + 1, mark.column + 1)
+        return descriptor, "Error loading file '{}'. yaml format error {}".format(input_file_name, error_pos)
+    except DescriptorValidationError as e:
+        return descriptor, str(e)
+    except IOError as e:
+        return descriptor, "Error loading file '{}': {}".format(file_name, e)
+    except ImportError as e:
+        return descriptor, "Package python-osm-im not installed: {}".format(e)
+    except Exception as e:
+        if file_name:
+            return descriptor, "Error loading file '{}': {}".format(file_name, str(e))
+        elif descriptor:
+            return descriptor, "Error. Invalid {} descriptor format in '{}': {}".format(descriptor, input_file_name,
+                                                                                        str(e))
+        else:
+            return descriptor, "Error. Invalid descriptor format in '{}': {}".format(input_file_name, str(e))
 
-    config_primitive = charm.get('config-primitive', [])
-    initial_config_primitive = charm.get('initial-config-primitive', [])
 
-    if charm.get('metrics'):
-        check_list.append('metrics.yaml')
+def _validate_file_result(args):
+    input_file_name, validate_charms, profile = args
+    profile = {} if profile else None
+    descriptor, error = validate_file(input_file_name, validate_charms, profile=profile)
+    return input_file_name, descriptor, error, profile
 
-    if os.path.exists(charm_dir):
-        if not all(item in os.listdir(charm_dir) for item in check_list):
-            raise KeyError("Invalid charm {}".format(charm_name))
-    else:
-        raise KeyError("Provided charm:{} does not exist in descriptor.".format(charm_name))
+
+def _result(input_file_name, descriptor, error):
+    result = {"file": input_file_name, "descriptor": descriptor, "result": "error" if error else "ok"}
+    if error:
+        result["error"] = error
+    return result
+
+
+def validate_batch(paths, validate_charms=False, jobs=None, output=sys.stdout, cache=None, profile=False):
+    """
+    Validates all descriptors found at paths using a pool of processes, so that the descriptor models are imported
+    only once per worker. One json result line is written per file, in the same order as the files are found
+    :param paths: list of files, directories or glob patterns
+    :param validate_charms: when True, charms referenced by the descriptors are validated
+    :param jobs: number of worker processes. By default the number of cpus
+    :param output: where to write the result lines
+    :param cache: ValidationCache used to skip unchanged descriptors. None to validate all of them
+    :param profile: when True, parse and validation time and memory are added to each result line
+    :return: number of invalid descriptors
+    """
+    file_list = find_descriptors(paths)
+    errors = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # cache is only accessed from this process. Workers just validate the descriptors not found there
+        pending = []
+        for input_file_name in file_list:
+            key = cache.get_key(input_file_name, validate_charms) if cache else None
+            descriptor = cache.get(key) if cache else None
+            if descriptor:
+                pending.append((input_file_name, key, descriptor, None))
+            else:
+                pending.append((input_file_name, key, None,
+                                executor.submit(_validate_file_result, (input_file_name, validate_charms, profile))))
+        for input_file_name, key, descriptor, future in pending:
+            if future:
+                input_file_name, descriptor, error, file_profile = future.result()
+                if not error and cache:
+                    cache.add(key, descriptor)
+                result = _result(input_file_name, descriptor, error)
+                if file_profile:
+                    result["profile"] = file_profile
+            else:
+                error = None
+                result = _result(input_file_name, descriptor, error)
+                result["cached"] = True
+            if error:
+                errors += 1
+            print(json.dumps(result), file=output)
+            output.flush()
+    return errors
+
+
+def validate_references(paths, output=sys.stdout):
+    """
+    Checks the references among all descriptors found at paths: nsd constituent vnfds, vld connection points and
+    scaling group members must exist at the vnfds of the same set of descriptors
+    :param paths: list of files, directories or glob patterns
+    :param output: where to write a json line per wrong reference
+    :return: number of wrong references
+    """
+    errors = check_files(find_descriptors(paths))
+    for error in errors:
+        print(json.dumps({"file": error.file, "check": "xref", "result": "error", "position": error.position,
+                          "error": "{} at '{}'".format(error.message, error.position)}), file=output)
+    return len(errors)
+
+
+def validate_file_cached(input_file_name, validate_charms=False, cache=None, profile=None):
+    """
+    Same as validate_file, but skipping the descriptors already validated with the same content
+    :param input_file_name: descriptor file
+    :param validate_charms: when True, charms referenced by the descriptor are validated
+    :param cache: ValidationCache. None to always validate
+    :param profile: if a dictionary is provided, parse and validation time and memory are stored there
+    :return: tuple with the descriptor type (None if unknown) and the error text (None if valid)
+    """
+    key = cache.get_key(input_file_name, validate_charms) if cache else None
+    descriptor = cache.get(key) if cache else None
+    if descriptor:
+        return descriptor, None
+    descriptor, error = validate_file(input_file_name, validate_charms, profile=profile)
+    if not error and cache:
+        cache.add(key, descriptor)
+    return descriptor, error
+
+
+def preload_models():
+    """
+    Imports the models of all the descriptor types, so that the first validation request is not delayed
+    :return: None. Import errors are not raised here, they will be reported on each request
+    """
+    for descriptor in DESCRIPTOR_MODELS:
+        try:
+            get_model(descriptor)
+        except ImportError:
+            pass
+
+
+def process_request(line, validate_charms=False):
+    """
+    Validates one server mode request
+    :param line: json request with keys "file", and optionally "charms", "content" and "id"
+    :param validate_charms: default value when the request does not contain "charms"
+    :return: json result text, with the same keys as batch mode plus "elapsed" seconds and the request "id"
+    """
+    try:
+        request = json.loads(line)
+        input_file_name = request["file"]
+    except (ValueError, KeyError, TypeError) as e:
+        return json.dumps({"result": "error", "error": "Invalid request: {}".format(e)})
+    start = time.time()
+    descriptor, error = validate_file(input_file_name, request.get("charms", validate_charms),
+                                      request.get("content"))
+    result = _result(input_file_name, descriptor, error)
+    result["elapsed"] = round(time.time() - start, 4)
+    if "id" in request:
+        result["id"] = request["id"]
+    return json.dumps(result)
+
+
+def serve(input_stream=sys.stdin, output=sys.stdout, validate_charms=False):
+    """
+    Server mode. Validates the requests read from input_stream, one per line, until it is closed
+    :param input_stream: where to read the json requests from
+    :param output: where to write the json results
+    :param validate_charms: default value when a request does not contain "charms"
+    :return: None
+    """
+    preload_models()
+    for line in input_stream:
+        if line.strip():
+            print(process_request(line, validate_charms), file=output)
+            output.flush()
+
+
+def serve_socket(socket_path, validate_charms=False):
+    """
+    Server mode listening at a unix socket. Each connection can send any number of requests, one per line
+    :param socket_path: unix socket path. It is replaced if it already exists
+    :param validate_charms: default value when a request does not contain "charms"
+    :return: None. It runs until interrupted
+    """
+    class ValidationHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write((process_request(line.decode("utf-8"), validate_charms) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+    preload_models()
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socketserver.UnixStreamServer(socket_path, ValidationHandler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(socket_path)
 
 
 if __name__ == "__main__":
-    error_position = []
-    format_output_yaml = True
     input_file_name = None
-    test_file = None
-    file_name = None
     validate_charms = False
+    batch = False
+    jobs = None
+    server = False
+    socket_path = None
+    use_cache = True
+    cache_file = DEFAULT_CACHE_FILE
+    cache_stats = False
+    cache = None
+    profile = None
+    xref = False
     try:
         # load parameters and configuration
-        opts, args = getopt.getopt(sys.argv[1:], "hvi:o:", ["input=", "help", "version",])
+        opts, args = getopt.getopt(sys.argv[1:], "hvi:cbj:s", ["input=", "help", "version", "charms", "batch",
+                                                               "jobs=", "server", "socket=", "no-cache",
+                                                               "cache-file=", "cache-stats", "profile", "xref"])
 
         for o, a in opts:
             if o in ("-v", "--version"):
@@ -121,103 +522,67 @@ if __name__ == "__main__":
                 input_file_name = a
             elif o in ("-c", "--charms"):
                 validate_charms = True
+            elif o in ("-b", "--batch"):
+                batch = True
+            elif o in ("-j", "--jobs"):
+                jobs = int(a)
+                if jobs < 1:
+                    raise ArgumentParserError("--jobs must be a positive number")
+            elif o in ("-s", "--server"):
+                server = True
+            elif o == "--socket":
+                socket_path = a
+            elif o == "--no-cache":
+                use_cache = False
+            elif o == "--cache-file":
+                cache_file = a
+            elif o == "--cache-stats":
+                cache_stats = True
+            elif o == "--profile":
+                profile = {}
+            elif o == "--xref":
+                xref = batch = True
             else:
                 assert False, "Unhandled option"
-        if not input_file_name:
-            if not args:
-                raise ArgumentParserError("missing DESCRIPTOR_FILE parameter. Type --help for more info")
-            input_file_name = args[0]
-
-        # Open files
-        file_name = input_file_name
-        with open(file_name, 'r') as f:
-            descriptor_str = f.read()
-        file_name = None
+        if socket_path:
+            serve_socket(socket_path, validate_charms)
+            exit(0)
+        elif server:
+            serve(validate_charms=validate_charms)
+            exit(0)
+
+        if input_file_name:
+            args.insert(0, input_file_name)
+        if not args:
+            raise ArgumentParserError("missing DESCRIPTOR_FILE parameter. Type --help for more info")
+        if not batch and (len(args) > 1 or os.path.isdir(args[0]) or glob.has_magic(args[0])):
+            batch = True
 
-        if input_file_name.endswith('.yaml') or input_file_name.endswith('.yml') or not \
-            (input_file_name.endswith('.json') or '\t' in descriptor_str):
-            data = yaml.load(descriptor_str)
-        else:   # json
-            data = json.loads(descriptor_str)
-            format_output_yaml = False
-
-        import osm_im.vnfd as vnfd_catalog
-        import osm_im.nsd as nsd_catalog
-        import osm_im.nst as nst_catalog
-        from pyangbind.lib.serialise import pybindJSONDecoder
-
-        if "vnfd:vnfd-catalog" in data or "vnfd-catalog" in data:
-            descriptor = "VNF"
-            # Check if mgmt-interface is defined:
-            remove_prefix(data, "vnfd:")
-            vnfd_descriptor = data["vnfd-catalog"]
-            vnfd_list = vnfd_descriptor["vnfd"]
-            mgmt_iface = False
-            for vnfd in vnfd_list:
-                if "vdu" not in vnfd and "kdu" not in vnfd:
-                    raise DescriptorValidationError("vdu or kdu not present in the descriptor")
-                vdu_list = vnfd.get("vdu",[])
-                for vdu in vdu_list:
-                    interface_list = []
-                    external_interface_list = vdu.pop("external-interface", ())
-                    for external_interface in external_interface_list:
-                        if external_interface.get("virtual-interface", {}).get("type") == "OM-MGMT":
-                            raise KeyError(
-                                "Wrong 'Virtual-interface type': Deprecated 'OM-MGMT' value. Please, use 'PARAVIRT' instead")
-                    interface_list = vdu.get("interface", ())
-                    for interface in interface_list:
-                        if interface.get("virtual-interface", {}).get("type") == "OM-MGMT":
-                            raise KeyError(
-                                "Wrong 'Virtual-interface type': Deprecated 'OM-MGMT' value. Please, use 'PARAVIRT' instead")
-                    # Mrityunjay yadav: Verify charm if included in vdu
-                    if vdu.get("vdu-configuration", False) and validate_charms:
-                        validate_charm(vdu["vdu-configuration"], input_file_name)
-                if vnfd.get("mgmt-interface"):
-                    mgmt_iface = True
-                    if vnfd["mgmt-interface"].get("vdu-id"):
-                        raise KeyError("'mgmt-iface': Deprecated 'vdu-id' field. Please, use 'cp' field instead")
-                # Mrityunjay yadav: Verify charm if included in vnf
-                if vnfd.get("vnf-configuration", False) and validate_charms:
-                    validate_charm(vnfd["vnf-configuration"], input_file_name)
-                kdu_list = vnfd.get("kdu",[])
-
-            if not mgmt_iface:
-                raise KeyError("'mgmt-interface' is a mandatory field and it is not defined")
-            myvnfd = vnfd_catalog.vnfd()
-            pybindJSONDecoder.load_ietf_json(data, None, None, obj=myvnfd)
-        elif "nsd:nsd-catalog" in data or "nsd-catalog" in data:
-            descriptor = "NS"
-            mynsd = nsd_catalog.nsd()
-            pybindJSONDecoder.load_ietf_json(data, None, None, obj=mynsd)
-        elif "nst:nst" in data or "nst" in data:
-            descriptor = "NST"
-            mynst = nst_catalog.nst()
-            pybindJSONDecoder.load_ietf_json(data, None, None, obj=mynst)
+        if use_cache:
+            cache = ValidationCache(cache_file)
+        if batch:
+            rc = 1 if validate_batch(args, validate_charms, jobs, cache=cache, profile=profile is not None) else 0
+            if xref and validate_references(args):
+                rc = 1
         else:
-            descriptor = None
-            raise KeyError("This is not neither nsd-catalog nor vnfd-catalog descriptor")
-        exit(0)
+            descriptor, error = validate_file_cached(args[0], validate_charms, cache, profile)
+            rc = 1 if error else 0
+            if error:
+                print(error, file=sys.stderr)
+            if profile:
+                print(format_profile(profile), file=sys.stderr)
+        if cache:
+            if cache_stats:
+                print(cache.stats(), file=sys.stderr)
+            cache.close()
+        exit(rc)
 
-    except yaml.YAMLError as exc:
-        error_pos = ""
-        if hasattr(exc, 'problem_mark'):
-            mark = exc.problem_mark
-            error_pos = "at line:%s column:%s" % (mark.line + 1, mark.column + 1)
-        print("Error loading file '{}'. yaml format error {}".format(input_file_name, error_pos), file=sys.stderr)
-    except DescriptorValidationError as e:
-        print(str(e), file=sys.stderr)
-    except ArgumentParserError as e:
+    except (ArgumentParserError, getopt.GetoptError) as e:
         print(str(e), file=sys.stderr)
     except IOError as e:
-        print("Error loading file '{}': {}".format(file_name, e), file=sys.stderr)
-    except ImportError as e:
-        print ("Package python-osm-im not installed: {}".format(e), file=sys.stderr)
-    except Exception as e:
-        if file_name:
-            print("Error loading file '{}': {}".format(file_name, str(e)), file=sys.stderr)
-        else:
-            if descriptor:
-                print("Error. Invalid {} descriptor format in '{}': {}".format(descriptor, input_file_name, str(e)), file=sys.stderr)
-            else:
-                print("Error. Invalid descriptor format in '{}': {}".format(input_file_name, str(e)), file=sys.stderr)
+        print(str(e), file=sys.stderr)
+    except ValueError as e:
+        print("Invalid parameter value: {}".format(e), file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
     exit(1)
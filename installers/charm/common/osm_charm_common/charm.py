@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+import logging
+import time
+import traceback
+from typing import NoReturn
+
+from oci_image import OCIImageResourceError
+from ops.charm import LeaderElectedEvent, UpgradeCharmEvent
+from ops.framework import EventBase
+from ops.model import ActiveStatus, BlockedStatus, MaintenanceStatus, ModelError
+from opslib.osm.charm import CharmedOsmBase, RelationsMissing
+from osm_charm_common.config_cache import ConfigCache
+from osm_charm_common.pod_spec_cache import PodSpecCache
+from pydantic import ValidationError
+
+
+logger = logging.getLogger(__name__)
+
+
+class OsmCharmBase(CharmedOsmBase):
+    """CharmedOsmBase that only sets the pod spec when it changes.
+
+    configure_pod sets the spec built by build_pod_spec through the pod spec
+    cache of the charm. The cache is invalidated while the unit is not the
+    leader, and when it is elected or upgraded, as another leader or the
+    previous version of the charm may have set another spec.
+
+    build_pod_spec should read the config through config_cache, which
+    validates it once per hook. configure_pod logs the cost of each build.
+    """
+
+    def __init__(self, *args, **kwargs) -> NoReturn:
+        super().__init__(*args, **kwargs)
+        self.config_cache = ConfigCache(self.config)
+        self.pod_spec_cache = PodSpecCache(self)
+
+    def configure_pod(self, event: EventBase = None) -> NoReturn:
+        """Assemble the pod spec and apply it, if it has changed.
+
+        Args:
+            event (EventBase): Hook or Relation event that started the
+                               function, if any.
+        """
+        if not self.unit.is_leader() or isinstance(
+            event, (LeaderElectedEvent, UpgradeCharmEvent)
+        ):
+            self.pod_spec_cache.invalidate()
+
+        try:
+            if self.unit.is_leader():
+                self.unit.status = MaintenanceStatus("Assembling pod spec")
+                image_info = self.image.fetch()
+                start = time.perf_counter()
+                pod_spec = self.build_pod_spec(image_info)
+                self.config_cache.log_build(time.perf_counter() - start)
+                self.pod_spec_cache.set_spec(pod_spec)
+            self.unit.status = ActiveStatus("ready")
+        except OCIImageResourceError:
+            self.unit.status = BlockedStatus("Error fetching image information")
+        except ValidationError as e:
+            logger.error(f"Config data validation error: {e}")
+            logger.debug(traceback.format_exc())
+            self.unit.status = BlockedStatus(str(e))
+        except RelationsMissing as e:
+            logger.error(f"Relation missing error: {e.message}")
+            self.unit.status = BlockedStatus(e.message)
+        except ModelError as e:
+            self.unit.status = BlockedStatus(str(e))
+        except Exception as e:
+            error_message = f"Unknown exception: {e}"
+            logger.error(error_message)
+            logger.debug(traceback.format_exc())
+            self.unit.status = BlockedStatus(error_message)
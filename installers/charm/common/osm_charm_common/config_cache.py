@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Mapping, NoReturn, Optional, Type
+
+
+logger = logging.getLogger(__name__)
+
+
+def config_digest(config: Mapping, model_class: Optional[Type[Any]] = None) -> str:
+    """Digest of the raw config, as validated by a model.
+
+    Args:
+        config (Mapping): raw config.
+        model_class (Optional[Type[Any]]): pydantic model validating the config.
+
+    Returns:
+        str: SHA-256 of the canonical JSON of the config and the model fields.
+    """
+    model = (
+        [model_class.__name__, sorted(model_class.__fields__)] if model_class else []
+    )
+    canonical = json.dumps(
+        [model, dict(config)],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ConfigCache:
+    """Validates the config once while it does not change.
+
+    The validated models and the values derived from the config are kept in
+    memory, with the digest of the raw config, for the rest of the hook. They
+    are never stored: the config holds secrets, and a model is only built by
+    validating the config.
+
+    The charm reports each pod spec build with log_build, which logs its cost
+    and the cost of the config validation since the previous build.
+    """
+
+    def __init__(self, config: Mapping) -> NoReturn:
+        self._config = config
+        self._models: Dict[str, Any] = {}
+        self._derived: Dict[str, Any] = {}
+        self.validation_seconds = 0.0
+        self.validated = 0
+        self.cached = 0
+
+    def get(self, model_class: Type[Any]) -> Any:
+        """Get the config validated by a model.
+
+        Args:
+            model_class (Type[Any]): pydantic model validating the config.
+
+        Returns:
+            Any: model instance.
+        """
+        raw = dict(self._config)
+        digest = config_digest(raw, model_class)
+        name = model_class.__name__
+
+        cached = self._models.get(name)
+        if cached and cached[0] == digest:
+            self.cached += 1
+            return cached[1]
+
+        start = time.perf_counter()
+        try:
+            model = model_class(**raw)
+        finally:
+            self.validation_seconds += time.perf_counter() - start
+        self.validated += 1
+        self._models[name] = (digest, model)
+        return model
+
+    def derived(self, name: str, build: Callable[[], Any]) -> Any:
+        """Get a value derived from the config, building it once.
+
+        Args:
+            name (str): name of the value.
+            build (Callable[[], Any]): builds the value from the config.
+
+        Returns:
+            Any: the value.
+        """
+        digest = config_digest(self._config)
+        cached = self._derived.get(name)
+        if cached and cached[0] == digest:
+            return cached[1]
+        value = build()
+        self._derived[name] = (digest, value)
+        return value
+
+    def invalidate(self) -> NoReturn:
+        """Forget the validated config, so that it is validated again."""
+        self._models = {}
+        self._derived = {}
+
+    def log_build(self, seconds: float) -> NoReturn:
+        """Log the cost of a pod spec build and of the config validation.
+
+        Args:
+            seconds (float): time spent building the pod spec.
+        """
+        logger.info(
+            "Hook %s: pod spec built in %.1f ms, "
+            "config validation %.1f ms (%d validated, %d cached)",
+            os.environ.get("JUJU_HOOK_NAME", "-"),
+            seconds * 1000,
+            self.validation_seconds * 1000,
+            self.validated,
+            self.cached,
+        )
+        self.validation_seconds = 0.0
+        self.validated = self.cached = 0
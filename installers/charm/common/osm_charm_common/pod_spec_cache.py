@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, NoReturn, Optional
+
+from ops.framework import Object, StoredState
+
+
+logger = logging.getLogger(__name__)
+
+
+def pod_spec_digest(
+    spec: Dict[str, Any], k8s_resources: Optional[Dict[str, Any]] = None
+) -> str:
+    """Digest of a pod spec, independent of the order of its keys.
+
+    Args:
+        spec (Dict[str, Any]): pod spec.
+        k8s_resources (Optional[Dict[str, Any]]): kubernetes resources.
+
+    Returns:
+        str: SHA-256 of the canonical JSON of the spec and resources.
+    """
+    canonical = json.dumps(
+        [spec, k8s_resources], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class PodSpecCache(Object):
+    """Skips setting a pod spec equal to the last one applied.
+
+    Every pod-spec-set may restart the workload, even if the spec has not
+    changed. The digest of the last spec applied is kept in StoredState, and
+    set_spec only applies specs with a different digest.
+
+    The digest is the one of the last spec set by this unit. Only the leader
+    sets the pod spec, so the charm must invalidate the cache while the unit
+    is not the leader, when it is elected and when it is upgraded.
+    """
+
+    _stored = StoredState()
+
+    def __init__(self, charm, key: str = "pod_spec_cache") -> NoReturn:
+        super().__init__(charm, key)
+        self._stored.set_default(digest=None, hits=0, misses=0)
+        self._pod = charm.model.pod
+
+    @property
+    def hits(self) -> int:
+        """Number of pod specs skipped because they were already applied."""
+        return self._stored.hits
+
+    @property
+    def misses(self) -> int:
+        """Number of pod specs applied."""
+        return self._stored.misses
+
+    def set_spec(
+        self, spec: Dict[str, Any], k8s_resources: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Set the pod spec, if it differs from the last one applied.
+
+        Args:
+            spec (Dict[str, Any]): pod spec.
+            k8s_resources (Optional[Dict[str, Any]]): kubernetes resources.
+
+        Returns:
+            bool: True if the spec has been applied.
+        """
+        digest = pod_spec_digest(spec, k8s_resources)
+        if digest == self._stored.digest:
+            self._stored.hits += 1
+            logger.debug(
+                "Pod spec unchanged, skipping pod-spec-set (hits: %d, misses: %d)",
+                self._stored.hits,
+                self._stored.misses,
+            )
+            return False
+        self._pod.set_spec(spec, k8s_resources)
+        self._stored.digest = digest
+        self._stored.misses += 1
+        logger.info(
+            "Pod spec applied (hits: %d, misses: %d)",
+            self._stored.hits,
+            self._stored.misses,
+        )
+        return True
+
+    def invalidate(self) -> NoReturn:
+        """Forget the last spec applied, so that the next one is applied."""
+        self._stored.digest = None
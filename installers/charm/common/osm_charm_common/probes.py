@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+import math
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class ProbeProfile(NamedTuple):
+    """Probe timings of a component.
+
+    The startup probe gives the component start_budget seconds to pass its
+    health check, as failureThreshold x periodSeconds. The readiness and
+    liveness probes only run after it, so they have no initial delay. The
+    liveness probe uses liveness_timeout, if set, instead of timeout.
+    """
+
+    start_budget: int
+    period: int = 10
+    timeout: int = 5
+    failure_threshold: int = 3
+    liveness_timeout: Optional[int] = None
+
+
+# None of these start budgets is measured. Replace them with the budgets
+# installers/charm/probe_benchmark.py suggests from the start times of real
+# deployments.
+PROFILES = {
+    # 340 seconds, the time installers/osm_health.sh waits for the LCM health
+    # check, 2x(30+140) seconds. The health check is slow, so it runs every 30
+    # seconds with a timeout of 30 seconds.
+    "lcm": ProbeProfile(start_budget=340, period=30, timeout=30),
+    # The old liveness probes of MON, NBI and POL started after 45 seconds and
+    # killed the container after 3 failures every 10 seconds: 75 seconds,
+    # rounded up to the period. The old NBI liveness probe had a timeout of 10
+    # seconds, which it keeps.
+    "mon": ProbeProfile(start_budget=80),
+    "nbi": ProbeProfile(start_budget=80, liveness_timeout=10),
+    "pol": ProbeProfile(start_budget=80),
+    # The old RO liveness probe started after 600 seconds, plus 3 failures
+    # every 10 seconds
+    "ro": ProbeProfile(start_budget=630),
+}
+
+
+def exec_check(*command: str) -> Dict[str, Any]:
+    """Health check running a command in the container.
+
+    Args:
+        command (str): command and arguments. It must exit with 0 if healthy.
+
+    Returns:
+        Dict[str, Any]: probe handler.
+    """
+    return {"exec": {"command": list(command)}}
+
+
+def http_check(path: str, port: int, scheme: str = "HTTP") -> Dict[str, Any]:
+    """Health check with an HTTP GET request.
+
+    Args:
+        path (str): request path.
+        port (int): container port.
+        scheme (str, optional): "HTTP" or "HTTPS". Defaults to "HTTP".
+
+    Returns:
+        Dict[str, Any]: probe handler.
+    """
+    return {"httpGet": {"path": path, "port": port, "scheme": scheme}}
+
+
+def tcp_check(port: int) -> Dict[str, Any]:
+    """Health check opening a TCP connection.
+
+    Args:
+        port (int): container port.
+
+    Returns:
+        Dict[str, Any]: probe handler.
+    """
+    return {"tcpSocket": {"port": port}}
+
+
+def make_startup_probe(check: Dict[str, Any], profile: ProbeProfile) -> Dict[str, Any]:
+    """Generate startup probe.
+
+    Args:
+        check (Dict[str, Any]): probe handler.
+        profile (ProbeProfile): probe timings.
+
+    Returns:
+        Dict[str, Any]: startup probe.
+    """
+    return {
+        **check,
+        "periodSeconds": profile.period,
+        "timeoutSeconds": profile.timeout,
+        "successThreshold": 1,
+        "failureThreshold": math.ceil(profile.start_budget / profile.period),
+    }
+
+
+def make_readiness_probe(
+    check: Dict[str, Any], profile: ProbeProfile
+) -> Dict[str, Any]:
+    """Generate readiness probe.
+
+    Args:
+        check (Dict[str, Any]): probe handler.
+        profile (ProbeProfile): probe timings.
+
+    Returns:
+        Dict[str, Any]: readiness probe.
+    """
+    return {
+        **check,
+        "periodSeconds": profile.period,
+        "timeoutSeconds": profile.timeout,
+        "successThreshold": 1,
+        "failureThreshold": profile.failure_threshold,
+    }
+
+
+def make_liveness_probe(check: Dict[str, Any], profile: ProbeProfile) -> Dict[str, Any]:
+    """Generate liveness probe.
+
+    Args:
+        check (Dict[str, Any]): probe handler.
+        profile (ProbeProfile): probe timings.
+
+    Returns:
+        Dict[str, Any]: liveness probe.
+    """
+    return {
+        **check,
+        "periodSeconds": profile.period,
+        "timeoutSeconds": profile.liveness_timeout or profile.timeout,
+        "successThreshold": 1,
+        "failureThreshold": profile.failure_threshold,
+    }
+
+
+def add_probes(
+    container: Dict[str, Any], check: Dict[str, Any], profile: ProbeProfile
+) -> Dict[str, Any]:
+    """Add the startup, readiness and liveness probes to a container.
+
+    Args:
+        container (Dict[str, Any]): container, as built by ContainerV3Builder.
+        check (Dict[str, Any]): probe handler.
+        profile (ProbeProfile): probe timings.
+
+    Returns:
+        Dict[str, Any]: the container.
+    """
+    container.setdefault("kubernetes", {}).update(
+        {
+            "startupProbe": make_startup_probe(check, profile),
+            "readinessProbe": make_readiness_probe(check, profile),
+            "livenessProbe": make_liveness_probe(check, profile),
+        }
+    )
+    return container
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+import logging
+from typing import Any, Callable, NoReturn
+
+from ops.framework import Object, StoredState
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReconcileScheduler(Object):
+    """Coalesces the events that require rebuilding the pod spec.
+
+    Events only mark the state as dirty. The reconcile runs once, when the
+    framework commits at the end of the hook, no matter how many events
+    (deferred ones included) were handled in it. If it does not run then,
+    the next update-status runs it.
+    """
+
+    _stored = StoredState()
+
+    def __init__(
+        self, charm, reconcile: Callable[[], Any], key: str = "reconcile_scheduler"
+    ) -> NoReturn:
+        super().__init__(charm, key)
+        self._stored.set_default(dirty=False, pending=0, coalesced=0, reconciles=0)
+        self._reconcile = reconcile
+        self.framework.observe(self.framework.on.pre_commit, self._on_pre_commit)
+        self.framework.observe(charm.on.update_status, self._on_update_status)
+
+    @property
+    def dirty(self) -> bool:
+        """True if a reconcile is pending."""
+        return self._stored.dirty
+
+    @property
+    def coalesced(self) -> int:
+        """Number of events that did not need a reconcile of their own."""
+        return self._stored.coalesced
+
+    @property
+    def reconciles(self) -> int:
+        """Number of reconciles run."""
+        return self._stored.reconciles
+
+    def schedule(self, _=None) -> NoReturn:
+        """Mark the state as dirty. Can be used as event handler."""
+        if self._stored.dirty:
+            self._stored.coalesced += 1
+        self._stored.dirty = True
+        self._stored.pending += 1
+
+    def run(self) -> bool:
+        """Run the reconcile, if it is pending.
+
+        Returns:
+            bool: True if the reconcile has been run.
+        """
+        if not self._stored.dirty:
+            return False
+        logger.debug(
+            "Reconciling %d events (%d coalesced in total)",
+            self._stored.pending,
+            self._stored.coalesced,
+        )
+        self._stored.dirty = False
+        self._stored.pending = 0
+        self._stored.reconciles += 1
+        self._reconcile()
+        return True
+
+    def _on_pre_commit(self, _) -> NoReturn:
+        self.run()
+
+    def _on_update_status(self, _) -> NoReturn:
+        self.run()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+from typing import NoReturn
+import unittest
+
+from ops.model import ActiveStatus, BlockedStatus
+from ops.testing import Harness
+from opslib.osm.charm import RelationsMissing
+from osm_charm_common.charm import OsmCharmBase
+
+METADATA = """
+name: test
+resources:
+  image:
+    type: oci-image
+"""
+
+
+class SampleCharm(OsmCharmBase):
+    def __init__(self, *args) -> NoReturn:
+        super().__init__(*args, oci_image="image")
+        self.missing_relations = []
+        self.log_level = "INFO"
+
+    def build_pod_spec(self, image_info):
+        if self.missing_relations:
+            raise RelationsMissing(self.missing_relations)
+        return {
+            "version": 3,
+            "containers": [
+                {
+                    "name": "test",
+                    "imageDetails": image_info,
+                    "envConfig": {"LOG_LEVEL": self.log_level},
+                }
+            ],
+        }
+
+
+class TestOsmCharmBase(unittest.TestCase):
+    """OSM charm base unit tests."""
+
+    def setUp(self) -> NoReturn:
+        """Test setup"""
+        self.harness = Harness(SampleCharm, meta=METADATA)
+        self.harness.set_leader(is_leader=True)
+        self.harness.begin()
+        self.charm = self.harness.charm
+        self.cache = self.charm.pod_spec_cache
+
+    def test_unchanged_spec_set_once(self) -> NoReturn:
+        """Test the pod spec is set once while it does not change."""
+        self.charm.on.config_changed.emit()
+        self.charm.on.update_status.emit()
+
+        self.assertIsInstance(self.charm.unit.status, ActiveStatus)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 1)
+
+        self.charm.log_level = "DEBUG"
+        self.charm.on.update_status.emit()
+
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(
+            self.harness.get_pod_spec()[0]["containers"][0]["envConfig"],
+            {"LOG_LEVEL": "DEBUG"},
+        )
+
+    def test_build_logged(self) -> NoReturn:
+        """Test every pod spec build logs its cost."""
+        with self.assertLogs("osm_charm_common.config_cache", level="INFO") as logs:
+            self.charm.on.config_changed.emit()
+
+        self.assertRegex(logs.output[0], r"pod spec built in [\d.]+ ms")
+
+    def test_spec_set_again_when_elected(self) -> NoReturn:
+        """Test a unit elected again sets the spec, although it did not change."""
+        self.charm.on.config_changed.emit()
+        self.harness.set_leader(is_leader=False)
+        self.charm.on.update_status.emit()
+        self.harness.set_leader(is_leader=True)
+
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_spec_set_again_when_upgraded(self) -> NoReturn:
+        """Test the spec is set after an upgrade, although it did not change."""
+        self.charm.on.config_changed.emit()
+        self.charm.on.upgrade_charm.emit()
+
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_non_leader(self) -> NoReturn:
+        """Test a unit that is not the leader does not set the spec."""
+        self.harness.set_leader(is_leader=False)
+        self.charm.on.config_changed.emit()
+
+        self.assertIsInstance(self.charm.unit.status, ActiveStatus)
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_relations_missing(self) -> NoReturn:
+        """Test the unit is blocked if the spec needs missing relations."""
+        self.charm.missing_relations = ["kafka", "mongodb"]
+        self.charm.on.config_changed.emit()
+
+        self.assertIsInstance(self.charm.unit.status, BlockedStatus)
+        self.assertIn("kafka", self.charm.unit.status.message)
+        self.assertEqual(self.cache.misses, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
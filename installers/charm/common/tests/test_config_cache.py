@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+from typing import NoReturn, Optional
+import unittest
+
+from osm_charm_common.config_cache import ConfigCache
+from pydantic import BaseModel, validator
+
+
+class SampleModel(BaseModel):
+    log_level: str
+    mongodb_uri: Optional[str]
+
+    @validator("log_level")
+    def validate_log_level(cls, v):
+        SampleModel.validations += 1
+        if v not in {"INFO", "DEBUG"}:
+            raise ValueError("value must be INFO or DEBUG")
+        return v
+
+
+class TestConfigCache(unittest.TestCase):
+    """Config cache unit tests."""
+
+    def setUp(self) -> NoReturn:
+        """Test setup"""
+        SampleModel.validations = 0
+        self.config = {"log_level": "INFO", "vca_model_config_test_mode": False}
+        self.cache = ConfigCache(self.config)
+
+    def build(self) -> dict:
+        config = self.cache.get(SampleModel)
+        envs = self.cache.derived(
+            "envs",
+            lambda: {
+                k.upper(): v
+                for k, v in self.config.items()
+                if k.startswith("vca_model_config")
+            },
+        )
+        return {"log_level": config.log_level, "envs": envs}
+
+    def test_validated_once(self) -> NoReturn:
+        """Test the config is validated once while it does not change."""
+        spec = self.build()
+        cached_spec = self.build()
+
+        self.assertEqual(SampleModel.validations, 1)
+        self.assertEqual(self.cache.validated, 1)
+        self.assertEqual(self.cache.cached, 1)
+        self.assertDictEqual(cached_spec, spec)
+        self.assertDictEqual(
+            cached_spec,
+            {"log_level": "INFO", "envs": {"VCA_MODEL_CONFIG_TEST_MODE": False}},
+        )
+
+    def test_validated_on_change(self) -> NoReturn:
+        """Test the config is validated again when it changes."""
+        self.build()
+        self.config.update({"log_level": "DEBUG", "vca_model_config_test_mode": True})
+        spec = self.build()
+
+        self.assertEqual(SampleModel.validations, 2)
+        self.assertDictEqual(
+            spec,
+            {"log_level": "DEBUG", "envs": {"VCA_MODEL_CONFIG_TEST_MODE": True}},
+        )
+
+    def test_invalid_config_not_cached(self) -> NoReturn:
+        """Test a config that fails validation fails on every build."""
+        self.config["log_level"] = "TRACE"
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.build()
+
+        self.assertEqual(SampleModel.validations, 2)
+        self.assertEqual(self.cache.validated, 0)
+
+    def test_invalidate(self) -> NoReturn:
+        """Test the config is validated again once the cache is invalidated."""
+        self.build()
+        self.cache.invalidate()
+        self.build()
+
+        self.assertEqual(SampleModel.validations, 2)
+
+    def test_log_build(self) -> NoReturn:
+        """Test the cost of a build is logged, and the counters reset."""
+        self.build()
+        self.build()
+        with self.assertLogs("osm_charm_common.config_cache", level="INFO") as logs:
+            self.cache.log_build(0.0125)
+
+        self.assertRegex(
+            logs.output[0],
+            r"pod spec built in 12.5 ms, "
+            r"config validation [\d.]+ ms \(1 validated, 1 cached\)",
+        )
+        self.assertEqual(self.cache.validated, 0)
+        self.assertEqual(self.cache.cached, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+from typing import NoReturn
+import unittest
+
+from ops.charm import CharmBase
+from ops.testing import Harness
+from osm_charm_common.pod_spec_cache import pod_spec_digest, PodSpecCache
+
+
+class CachedCharm(CharmBase):
+    def __init__(self, *args) -> NoReturn:
+        super().__init__(*args)
+        self.pod_spec_cache = PodSpecCache(self)
+
+
+class TestPodSpecCache(unittest.TestCase):
+    """Pod spec cache unit tests."""
+
+    def setUp(self) -> NoReturn:
+        """Test setup"""
+        self.harness = Harness(CachedCharm, meta="name: test")
+        self.harness.set_leader(is_leader=True)
+        self.harness.begin()
+        self.cache = self.harness.charm.pod_spec_cache
+        self.pod_spec = {
+            "version": 3,
+            "containers": [{"name": "test", "ports": [{"containerPort": 9999}]}],
+        }
+
+    def test_digest_ignores_key_order(self) -> NoReturn:
+        """Test the digest does not depend on the order of the keys."""
+        reordered = {
+            "containers": [{"ports": [{"containerPort": 9999}], "name": "test"}],
+            "version": 3,
+        }
+        self.assertEqual(pod_spec_digest(self.pod_spec), pod_spec_digest(reordered))
+        self.assertNotEqual(
+            pod_spec_digest(self.pod_spec),
+            pod_spec_digest(self.pod_spec, {"secrets": []}),
+        )
+
+    def test_same_spec_applied_once(self) -> NoReturn:
+        """Test an unchanged spec is not set again."""
+        for _ in range(3):
+            self.cache.set_spec(self.pod_spec)
+
+        self.assertEqual(self.harness.get_pod_spec()[0], self.pod_spec)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 2)
+
+    def test_changed_spec_applied(self) -> NoReturn:
+        """Test a changed spec is set."""
+        self.assertTrue(self.cache.set_spec(self.pod_spec))
+        changed = dict(
+            self.pod_spec, serviceAccount={"automountServiceAccountToken": True}
+        )
+        self.assertTrue(self.cache.set_spec(changed))
+
+        self.assertEqual(self.harness.get_pod_spec()[0], changed)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_invalidate(self) -> NoReturn:
+        """Test the spec is set again after invalidating the cache."""
+        self.cache.set_spec(self.pod_spec)
+        self.cache.invalidate()
+
+        self.assertTrue(self.cache.set_spec(self.pod_spec))
+        self.assertEqual(self.cache.misses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
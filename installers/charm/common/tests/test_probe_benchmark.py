@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+
+import contextlib
+import io
+import os
+import re
+import sys
+import tempfile
+from typing import NoReturn
+import unittest
+from unittest import mock
+
+# probe_benchmark.py is a script of installers/charm, next to the charms
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import probe_benchmark  # noqa: E402  # pylint: disable=import-error
+
+# kubectl logs --timestamps of a NBI container, started at 10:00:00
+NBI_LOG = """\
+2021-06-01T10:00:02.104823517Z INFO nbi.server Starting osm/nbi
+2021-06-01T10:00:03.000000001Z INFO nbi.db Connected to mongo
+
+2021-06-01T10:00:31.5Z [01/Jun/2021:10:00:31] ENGINE Bus STARTING
+2021-06-01T10:00:41.25Z [01/Jun/2021:10:00:41] ENGINE Serving on https://0.0.0.0:9999
+2021-06-01T10:00:41.300000Z [01/Jun/2021:10:00:41] ENGINE Bus STARTED
+2021-06-01T10:05:00.000000000Z [01/Jun/2021:10:05:00] ENGINE Serving on :9999
+"""
+
+
+class TestProbeBenchmark(unittest.TestCase):
+    """Probe benchmark unit tests."""
+
+    def setUp(self) -> NoReturn:
+        self.marker = re.compile(probe_benchmark.READY_MARKERS["nbi"])
+
+    def test_parse_time(self) -> NoReturn:
+        """Testing kubectl timestamps, with up to nanoseconds."""
+        self.assertEqual(
+            (
+                probe_benchmark.parse_time("2021-06-01T10:00:02.104823517Z")
+                - probe_benchmark.parse_time("2021-06-01T10:00:00Z")
+            ).total_seconds(),
+            2.104823,
+        )
+        self.assertEqual(
+            probe_benchmark.parse_time("2021-06-01T10:00:41.25Z").microsecond, 250000
+        )
+
+    def test_time_to_ready(self) -> NoReturn:
+        """Testing the time to ready from the container start."""
+        lines = NBI_LOG.splitlines()
+        started_at = probe_benchmark.parse_time("2021-06-01T10:00:00Z")
+
+        self.assertEqual(
+            probe_benchmark.time_to_ready(lines, self.marker, started_at), 41.25
+        )
+
+    def test_time_to_ready_from_first_line(self) -> NoReturn:
+        """Testing the time to ready from the first line of the log."""
+        lines = NBI_LOG.splitlines()
+
+        self.assertAlmostEqual(
+            probe_benchmark.time_to_ready(lines, self.marker), 39.145177, places=6
+        )
+
+    def test_time_to_ready_not_ready(self) -> NoReturn:
+        """Testing a log without the ready marker."""
+        lines = NBI_LOG.splitlines()[:4]
+
+        self.assertIsNone(probe_benchmark.time_to_ready(lines, self.marker))
+
+    def test_suggest_budget(self) -> NoReturn:
+        """Testing the budget suggested from the 95th percentile."""
+        samples = [30.0] * 19 + [41.25]
+
+        self.assertEqual(probe_benchmark.percentile(samples, 0.95), 30.0)
+        self.assertEqual(probe_benchmark.suggest_budget(samples), 50)
+        self.assertEqual(probe_benchmark.suggest_budget(samples + [41.25]), 70)
+        self.assertEqual(probe_benchmark.suggest_budget(samples, period=30), 60)
+
+    def test_main_with_log(self) -> NoReturn:
+        """Testing the budget suggested from a container log."""
+        with tempfile.NamedTemporaryFile("w", suffix=".log") as log:
+            log.write(NBI_LOG)
+            log.flush()
+            stdout = io.StringIO()
+            argv = ["probe_benchmark.py", "nbi", "--log", log.name]
+
+            with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(
+                stdout
+            ):
+                probe_benchmark.main()
+
+        self.assertEqual(
+            stdout.getvalue().splitlines(),
+            [
+                "nbi: 1 samples, min 39.1s, median 39.1s, p95 39.1s, max 39.1s",
+                '"nbi": ProbeProfile(start_budget=60, period=10),',
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
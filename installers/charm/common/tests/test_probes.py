@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+from typing import NoReturn
+import unittest
+
+from osm_charm_common import probes
+
+
+class TestProbes(unittest.TestCase):
+    """Probes unit tests."""
+
+    def test_checks(self) -> NoReturn:
+        """Testing health checks."""
+        self.assertDictEqual(
+            probes.exec_check("osm-healthcheck", "--verbose"),
+            {"exec": {"command": ["osm-healthcheck", "--verbose"]}},
+        )
+        self.assertDictEqual(
+            probes.http_check("/osm/", 9999, scheme="HTTPS"),
+            {"httpGet": {"path": "/osm/", "port": 9999, "scheme": "HTTPS"}},
+        )
+        self.assertDictEqual(
+            probes.tcp_check(9999),
+            {"tcpSocket": {"port": 9999}},
+        )
+
+    def test_make_startup_probe(self) -> NoReturn:
+        """Testing make startup probe budget."""
+        check = probes.tcp_check(9999)
+
+        probe = probes.make_startup_probe(
+            check, probes.ProbeProfile(start_budget=95, period=10)
+        )
+
+        self.assertDictEqual(
+            probe,
+            {
+                "tcpSocket": {"port": 9999},
+                "periodSeconds": 10,
+                "timeoutSeconds": 5,
+                "successThreshold": 1,
+                "failureThreshold": 10,
+            },
+        )
+        self.assertNotIn("initialDelaySeconds", probe)
+
+    def test_add_probes(self) -> NoReturn:
+        """Testing add probes to a container."""
+        check = probes.exec_check("osm-healthcheck")
+        profile = probes.ProbeProfile(
+            start_budget=60, period=20, timeout=10, failure_threshold=2
+        )
+        container = {"name": "app", "kubernetes": {"securityContext": {}}}
+
+        probes.add_probes(container, check, profile)
+
+        self.assertDictEqual(container["kubernetes"]["securityContext"], {})
+        self.assertEqual(container["kubernetes"]["startupProbe"]["failureThreshold"], 3)
+        for probe in ("readinessProbe", "livenessProbe"):
+            self.assertDictEqual(
+                container["kubernetes"][probe],
+                {
+                    "exec": {"command": ["osm-healthcheck"]},
+                    "periodSeconds": 20,
+                    "timeoutSeconds": 10,
+                    "successThreshold": 1,
+                    "failureThreshold": 2,
+                },
+            )
+
+    def test_liveness_timeout(self) -> NoReturn:
+        """Testing the liveness probe timeout of a profile."""
+        check = probes.tcp_check(9999)
+        profile = probes.ProbeProfile(start_budget=80, liveness_timeout=10)
+
+        self.assertEqual(
+            probes.make_liveness_probe(check, profile)["timeoutSeconds"], 10
+        )
+        self.assertEqual(
+            probes.make_readiness_probe(check, profile)["timeoutSeconds"], 5
+        )
+        self.assertEqual(probes.make_startup_probe(check, profile)["timeoutSeconds"], 5)
+
+    def test_profiles(self) -> NoReturn:
+        """Testing the startup probes keep the start budget of each profile."""
+        for name, profile in probes.PROFILES.items():
+            probe = probes.make_startup_probe(probes.tcp_check(1), profile)
+            budget = probe["failureThreshold"] * probe["periodSeconds"]
+            self.assertGreaterEqual(budget, profile.start_budget, name)
+            self.assertLess(budget - profile.start_budget, profile.period, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+
+from typing import NoReturn
+import unittest
+
+from ops.charm import CharmBase
+from ops.testing import Harness
+from osm_charm_common.reconcile import ReconcileScheduler
+
+METADATA = """
+name: test
+requires:
+  kafka:
+    interface: kafka
+  mongodb:
+    interface: mongodb
+"""
+
+
+class ScheduledCharm(CharmBase):
+    def __init__(self, *args) -> NoReturn:
+        super().__init__(*args)
+        self.reconciles = 0
+        self.reconciler = ReconcileScheduler(self, self.configure_pod)
+        for relation in ("kafka", "mongodb"):
+            self.framework.observe(
+                self.on[relation].relation_changed, self.reconciler.schedule
+            )
+
+    def configure_pod(self, _=None) -> NoReturn:
+        self.reconciles += 1
+
+
+class TestReconcileScheduler(unittest.TestCase):
+    """Reconcile scheduler unit tests."""
+
+    def setUp(self) -> NoReturn:
+        """Test setup"""
+        self.harness = Harness(ScheduledCharm, meta=METADATA)
+        self.harness.begin()
+        self.charm = self.harness.charm
+        self.reconciler = self.charm.reconciler
+
+    def add_relation(self, name: str, data: dict) -> NoReturn:
+        relation_id = self.harness.add_relation(name, name)
+        self.harness.add_relation_unit(relation_id, f"{name}/0")
+        self.harness.update_relation_data(relation_id, f"{name}/0", data)
+
+    def test_events_coalesced_until_commit(self) -> NoReturn:
+        """Test several events run a single reconcile at the end of the hook."""
+        self.add_relation("kafka", {"host": "kafka", "port": "9092"})
+        self.add_relation("mongodb", {"connection_string": "mongodb://mongo"})
+
+        self.assertEqual(self.charm.reconciles, 0)
+        self.assertTrue(self.reconciler.dirty)
+
+        self.harness.framework.commit()
+
+        self.assertEqual(self.charm.reconciles, 1)
+        self.assertEqual(self.reconciler.reconciles, 1)
+        self.assertEqual(self.reconciler.coalesced, 1)
+        self.assertFalse(self.reconciler.dirty)
+
+    def test_no_reconcile_if_clean(self) -> NoReturn:
+        """Test commit and update-status do nothing without events."""
+        self.harness.framework.commit()
+        self.charm.on.update_status.emit()
+
+        self.assertEqual(self.charm.reconciles, 0)
+
+    def test_update_status_runs_pending_reconcile(self) -> NoReturn:
+        """Test update-status runs a reconcile still pending."""
+        self.reconciler.schedule()
+        self.charm.on.update_status.emit()
+
+        self.assertEqual(self.charm.reconciles, 1)
+        self.assertFalse(self.reconciler.run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+
+import contextlib
+import io
+import os
+import sys
+from typing import NoReturn
+import unittest
+
+import yaml
+
+# scaling_overlay.py is a script of installers/charm, next to the charms
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import scaling_overlay  # noqa: E402, I100, I202  # pylint: disable=import-error
+
+SPREAD_NBI = (
+    "tags=anti-pod.app.kubernetes.io/name=nbi,"
+    "anti-pod.topology-key=kubernetes.io/hostname"
+)
+
+
+class TestScalingOverlay(unittest.TestCase):
+    """Scaling overlay unit tests."""
+
+    def test_parse_mem(self) -> NoReturn:
+        """Testing mem constraints, in MiB."""
+        self.assertEqual(scaling_overlay.parse_mem("512"), 512)
+        self.assertEqual(scaling_overlay.parse_mem("512M"), 512)
+        self.assertEqual(scaling_overlay.parse_mem("1.5G"), 1536)
+        self.assertEqual(scaling_overlay.parse_mem("1T"), 1048576)
+        for value in ("", "0", "2Gi", "-1G", "G"):
+            with self.assertRaises(ValueError, msg=value):
+                scaling_overlay.parse_mem(value)
+
+    def test_parse_cpu_power(self) -> NoReturn:
+        """Testing cpu-power constraints."""
+        self.assertEqual(scaling_overlay.parse_cpu_power("500"), 500)
+        for value in ("", "0", "0.5", "500m"):
+            with self.assertRaises(ValueError, msg=value):
+                scaling_overlay.parse_cpu_power(value)
+
+    def test_make_constraints(self) -> NoReturn:
+        """Testing the constraints of an application."""
+        self.assertEqual(scaling_overlay.make_constraints("nbi"), "")
+        self.assertEqual(
+            scaling_overlay.make_constraints("nbi", mem=2048, cpu_power=1000),
+            "mem=2048M cpu-power=1000",
+        )
+        self.assertEqual(
+            scaling_overlay.make_constraints("nbi", spread=True), SPREAD_NBI
+        )
+
+    def test_container_limits(self) -> NoReturn:
+        """Testing the container limits Juju sets for the constraints."""
+        self.assertDictEqual(
+            scaling_overlay.container_limits(
+                "mem=2G cpu-power=1500 " + SPREAD_NBI
+            ),
+            {"memory": "2048Mi", "cpu": "1500m"},
+        )
+        self.assertDictEqual(scaling_overlay.container_limits(SPREAD_NBI), {})
+
+    def test_make_overlay(self) -> NoReturn:
+        """Testing the overlay of several applications."""
+        overlay = scaling_overlay.make_overlay(
+            scales={"nbi": 3, "lcm": 2},
+            mems={"lcm": 4096},
+            cpu_powers={"lcm": 2000, "ro": 1000},
+            spread=["nbi"],
+        )
+
+        self.assertDictEqual(
+            overlay,
+            {
+                "applications": {
+                    "lcm": {"scale": 2, "constraints": "mem=4096M cpu-power=2000"},
+                    "nbi": {"scale": 3, "constraints": SPREAD_NBI},
+                    "ro": {"constraints": "cpu-power=1000"},
+                }
+            },
+        )
+
+    def test_main(self) -> NoReturn:
+        """Testing the overlay written by the script is valid YAML."""
+        stdout = io.StringIO()
+
+        with contextlib.redirect_stdout(stdout):
+            scaling_overlay.main(
+                ["--scale", "nbi=3", "--mem", "nbi=2G", "--spread", "nbi"]
+            )
+
+        self.assertDictEqual(
+            yaml.safe_load(stdout.getvalue()),
+            {
+                "applications": {
+                    "nbi": {"scale": 3, "constraints": "mem=2048M " + SPREAD_NBI}
+                }
+            },
+        )
+
+    def test_main_invalid(self) -> NoReturn:
+        """Testing invalid arguments."""
+        for argv in ([], ["--scale", "nbi=0"], ["--mem", "2G"], ["--scale", "nbi"]):
+            with contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit, msg=argv):
+                    scaling_overlay.main(argv)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,7 +32,7 @@ from urllib.parse import urlparse
 
 from cryptography.fernet import Fernet
 from ops.main import main
-from opslib.osm.charm import CharmedOsmBase, RelationsMissing
+from opslib.osm.charm import RelationsMissing
 from opslib.osm.interfaces.keystone import KeystoneServer
 from opslib.osm.interfaces.mysql import MysqlClient
 from opslib.osm.pod import (
@@ -42,6 +42,8 @@ from opslib.osm.pod import (
     PodSpecV3Builder,
 )
 from opslib.osm.validator import ModelValidator, validator
+from osm_charm_common.charm import OsmCharmBase
+from osm_charm_common.reconcile import ReconcileScheduler
 
 
 logger = logging.getLogger(__name__)
@@ -143,17 +145,18 @@ class ConfigLdapModel(ModelValidator):
         return v
 
 
-class KeystoneCharm(CharmedOsmBase):
+class KeystoneCharm(OsmCharmBase):
     def __init__(self, *args) -> NoReturn:
         super().__init__(*args, oci_image="image")
+        self.reconciler = ReconcileScheduler(self, self.configure_pod)
         self.state.set_default(fernet_keys=None)
         self.state.set_default(credential_keys=None)
         self.state.set_default(keys_timestamp=0)
 
         self.keystone_server = KeystoneServer(self, "keystone")
         self.mysql_client = MysqlClient(self, "db")
-        self.framework.observe(self.on["db"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["db"].relation_broken, self.configure_pod)
+        self.framework.observe(self.on["db"].relation_changed, self.reconciler.schedule)
+        self.framework.observe(self.on["db"].relation_broken, self.reconciler.schedule)
 
         self.framework.observe(
             self.on["keystone"].relation_joined, self._publish_keystone_info
@@ -161,7 +164,7 @@ class KeystoneCharm(CharmedOsmBase):
 
     def _publish_keystone_info(self, event):
         if self.unit.is_leader():
-            config = ConfigModel(**dict(self.config))
+            config = self.config_cache.get(ConfigModel)
             self.keystone_server.publish_info(
                 host=f"http://{self.app.name}:{PORT}/v3",
                 port=PORT,
@@ -244,8 +247,8 @@ class KeystoneCharm(CharmedOsmBase):
 
     def build_pod_spec(self, image_info):
         # Validate config
-        config = ConfigModel(**dict(self.config))
-        config_ldap = ConfigLdapModel(**dict(self.config))
+        config = self.config_cache.get(ConfigModel)
+        config_ldap = self.config_cache.get(ConfigLdapModel)
 
         if config.mysql_host and not self.mysql_client.is_missing_data_in_unit():
             raise Exception("Mysql data cannot be provided via config and relation")
@@ -26,6 +26,7 @@ import unittest
 
 
 from charm import KeystoneCharm
+import mock
 from ops.model import ActiveStatus, BlockedStatus
 from ops.testing import Harness
 
@@ -109,6 +110,27 @@ class TestCharm(unittest.TestCase):
         # Verifying status
         self.assertIsInstance(self.harness.charm.unit.status, BlockedStatus)
 
+    def test_relation_events_reconciled_once(self) -> NoReturn:
+        """Test the relation events of a hook rebuild the pod spec once."""
+        with mock.patch.object(self.harness.framework, "commit"):
+            self.initialize_mysql_relation()
+        self.assertTrue(self.harness.charm.reconciler.dirty)
+
+        self.harness.framework.commit()
+
+        self.assertFalse(self.harness.charm.reconciler.dirty)
+        self.assertEqual(self.harness.charm.reconciler.reconciles, 1)
+        self.assertEqual(self.harness.charm.reconciler.coalesced, 0)
+
+    def test_config_validated_once(self) -> NoReturn:
+        """Test the pod spec is built from the config validated in the hook."""
+        self.initialize_mysql_relation()
+
+        with self.assertLogs("osm_charm_common.config_cache", level="INFO") as logs:
+            self.harness.charm.on.update_status.emit()
+
+        self.assertRegex(logs.output[0], r"\(0 validated, 2 cached\)")
+
     def initialize_mysql_config(self):
         self.harness.update_config(
             {
@@ -132,6 +154,7 @@ class TestCharm(unittest.TestCase):
                 "root_password": "rootmanopw",
             },
         )
+        self.harness.framework.commit()
 
 
 if __name__ == "__main__":
@@ -28,17 +28,21 @@ from typing import NoReturn, Optional
 
 
 from ops.main import main
-from opslib.osm.charm import CharmedOsmBase, RelationsMissing
+from opslib.osm.charm import RelationsMissing
 from opslib.osm.interfaces.http import HttpClient
 from opslib.osm.interfaces.kafka import KafkaClient
 from opslib.osm.interfaces.mongo import MongoClient
 from opslib.osm.pod import ContainerV3Builder, PodSpecV3Builder
 from opslib.osm.validator import ModelValidator, validator
+from osm_charm_common.charm import OsmCharmBase
+from osm_charm_common.probes import add_probes, exec_check, PROFILES
+from osm_charm_common.reconcile import ReconcileScheduler
 
 
 logger = logging.getLogger(__name__)
 
 PORT = 9999
+HEALTH_CHECK = exec_check("python3", "-m", "osm_lcm.lcm", "--health-check")
 
 
 class ConfigModel(ModelValidator):
@@ -123,21 +127,30 @@ class ConfigModel(ModelValidator):
         return v
 
 
-class LcmCharm(CharmedOsmBase):
+class LcmCharm(OsmCharmBase):
     def __init__(self, *args) -> NoReturn:
         super().__init__(*args, oci_image="image")
+        self.reconciler = ReconcileScheduler(self, self.configure_pod)
 
         self.kafka_client = KafkaClient(self, "kafka")
-        self.framework.observe(self.on["kafka"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["kafka"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["kafka"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["kafka"].relation_broken, self.reconciler.schedule
+        )
 
         self.mongodb_client = MongoClient(self, "mongodb")
-        self.framework.observe(self.on["mongodb"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["mongodb"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["mongodb"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["mongodb"].relation_broken, self.reconciler.schedule
+        )
 
         self.ro_client = HttpClient(self, "ro")
-        self.framework.observe(self.on["ro"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["ro"].relation_broken, self.configure_pod)
+        self.framework.observe(self.on["ro"].relation_changed, self.reconciler.schedule)
+        self.framework.observe(self.on["ro"].relation_broken, self.reconciler.schedule)
 
     def _check_missing_dependencies(self, config: ConfigModel):
         missing_relations = []
@@ -154,7 +167,7 @@ class LcmCharm(CharmedOsmBase):
 
     def build_pod_spec(self, image_info):
         # Validate config
-        config = ConfigModel(**dict(self.config))
+        config = self.config_cache.get(ConfigModel)
 
         if config.mongodb_uri and not self.mongodb_client.is_missing_data_in_unit():
             raise Exception("Mongodb data cannot be provided via config and relation")
@@ -212,14 +225,18 @@ class LcmCharm(CharmedOsmBase):
             if config.vca_apiproxy:
                 container_builder.add_env("OSMLCM_VCA_APIPROXY", config.vca_apiproxy)
 
-            model_config_envs = {
-                f"OSMLCM_{k.upper()}": v
-                for k, v in self.config.items()
-                if k.startswith("vca_model_config")
-            }
+            model_config_envs = self.config_cache.derived(
+                "model_config_envs",
+                lambda: {
+                    f"OSMLCM_{k.upper()}": v
+                    for k, v in self.config.items()
+                    if k.startswith("vca_model_config")
+                },
+            )
             if model_config_envs:
                 container_builder.add_envs(model_config_envs)
         container = container_builder.build()
+        add_probes(container, HEALTH_CHECK, PROFILES["lcm"])
 
         # Add container to pod spec
         pod_spec_builder.add_container(container)
@@ -154,9 +154,11 @@ class TestPodSpec(unittest.TestCase):
     def test_make_startup_probe(self) -> NoReturn:
         """Testing make startup probe."""
         expected_result = {
-            "exec": {"command": ["/usr/bin/pgrep python3"]},
-            "initialDelaySeconds": 60,
-            "timeoutSeconds": 5,
+            "exec": {"command": ["python3", "-m", "osm_lcm.lcm", "--health-check"]},
+            "periodSeconds": 30,
+            "timeoutSeconds": 30,
+            "successThreshold": 1,
+            "failureThreshold": 12,
         }
 
         startup_probe = pod_spec._make_startup_probe()
@@ -165,35 +167,29 @@ class TestPodSpec(unittest.TestCase):
 
     def test_make_readiness_probe(self) -> NoReturn:
         """Testing make readiness probe."""
-        port = 9999
-
         expected_result = {
-            "httpGet": {
-                "path": "/osm/",
-                "port": port,
-            },
-            "initialDelaySeconds": 45,
-            "timeoutSeconds": 5,
+            "exec": {"command": ["python3", "-m", "osm_lcm.lcm", "--health-check"]},
+            "periodSeconds": 30,
+            "timeoutSeconds": 30,
+            "successThreshold": 1,
+            "failureThreshold": 3,
         }
 
-        readiness_probe = pod_spec._make_readiness_probe(port)
+        readiness_probe = pod_spec._make_readiness_probe()
 
         self.assertDictEqual(expected_result, readiness_probe)
 
     def test_make_liveness_probe(self) -> NoReturn:
         """Testing make liveness probe."""
-        port = 9999
-
         expected_result = {
-            "httpGet": {
-                "path": "/osm/",
-                "port": port,
-            },
-            "initialDelaySeconds": 45,
-            "timeoutSeconds": 5,
+            "exec": {"command": ["python3", "-m", "osm_lcm.lcm", "--health-check"]},
+            "periodSeconds": 30,
+            "timeoutSeconds": 30,
+            "successThreshold": 1,
+            "failureThreshold": 3,
         }
 
-        liveness_probe = pod_spec._make_liveness_probe(port)
+        liveness_probe = pod_spec._make_liveness_probe()
 
         self.assertDictEqual(expected_result, liveness_probe)
 
@@ -29,18 +29,22 @@ from typing import NoReturn, Optional
 
 
 from ops.main import main
-from opslib.osm.charm import CharmedOsmBase, RelationsMissing
+from opslib.osm.charm import RelationsMissing
 from opslib.osm.interfaces.kafka import KafkaClient
 from opslib.osm.interfaces.keystone import KeystoneClient
 from opslib.osm.interfaces.mongo import MongoClient
 from opslib.osm.interfaces.prometheus import PrometheusClient
 from opslib.osm.pod import ContainerV3Builder, FilesV3Builder, PodSpecV3Builder
 from opslib.osm.validator import ModelValidator, validator
+from osm_charm_common.charm import OsmCharmBase
+from osm_charm_common.probes import add_probes, exec_check, PROFILES
+from osm_charm_common.reconcile import ReconcileScheduler
 
 
 logger = logging.getLogger(__name__)
 
 PORT = 8000
+HEALTH_CHECK = exec_check("osm-mon-healthcheck")
 
 
 def _check_certificate_data(name: str, content: str):
@@ -104,29 +108,42 @@ class ConfigModel(ModelValidator):
         return _extract_certificates(cls.certificates) if cls.certificates else {}
 
 
-class MonCharm(CharmedOsmBase):
+class MonCharm(OsmCharmBase):
     def __init__(self, *args) -> NoReturn:
         super().__init__(*args, oci_image="image")
+        self.reconciler = ReconcileScheduler(self, self.configure_pod)
 
         self.kafka_client = KafkaClient(self, "kafka")
-        self.framework.observe(self.on["kafka"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["kafka"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["kafka"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["kafka"].relation_broken, self.reconciler.schedule
+        )
 
         self.mongodb_client = MongoClient(self, "mongodb")
-        self.framework.observe(self.on["mongodb"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["mongodb"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["mongodb"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["mongodb"].relation_broken, self.reconciler.schedule
+        )
 
         self.prometheus_client = PrometheusClient(self, "prometheus")
         self.framework.observe(
-            self.on["prometheus"].relation_changed, self.configure_pod
+            self.on["prometheus"].relation_changed, self.reconciler.schedule
         )
         self.framework.observe(
-            self.on["prometheus"].relation_broken, self.configure_pod
+            self.on["prometheus"].relation_broken, self.reconciler.schedule
         )
 
         self.keystone_client = KeystoneClient(self, "keystone")
-        self.framework.observe(self.on["keystone"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["keystone"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["keystone"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["keystone"].relation_broken, self.reconciler.schedule
+        )
 
     def _check_missing_dependencies(self, config: ConfigModel):
         missing_relations = []
@@ -155,7 +172,7 @@ class MonCharm(CharmedOsmBase):
 
     def build_pod_spec(self, image_info):
         # Validate config
-        config = ConfigModel(**dict(self.config))
+        config = self.config_cache.get(ConfigModel)
 
         if config.mongodb_uri and not self.mongodb_client.is_missing_data_in_unit():
             raise Exception("Mongodb data cannot be provided via config and relation")
@@ -217,6 +234,7 @@ class MonCharm(CharmedOsmBase):
                 }
             )
         container = container_builder.build()
+        add_probes(container, HEALTH_CHECK, PROFILES["mon"])
 
         # Add container to pod spec
         pod_spec_builder.add_container(container)
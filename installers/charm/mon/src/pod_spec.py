@@ -23,8 +23,18 @@
 import logging
 from typing import Any, Dict, List, NoReturn
 
+from osm_charm_common.probes import (
+    exec_check,
+    make_liveness_probe,
+    make_readiness_probe,
+    make_startup_probe,
+    PROFILES,
+)
+
 logger = logging.getLogger(__name__)
 
+HEALTH_CHECK = exec_check("osm-mon-healthcheck")
+
 
 def _validate_data(
     config_data: Dict[str, Any], relation_data: Dict[str, Any]
@@ -138,52 +148,25 @@ def _make_startup_probe() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: startup probe.
     """
-    return {
-        "exec": {"command": ["/usr/bin/pgrep python3"]},
-        "initialDelaySeconds": 60,
-        "timeoutSeconds": 5,
-    }
+    return make_startup_probe(HEALTH_CHECK, PROFILES["mon"])
 
 
-def _make_readiness_probe(port: int) -> Dict[str, Any]:
+def _make_readiness_probe() -> Dict[str, Any]:
     """Generate readiness probe.
 
-    Args:
-        port (int): [description]
-
     Returns:
         Dict[str, Any]: readiness probe.
     """
-    return {
-        "tcpSocket": {
-            "port": port,
-        },
-        "periodSeconds": 10,
-        "timeoutSeconds": 5,
-        "successThreshold": 1,
-        "failureThreshold": 3,
-    }
+    return make_readiness_probe(HEALTH_CHECK, PROFILES["mon"])
 
 
-def _make_liveness_probe(port: int) -> Dict[str, Any]:
+def _make_liveness_probe() -> Dict[str, Any]:
     """Generate liveness probe.
 
-    Args:
-        port (int): [description]
-
     Returns:
         Dict[str, Any]: liveness probe.
     """
-    return {
-        "tcpSocket": {
-            "port": port,
-        },
-        "initialDelaySeconds": 45,
-        "periodSeconds": 10,
-        "timeoutSeconds": 5,
-        "successThreshold": 1,
-        "failureThreshold": 3,
-    }
+    return make_liveness_probe(HEALTH_CHECK, PROFILES["mon"])
 
 
 def make_pod_spec(
@@ -33,6 +33,7 @@ class OCIImageResourceErrorMock(Exception):
 
 
 sys.path.append("src")
+sys.path.append("../common")
 
 oci_image = mock.MagicMock()
 oci_image.OCIImageResourceError = OCIImageResourceErrorMock
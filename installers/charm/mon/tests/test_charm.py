@@ -25,9 +25,11 @@ import sys
 from typing import NoReturn
 import unittest
 
-from charm import MonCharm
+from charm import HEALTH_CHECK, MonCharm
+import mock
 from ops.model import ActiveStatus, BlockedStatus
 from ops.testing import Harness
+from osm_charm_common.probes import make_liveness_probe, make_startup_probe, PROFILES
 
 
 def encode(content: str):
@@ -144,12 +146,71 @@ class TestCharm(unittest.TestCase):
         # Verifying status
         self.assertIsInstance(self.harness.charm.unit.status, BlockedStatus)
 
+    def test_relation_events_reconciled_once(self) -> NoReturn:
+        """Test the relation events of a hook rebuild the pod spec once."""
+        with mock.patch.object(self.harness.framework, "commit"):
+            self.initialize_kafka_relation()
+            self.initialize_mongo_relation()
+            self.initialize_prometheus_relation()
+            self.initialize_keystone_relation()
+        self.assertTrue(self.harness.charm.reconciler.dirty)
+
+        self.harness.framework.commit()
+
+        self.assertFalse(self.harness.charm.reconciler.dirty)
+        self.assertEqual(self.harness.charm.reconciler.reconciles, 1)
+        self.assertEqual(self.harness.charm.reconciler.coalesced, 3)
+
+    def test_config_validated_once(self) -> NoReturn:
+        """Test the pod spec is built from the config validated in the hook."""
+        self.initialize_kafka_relation()
+        self.initialize_mongo_relation()
+        self.initialize_prometheus_relation()
+        self.initialize_keystone_relation()
+
+        with self.assertLogs("osm_charm_common.config_cache", level="INFO") as logs:
+            self.harness.charm.on.update_status.emit()
+
+        self.assertRegex(logs.output[0], r"\(0 validated, 1 cached\)")
+
+    def test_unchanged_pod_spec_not_set_again(self) -> NoReturn:
+        """Test the pod spec is not set again while it does not change."""
+        self.initialize_kafka_relation()
+        self.initialize_mongo_relation()
+        self.initialize_prometheus_relation()
+        self.initialize_keystone_relation()
+        misses = self.harness.charm.pod_spec_cache.misses
+        hits = self.harness.charm.pod_spec_cache.hits
+
+        self.harness.charm.on.update_status.emit()
+
+        self.assertGreater(misses, 0)
+        self.assertEqual(self.harness.charm.pod_spec_cache.misses, misses)
+        self.assertEqual(self.harness.charm.pod_spec_cache.hits, hits + 1)
+
+    def test_probes(self) -> NoReturn:
+        """Test the container is probed with the MON health check."""
+        self.initialize_kafka_relation()
+        self.initialize_mongo_relation()
+        self.initialize_prometheus_relation()
+        self.initialize_keystone_relation()
+        kubernetes = self.harness.get_pod_spec()[0]["containers"][0]["kubernetes"]
+        profile = PROFILES["mon"]
+
+        self.assertEqual(
+            kubernetes["startupProbe"], make_startup_probe(HEALTH_CHECK, profile)
+        )
+        self.assertEqual(
+            kubernetes["livenessProbe"], make_liveness_probe(HEALTH_CHECK, profile)
+        )
+
     def initialize_kafka_relation(self):
         kafka_relation_id = self.harness.add_relation("kafka", "kafka")
         self.harness.add_relation_unit(kafka_relation_id, "kafka/0")
         self.harness.update_relation_data(
             kafka_relation_id, "kafka/0", {"host": "kafka", "port": 9092}
         )
+        self.harness.framework.commit()
 
     def initialize_mongo_config(self):
         self.harness.update_config({"mongodb_uri": "mongodb://mongo:27017"})
@@ -162,6 +223,7 @@ class TestCharm(unittest.TestCase):
             "mongodb/0",
             {"connection_string": "mongodb://mongo:27017"},
         )
+        self.harness.framework.commit()
 
     def initialize_prometheus_relation(self):
         prometheus_relation_id = self.harness.add_relation("prometheus", "prometheus")
@@ -171,6 +233,7 @@ class TestCharm(unittest.TestCase):
             "prometheus",
             {"hostname": "prometheus", "port": 9090},
         )
+        self.harness.framework.commit()
 
     def initialize_keystone_relation(self):
         keystone_relation_id = self.harness.add_relation("keystone", "keystone")
@@ -193,6 +256,7 @@ class TestCharm(unittest.TestCase):
                 "admin_project_name": "something",
             },
         )
+        self.harness.framework.commit()
 
 
 if __name__ == "__main__":
@@ -96,9 +96,11 @@ class TestPodSpec(unittest.TestCase):
     def test_make_startup_probe(self) -> NoReturn:
         """Testing make startup probe."""
         expected_result = {
-            "exec": {"command": ["/usr/bin/pgrep python3"]},
-            "initialDelaySeconds": 60,
+            "exec": {"command": ["osm-mon-healthcheck"]},
+            "periodSeconds": 10,
             "timeoutSeconds": 5,
+            "successThreshold": 1,
+            "failureThreshold": 8,
         }
 
         startup_probe = pod_spec._make_startup_probe()
@@ -107,38 +109,29 @@ class TestPodSpec(unittest.TestCase):
 
     def test_make_readiness_probe(self) -> NoReturn:
         """Testing make readiness probe."""
-        port = 8000
-
         expected_result = {
-            "tcpSocket": {
-                "port": port,
-            },
+            "exec": {"command": ["osm-mon-healthcheck"]},
             "periodSeconds": 10,
             "timeoutSeconds": 5,
             "successThreshold": 1,
             "failureThreshold": 3,
         }
 
-        readiness_probe = pod_spec._make_readiness_probe(port)
+        readiness_probe = pod_spec._make_readiness_probe()
 
         self.assertDictEqual(expected_result, readiness_probe)
 
     def test_make_liveness_probe(self) -> NoReturn:
         """Testing make liveness probe."""
-        port = 8000
-
         expected_result = {
-            "tcpSocket": {
-                "port": port,
-            },
-            "initialDelaySeconds": 45,
+            "exec": {"command": ["osm-mon-healthcheck"]},
             "periodSeconds": 10,
             "timeoutSeconds": 5,
             "successThreshold": 1,
             "failureThreshold": 3,
         }
 
-        liveness_probe = pod_spec._make_liveness_probe(port)
+        liveness_probe = pod_spec._make_liveness_probe()
 
         self.assertDictEqual(expected_result, liveness_probe)
 
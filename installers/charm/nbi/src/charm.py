@@ -30,7 +30,7 @@ from urllib.parse import urlparse
 
 
 from ops.main import main
-from opslib.osm.charm import CharmedOsmBase, RelationsMissing
+from opslib.osm.charm import RelationsMissing
 from opslib.osm.interfaces.http import HttpServer
 from opslib.osm.interfaces.kafka import KafkaClient
 from opslib.osm.interfaces.keystone import KeystoneClient
@@ -42,11 +42,15 @@ from opslib.osm.pod import (
     PodSpecV3Builder,
 )
 from opslib.osm.validator import ModelValidator, validator
+from osm_charm_common.charm import OsmCharmBase
+from osm_charm_common.probes import add_probes, PROFILES, tcp_check
+from osm_charm_common.reconcile import ReconcileScheduler
 
 
 logger = logging.getLogger(__name__)
 
 PORT = 9999
+HEALTH_CHECK = tcp_check(PORT)
 
 
 class ConfigModel(ModelValidator):
@@ -100,29 +104,42 @@ class ConfigModel(ModelValidator):
         return v
 
 
-class NbiCharm(CharmedOsmBase):
+class NbiCharm(OsmCharmBase):
     def __init__(self, *args) -> NoReturn:
         super().__init__(*args, oci_image="image")
+        self.reconciler = ReconcileScheduler(self, self.configure_pod)
 
         self.kafka_client = KafkaClient(self, "kafka")
-        self.framework.observe(self.on["kafka"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["kafka"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["kafka"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["kafka"].relation_broken, self.reconciler.schedule
+        )
 
         self.mongodb_client = MongoClient(self, "mongodb")
-        self.framework.observe(self.on["mongodb"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["mongodb"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["mongodb"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["mongodb"].relation_broken, self.reconciler.schedule
+        )
 
         self.prometheus_client = PrometheusClient(self, "prometheus")
         self.framework.observe(
-            self.on["prometheus"].relation_changed, self.configure_pod
+            self.on["prometheus"].relation_changed, self.reconciler.schedule
         )
         self.framework.observe(
-            self.on["prometheus"].relation_broken, self.configure_pod
+            self.on["prometheus"].relation_broken, self.reconciler.schedule
         )
 
         self.keystone_client = KeystoneClient(self, "keystone")
-        self.framework.observe(self.on["keystone"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["keystone"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["keystone"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["keystone"].relation_broken, self.reconciler.schedule
+        )
 
         self.http_server = HttpServer(self, "nbi")
         self.framework.observe(self.on["nbi"].relation_joined, self._publish_nbi_info)
@@ -154,7 +171,7 @@ class NbiCharm(CharmedOsmBase):
 
     def build_pod_spec(self, image_info):
         # Validate config
-        config = ConfigModel(**dict(self.config))
+        config = self.config_cache.get(ConfigModel)
 
         if config.mongodb_uri and not self.mongodb_client.is_missing_data_in_unit():
             raise Exception("Mongodb data cannot be provided via config and relation")
@@ -181,16 +198,6 @@ class NbiCharm(CharmedOsmBase):
         # Build Container
         container_builder = ContainerV3Builder(self.app.name, image_info)
         container_builder.add_port(name=self.app.name, port=PORT)
-        container_builder.add_tcpsocket_readiness_probe(
-            PORT,
-            initial_delay_seconds=5,
-            timeout_seconds=5,
-        )
-        container_builder.add_tcpsocket_liveness_probe(
-            PORT,
-            initial_delay_seconds=45,
-            timeout_seconds=10,
-        )
         container_builder.add_envs(
             {
                 # General configuration
@@ -235,6 +242,7 @@ class NbiCharm(CharmedOsmBase):
                 }
             )
         container = container_builder.build()
+        add_probes(container, HEALTH_CHECK, PROFILES["nbi"])
 
         # Add container to pod spec
         pod_spec_builder.add_container(container)
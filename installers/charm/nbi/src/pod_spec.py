@@ -24,6 +24,14 @@ from ipaddress import ip_network
 from typing import Any, Callable, Dict, List, NoReturn
 from urllib.parse import urlparse
 
+from osm_charm_common.probes import (
+    make_liveness_probe,
+    make_readiness_probe,
+    make_startup_probe,
+    PROFILES,
+    tcp_check,
+)
+
 
 def _validate_max_file_size(max_file_size: int, site_url: str) -> bool:
     """Validate max_file_size.
@@ -322,55 +330,40 @@ def _make_pod_ingress_resources(
     return [ingress]
 
 
-def _make_startup_probe() -> Dict[str, Any]:
+def _make_startup_probe(port: int) -> Dict[str, Any]:
     """Generate startup probe.
 
+    Args:
+        port (int): service port.
+
     Returns:
         Dict[str, Any]: startup probe.
     """
-    return {
-        "exec": {"command": ["/usr/bin/pgrep python3"]},
-        "initialDelaySeconds": 60,
-        "timeoutSeconds": 5,
-    }
+    return make_startup_probe(tcp_check(port), PROFILES["nbi"])
 
 
 def _make_readiness_probe(port: int) -> Dict[str, Any]:
     """Generate readiness probe.
 
     Args:
-        port (int): [description]
+        port (int): service port.
 
     Returns:
         Dict[str, Any]: readiness probe.
     """
-    return {
-        "httpGet": {
-            "path": "/osm/",
-            "port": port,
-        },
-        "initialDelaySeconds": 45,
-        "timeoutSeconds": 5,
-    }
+    return make_readiness_probe(tcp_check(port), PROFILES["nbi"])
 
 
 def _make_liveness_probe(port: int) -> Dict[str, Any]:
     """Generate liveness probe.
 
     Args:
-        port (int): [description]
+        port (int): service port.
 
     Returns:
         Dict[str, Any]: liveness probe.
     """
-    return {
-        "httpGet": {
-            "path": "/osm/",
-            "port": port,
-        },
-        "initialDelaySeconds": 45,
-        "timeoutSeconds": 5,
-    }
+    return make_liveness_probe(tcp_check(port), PROFILES["nbi"])
 
 
 def make_pod_spec(
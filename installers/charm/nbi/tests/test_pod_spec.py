@@ -378,13 +378,17 @@ class TestPodSpec(unittest.TestCase):
 
     def test_make_startup_probe(self) -> NoReturn:
         """Testing make startup probe."""
+        port = 9999
+
         expected_result = {
-            "exec": {"command": ["/usr/bin/pgrep python3"]},
-            "initialDelaySeconds": 60,
+            "tcpSocket": {"port": port},
+            "periodSeconds": 10,
             "timeoutSeconds": 5,
+            "successThreshold": 1,
+            "failureThreshold": 8,
         }
 
-        startup_probe = pod_spec._make_startup_probe()
+        startup_probe = pod_spec._make_startup_probe(port)
 
         self.assertDictEqual(expected_result, startup_probe)
 
@@ -393,12 +397,11 @@ class TestPodSpec(unittest.TestCase):
         port = 9999
 
         expected_result = {
-            "httpGet": {
-                "path": "/osm/",
-                "port": port,
-            },
-            "initialDelaySeconds": 45,
+            "tcpSocket": {"port": port},
+            "periodSeconds": 10,
             "timeoutSeconds": 5,
+            "successThreshold": 1,
+            "failureThreshold": 3,
         }
 
         readiness_probe = pod_spec._make_readiness_probe(port)
@@ -410,12 +413,11 @@ class TestPodSpec(unittest.TestCase):
         port = 9999
 
         expected_result = {
-            "httpGet": {
-                "path": "/osm/",
-                "port": port,
-            },
-            "initialDelaySeconds": 45,
-            "timeoutSeconds": 5,
+            "tcpSocket": {"port": port},
+            "periodSeconds": 10,
+            "timeoutSeconds": 10,
+            "successThreshold": 1,
+            "failureThreshold": 3,
         }
 
         liveness_probe = pod_spec._make_liveness_probe(port)
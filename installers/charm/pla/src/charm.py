@@ -27,7 +27,7 @@ import logging
 from typing import NoReturn, Optional
 
 from ops.main import main
-from opslib.osm.charm import CharmedOsmBase, RelationsMissing
+from opslib.osm.charm import RelationsMissing
 from opslib.osm.interfaces.kafka import KafkaClient
 from opslib.osm.interfaces.mongo import MongoClient
 from opslib.osm.pod import (
@@ -35,6 +35,8 @@ from opslib.osm.pod import (
     PodSpecV3Builder,
 )
 from opslib.osm.validator import ModelValidator, validator
+from osm_charm_common.charm import OsmCharmBase
+from osm_charm_common.reconcile import ReconcileScheduler
 
 
 logger = logging.getLogger(__name__)
@@ -60,17 +62,26 @@ class ConfigModel(ModelValidator):
         return v
 
 
-class PlaCharm(CharmedOsmBase):
+class PlaCharm(OsmCharmBase):
     def __init__(self, *args) -> NoReturn:
         super().__init__(*args, oci_image="image")
+        self.reconciler = ReconcileScheduler(self, self.configure_pod)
 
         self.kafka_client = KafkaClient(self, "kafka")
-        self.framework.observe(self.on["kafka"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["kafka"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["kafka"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["kafka"].relation_broken, self.reconciler.schedule
+        )
 
         self.mongodb_client = MongoClient(self, "mongodb")
-        self.framework.observe(self.on["mongodb"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["mongodb"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["mongodb"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["mongodb"].relation_broken, self.reconciler.schedule
+        )
 
     def _check_missing_dependencies(self, config: ConfigModel):
         missing_relations = []
@@ -85,7 +96,7 @@ class PlaCharm(CharmedOsmBase):
 
     def build_pod_spec(self, image_info):
         # Validate config
-        config = ConfigModel(**dict(self.config))
+        config = self.config_cache.get(ConfigModel)
 
         if config.mongodb_uri and not self.mongodb_client.is_missing_data_in_unit():
             raise Exception("Mongodb data cannot be provided via config and relation")
@@ -73,9 +73,11 @@ class TestPodSpec(unittest.TestCase):
     def test_make_startup_probe(self) -> NoReturn:
         """Testing make startup probe."""
         expected_result = {
-            "exec": {"command": ["/usr/bin/pgrep", "python3"]},
-            "initialDelaySeconds": 60,
+            "exec": {"command": ["osm-pol-healthcheck"]},
+            "periodSeconds": 10,
             "timeoutSeconds": 5,
+            "successThreshold": 1,
+            "failureThreshold": 8,
         }
 
         startup_probe = pod_spec._make_startup_probe()
@@ -85,9 +87,7 @@ class TestPodSpec(unittest.TestCase):
     def test_make_readiness_probe(self) -> NoReturn:
         """Testing make readiness probe."""
         expected_result = {
-            "exec": {
-                "command": ["sh", "-c", "osm-pol-healthcheck || exit 1"],
-            },
+            "exec": {"command": ["osm-pol-healthcheck"]},
             "periodSeconds": 10,
             "timeoutSeconds": 5,
             "successThreshold": 1,
@@ -101,10 +101,7 @@ class TestPodSpec(unittest.TestCase):
     def test_make_liveness_probe(self) -> NoReturn:
         """Testing make liveness probe."""
         expected_result = {
-            "exec": {
-                "command": ["sh", "-c", "osm-pol-healthcheck || exit 1"],
-            },
-            "initialDelaySeconds": 45,
+            "exec": {"command": ["osm-pol-healthcheck"]},
             "periodSeconds": 10,
             "timeoutSeconds": 5,
             "successThreshold": 1,
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+"""Measure the time to ready of an OSM component from its container logs.
+
+The time to ready of a container is the time from its start to the first log
+line matching the ready marker of the component. The samples are taken from
+the running pods of the application and, with --restarts, from the pods that
+replace the ones deleted by the benchmark. The start budget suggested for the
+probe profile of the component (common/osm_charm_common/probes.py) is the 95th
+percentile of the samples, with a safety margin, rounded up to the probe period.
+
+    python3 probe_benchmark.py -m osm --restarts 5 nbi
+    kubectl -n osm logs nbi-0 --timestamps > nbi.log
+    python3 probe_benchmark.py nbi --log nbi.log
+"""
+
+import argparse
+from datetime import datetime, timezone
+import json
+import math
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Log lines of a component once it serves requests
+READY_MARKERS = {
+    "nbi": r"ENGINE Serving on",
+    "ro": r"ENGINE Serving on",
+}
+MARGIN = 1.5
+PERIOD = 10
+POLL_INTERVAL = 2
+START_TIMEOUT = 1800
+
+
+def parse_time(timestamp):
+    """Parse an RFC 3339 timestamp of kubectl, with up to nanoseconds."""
+    timestamp = timestamp.rstrip("Z")
+    if "." in timestamp:
+        seconds, fraction = timestamp.split(".")
+        timestamp = "{}.{}".format(seconds, fraction[:6].ljust(6, "0"))
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc)
+
+
+def time_to_ready(lines, marker, started_at=None):
+    """Seconds from the container start to the first line matching the marker.
+
+    Args:
+        lines: log lines, prefixed with their timestamp (kubectl logs --timestamps).
+        marker: compiled ready marker.
+        started_at: container start. Defaults to the time of the first line.
+
+    Returns:
+        float: seconds, None if no line matches the marker.
+    """
+    for line in lines:
+        timestamp, _, message = line.partition(" ")
+        if not timestamp:
+            continue
+        if started_at is None:
+            started_at = parse_time(timestamp)
+        if marker.search(message):
+            return (parse_time(timestamp) - started_at).total_seconds()
+    return None
+
+
+def kubectl(model, *args):
+    return subprocess.run(
+        ["kubectl", "-n", model] + list(args),
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+
+
+def get_pods(model, app):
+    """Started containers of the application, as {pod name: start time}."""
+    pods = json.loads(
+        kubectl(
+            model, "get", "pods", "-l", "app.kubernetes.io/name=" + app, "-o", "json"
+        )
+    )
+    started = {}
+    for pod in pods["items"]:
+        for status in pod["status"].get("containerStatuses", []):
+            running = status["state"].get("running")
+            if status["name"] == app and running:
+                started[pod["metadata"]["name"]] = parse_time(running["startedAt"])
+    return started
+
+
+def sample_pod(model, app, pod, started_at, marker):
+    logs = kubectl(model, "logs", pod, "-c", app, "--timestamps")
+    return time_to_ready(logs.splitlines(), marker, started_at)
+
+
+def wait_ready(model, app, pod, marker, timeout):
+    """Time to ready of the container of a pod, waiting for it to be ready."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        started_at = get_pods(model, app).get(pod)
+        if started_at:
+            seconds = sample_pod(model, app, pod, started_at, marker)
+            if seconds is not None:
+                return seconds
+        time.sleep(POLL_INTERVAL)
+    raise TimeoutError("{} not ready after {} seconds".format(pod, timeout))
+
+
+def restart_samples(model, app, marker, restarts, timeout):
+    """Delete each pod of the application and sample the pods replacing them."""
+    samples = []
+    for _ in range(restarts):
+        for pod in sorted(get_pods(model, app)):
+            before = set(get_pods(model, app).items())
+            kubectl(model, "delete", "pod", pod, "--wait=true")
+            # The replacement is a new container, with the same pod name or not
+            deadline = time.time() + timeout
+            replacement = None
+            while replacement is None:
+                if time.time() > deadline:
+                    raise TimeoutError(
+                        "{} not replaced after {} seconds".format(pod, timeout)
+                    )
+                time.sleep(POLL_INTERVAL)
+                new = set(get_pods(model, app).items()) - before
+                if new:
+                    replacement = sorted(new)[0][0]
+            seconds = wait_ready(model, app, replacement, marker, timeout)
+            print("{}: {:.1f}s".format(replacement, seconds), file=sys.stderr)
+            samples.append(seconds)
+    return samples
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def suggest_budget(samples, margin=MARGIN, period=PERIOD):
+    """Start budget for the probe profile, rounded up to the probe period."""
+    return int(math.ceil(percentile(samples, 0.95) * margin / period) * period)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("app", help="Application (and component) name, e.g. nbi")
+    parser.add_argument(
+        "-m", "--model", default="osm", help="Juju model (kubernetes namespace)"
+    )
+    parser.add_argument(
+        "--component", help="Component of the application, if named differently"
+    )
+    parser.add_argument(
+        "--marker", help="Regular expression of the log line logged once ready"
+    )
+    parser.add_argument(
+        "--restarts",
+        type=int,
+        default=0,
+        help="Times each pod is deleted to take new samples",
+    )
+    parser.add_argument(
+        "--log", nargs="*", help="Timestamped logs to read instead of the running pods"
+    )
+    parser.add_argument(
+        "--margin",
+        type=float,
+        default=MARGIN,
+        help="Safety margin of the suggested budget",
+    )
+    parser.add_argument(
+        "--period", type=int, default=PERIOD, help="Probe period of the component"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=START_TIMEOUT,
+        help="Seconds to wait for each restart",
+    )
+    args = parser.parse_args()
+
+    component = args.component or args.app
+    pattern = args.marker or READY_MARKERS.get(component)
+    if not pattern:
+        parser.error("no ready marker known for {}, use --marker".format(component))
+    marker = re.compile(pattern)
+
+    samples = []
+    if args.log:
+        for path in args.log:
+            with open(path) as log:
+                seconds = time_to_ready(log, marker)
+            if seconds is not None:
+                samples.append(seconds)
+    else:
+        for pod, started_at in get_pods(args.model, args.app).items():
+            seconds = sample_pod(args.model, args.app, pod, started_at, marker)
+            if seconds is not None:
+                samples.append(seconds)
+        samples += restart_samples(
+            args.model, args.app, marker, args.restarts, args.timeout
+        )
+
+    if not samples:
+        sys.exit("No log line matches {}".format(pattern))
+
+    print(
+        "{}: {} samples, min {:.1f}s, median {:.1f}s, p95 {:.1f}s, max {:.1f}s".format(
+            component,
+            len(samples),
+            min(samples),
+            statistics.median(samples),
+            percentile(samples, 0.95),
+            max(samples),
+        )
+    )
+    print(
+        '"{}": ProbeProfile(start_budget={}, period={}),'.format(
+            component, suggest_budget(samples, args.margin, args.period), args.period
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
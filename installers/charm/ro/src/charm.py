@@ -27,12 +27,15 @@ import logging
 from typing import NoReturn, Optional
 
 from ops.main import main
-from opslib.osm.charm import CharmedOsmBase, RelationsMissing
+from opslib.osm.charm import RelationsMissing
 from opslib.osm.interfaces.kafka import KafkaClient
 from opslib.osm.interfaces.mongo import MongoClient
 from opslib.osm.interfaces.mysql import MysqlClient
 from opslib.osm.pod import ContainerV3Builder, FilesV3Builder, PodSpecV3Builder
 from opslib.osm.validator import ModelValidator, validator
+from osm_charm_common.charm import OsmCharmBase
+from osm_charm_common.probes import add_probes, http_check, PROFILES
+from osm_charm_common.reconcile import ReconcileScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -103,24 +106,37 @@ class ConfigModel(ModelValidator):
         return _extract_certificates(cls.certificates) if cls.certificates else {}
 
 
-class RoCharm(CharmedOsmBase):
+class RoCharm(OsmCharmBase):
     """GrafanaCharm Charm."""
 
     def __init__(self, *args) -> NoReturn:
         """Prometheus Charm constructor."""
         super().__init__(*args, oci_image="image")
+        self.reconciler = ReconcileScheduler(self, self.configure_pod)
 
         self.kafka_client = KafkaClient(self, "kafka")
-        self.framework.observe(self.on["kafka"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["kafka"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["kafka"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["kafka"].relation_broken, self.reconciler.schedule
+        )
 
         self.mysql_client = MysqlClient(self, "mysql")
-        self.framework.observe(self.on["mysql"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["mysql"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["mysql"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["mysql"].relation_broken, self.reconciler.schedule
+        )
 
         self.mongodb_client = MongoClient(self, "mongodb")
-        self.framework.observe(self.on["mongodb"].relation_changed, self.configure_pod)
-        self.framework.observe(self.on["mongodb"].relation_broken, self.configure_pod)
+        self.framework.observe(
+            self.on["mongodb"].relation_changed, self.reconciler.schedule
+        )
+        self.framework.observe(
+            self.on["mongodb"].relation_broken, self.reconciler.schedule
+        )
 
         self.framework.observe(self.on["ro"].relation_joined, self._publish_ro_info)
 
@@ -175,7 +191,7 @@ class RoCharm(CharmedOsmBase):
 
     def build_pod_spec(self, image_info):
         # Validate config
-        config = ConfigModel(**dict(self.config))
+        config = self.config_cache.get(ConfigModel)
 
         if config.enable_ng_ro:
             if config.mongodb_uri and not self.mongodb_client.is_missing_data_in_unit():
@@ -203,22 +219,6 @@ class RoCharm(CharmedOsmBase):
             container_builder.add_volume_config("certs", "/certs", certs_files)
 
         container_builder.add_port(name=self.app.name, port=PORT)
-        container_builder.add_http_readiness_probe(
-            "/ro/" if config.enable_ng_ro else "/openmano/tenants",
-            PORT,
-            initial_delay_seconds=10,
-            period_seconds=10,
-            timeout_seconds=5,
-            failure_threshold=3,
-        )
-        container_builder.add_http_liveness_probe(
-            "/ro/" if config.enable_ng_ro else "/openmano/tenants",
-            PORT,
-            initial_delay_seconds=600,
-            period_seconds=10,
-            timeout_seconds=5,
-            failure_threshold=3,
-        )
         container_builder.add_envs(
             {
                 "OSMRO_LOG_LEVEL": config.log_level,
@@ -262,6 +262,11 @@ class RoCharm(CharmedOsmBase):
                 }
             )
         container = container_builder.build()
+        add_probes(
+            container,
+            http_check("/ro/" if config.enable_ng_ro else "/openmano/tenants", PORT),
+            PROFILES["ro"],
+        )
 
         # Add container to pod spec
         pod_spec_builder.add_container(container)
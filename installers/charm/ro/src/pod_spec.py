@@ -23,6 +23,14 @@
 import logging
 from typing import Any, Dict, List, NoReturn
 
+from osm_charm_common.probes import (
+    http_check,
+    make_liveness_probe,
+    make_readiness_probe,
+    make_startup_probe,
+    PROFILES,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -167,17 +175,16 @@ def _make_pod_envconfig(
     return envconfig
 
 
-def _make_startup_probe() -> Dict[str, Any]:
+def _make_startup_probe(port: int) -> Dict[str, Any]:
     """Generate startup probe.
 
+    Args:
+        port (int): service port.
+
     Returns:
         Dict[str, Any]: startup probe.
     """
-    return {
-        "exec": {"command": ["/usr/bin/pgrep", "python3"]},
-        "initialDelaySeconds": 60,
-        "timeoutSeconds": 5,
-    }
+    return make_startup_probe(http_check("/openmano/tenants", port), PROFILES["ro"])
 
 
 def _make_readiness_probe(port: int) -> Dict[str, Any]:
@@ -189,16 +196,7 @@ def _make_readiness_probe(port: int) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: readiness probe.
     """
-    return {
-        "httpGet": {
-            "path": "/openmano/tenants",
-            "port": port,
-        },
-        "periodSeconds": 10,
-        "timeoutSeconds": 5,
-        "successThreshold": 1,
-        "failureThreshold": 3,
-    }
+    return make_readiness_probe(http_check("/openmano/tenants", port), PROFILES["ro"])
 
 
 def _make_liveness_probe(port: int) -> Dict[str, Any]:
@@ -210,17 +208,7 @@ def _make_liveness_probe(port: int) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: liveness probe.
     """
-    return {
-        "httpGet": {
-            "path": "/openmano/tenants",
-            "port": port,
-        },
-        "initialDelaySeconds": 600,
-        "periodSeconds": 10,
-        "timeoutSeconds": 5,
-        "successThreshold": 1,
-        "failureThreshold": 3,
-    }
+    return make_liveness_probe(http_check("/openmano/tenants", port), PROFILES["ro"])
 
 
 def make_pod_spec(
@@ -250,7 +238,7 @@ def make_pod_spec(
 
     ports = _make_pod_ports(port)
     env_config = _make_pod_envconfig(config, relation_state)
-    startup_probe = _make_startup_probe()
+    startup_probe = _make_startup_probe(port)
     readiness_probe = _make_readiness_probe(port)
     liveness_probe = _make_liveness_probe(port)
 
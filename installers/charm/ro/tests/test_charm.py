@@ -27,6 +27,12 @@ import unittest
 from charm import RoCharm
 from ops.model import ActiveStatus, BlockedStatus
 from ops.testing import Harness
+from osm_charm_common.probes import (
+    http_check,
+    make_liveness_probe,
+    make_startup_probe,
+    PROFILES,
+)
 
 
 def encode(content: str):
@@ -127,6 +133,7 @@ class TestCharm(unittest.TestCase):
         self.harness.update_relation_data(
             kafka_relation_id, "kafka/0", {"host": "kafka", "port": 9092}
         )
+        self.harness.framework.commit()
 
         # Initializing the mongodb config
         self.harness.update_config({"mongodb_uri": "mongodb://mongo:27017"})
@@ -145,6 +152,7 @@ class TestCharm(unittest.TestCase):
         self.harness.update_relation_data(
             kafka_relation_id, "kafka/0", {"host": "kafka", "port": 9092}
         )
+        self.harness.framework.commit()
 
         # Initializing the mongo relation
         mongodb_relation_id = self.harness.add_relation("mongodb", "mongodb")
@@ -154,6 +162,7 @@ class TestCharm(unittest.TestCase):
             "mongodb/0",
             {"connection_string": "mongodb://mongo:27017"},
         )
+        self.harness.framework.commit()
 
         # Verifying status
         self.assertNotIsInstance(self.harness.charm.unit.status, BlockedStatus)
@@ -170,6 +179,7 @@ class TestCharm(unittest.TestCase):
             "mongodb/0",
             {"connection_string": "mongodb://mongo:27017"},
         )
+        self.harness.framework.commit()
 
         # Initializing the mongodb config
         self.harness.update_config({"mongodb_uri": "mongodb://mongo:27017"})
@@ -177,6 +187,81 @@ class TestCharm(unittest.TestCase):
         # Verifying status
         self.assertIsInstance(self.harness.charm.unit.status, BlockedStatus)
 
+    def test_relation_events_reconciled_once(self) -> NoReturn:
+        """Test the relation events of a hook rebuild the pod spec once."""
+        kafka_relation_id = self.harness.add_relation("kafka", "kafka")
+        self.harness.add_relation_unit(kafka_relation_id, "kafka/0")
+        self.harness.update_relation_data(
+            kafka_relation_id, "kafka/0", {"host": "kafka", "port": 9092}
+        )
+        mongodb_relation_id = self.harness.add_relation("mongodb", "mongodb")
+        self.harness.add_relation_unit(mongodb_relation_id, "mongodb/0")
+        self.harness.update_relation_data(
+            mongodb_relation_id,
+            "mongodb/0",
+            {"connection_string": "mongodb://mongo:27017"},
+        )
+        self.assertTrue(self.harness.charm.reconciler.dirty)
+
+        self.harness.framework.commit()
+
+        self.assertFalse(self.harness.charm.reconciler.dirty)
+        self.assertEqual(self.harness.charm.reconciler.reconciles, 1)
+        self.assertEqual(self.harness.charm.reconciler.coalesced, 1)
+        self.assertNotIsInstance(self.harness.charm.unit.status, BlockedStatus)
+
+    def test_config_validated_once(self) -> NoReturn:
+        """Test the pod spec is built from the config validated in the hook."""
+        kafka_relation_id = self.harness.add_relation("kafka", "kafka")
+        self.harness.add_relation_unit(kafka_relation_id, "kafka/0")
+        self.harness.update_relation_data(
+            kafka_relation_id, "kafka/0", {"host": "kafka", "port": 9092}
+        )
+        self.harness.update_config({"mongodb_uri": "mongodb://mongo:27017"})
+        self.harness.framework.commit()
+
+        with self.assertLogs("osm_charm_common.config_cache", level="INFO") as logs:
+            self.harness.charm.on.update_status.emit()
+
+        self.assertRegex(logs.output[0], r"\(0 validated, 1 cached\)")
+
+    def test_unchanged_pod_spec_not_set_again(self) -> NoReturn:
+        """Test the pod spec is not set again while it does not change."""
+        kafka_relation_id = self.harness.add_relation("kafka", "kafka")
+        self.harness.add_relation_unit(kafka_relation_id, "kafka/0")
+        self.harness.update_relation_data(
+            kafka_relation_id, "kafka/0", {"host": "kafka", "port": 9092}
+        )
+        self.harness.update_config({"mongodb_uri": "mongodb://mongo:27017"})
+        self.harness.framework.commit()
+        misses = self.harness.charm.pod_spec_cache.misses
+        hits = self.harness.charm.pod_spec_cache.hits
+
+        self.harness.charm.on.update_status.emit()
+
+        self.assertGreater(misses, 0)
+        self.assertEqual(self.harness.charm.pod_spec_cache.misses, misses)
+        self.assertEqual(self.harness.charm.pod_spec_cache.hits, hits + 1)
+
+    def test_probes(self) -> NoReturn:
+        """Test the container is probed with the NG-RO HTTP health check."""
+        kafka_relation_id = self.harness.add_relation("kafka", "kafka")
+        self.harness.add_relation_unit(kafka_relation_id, "kafka/0")
+        self.harness.update_relation_data(
+            kafka_relation_id, "kafka/0", {"host": "kafka", "port": 9092}
+        )
+        self.harness.update_config({"mongodb_uri": "mongodb://mongo:27017"})
+        self.harness.framework.commit()
+        kubernetes = self.harness.get_pod_spec()[0]["containers"][0]["kubernetes"]
+        check = http_check("/ro/", 9090)
+
+        self.assertEqual(
+            kubernetes["startupProbe"], make_startup_probe(check, PROFILES["ro"])
+        )
+        self.assertEqual(
+            kubernetes["livenessProbe"], make_liveness_probe(check, PROFILES["ro"])
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
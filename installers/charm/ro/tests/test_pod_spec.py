@@ -112,13 +112,21 @@ class TestPodSpec(unittest.TestCase):
 
     def test_make_startup_probe(self) -> NoReturn:
         """Testing make startup probe."""
+        port = 9090
+
         expected_result = {
-            "exec": {"command": ["/usr/bin/pgrep", "python3"]},
-            "initialDelaySeconds": 60,
+            "httpGet": {
+                "path": "/openmano/tenants",
+                "port": port,
+                "scheme": "HTTP",
+            },
+            "periodSeconds": 10,
             "timeoutSeconds": 5,
+            "successThreshold": 1,
+            "failureThreshold": 63,
         }
 
-        startup_probe = pod_spec._make_startup_probe()
+        startup_probe = pod_spec._make_startup_probe(port)
 
         self.assertDictEqual(expected_result, startup_probe)
 
@@ -130,6 +138,7 @@ class TestPodSpec(unittest.TestCase):
             "httpGet": {
                 "path": "/openmano/tenants",
                 "port": port,
+                "scheme": "HTTP",
             },
             "periodSeconds": 10,
             "timeoutSeconds": 5,
@@ -149,8 +158,8 @@ class TestPodSpec(unittest.TestCase):
             "httpGet": {
                 "path": "/openmano/tenants",
                 "port": port,
+                "scheme": "HTTP",
             },
-            "initialDelaySeconds": 600,
             "periodSeconds": 10,
             "timeoutSeconds": 5,
             "successThreshold": 1,
@@ -204,14 +213,21 @@ class TestPodSpec(unittest.TestCase):
                     },
                     "kubernetes": {
                         "startupProbe": {
-                            "exec": {"command": ["/usr/bin/pgrep", "python3"]},
-                            "initialDelaySeconds": 60,
+                            "httpGet": {
+                                "path": "/openmano/tenants",
+                                "port": port,
+                                "scheme": "HTTP",
+                            },
+                            "periodSeconds": 10,
                             "timeoutSeconds": 5,
+                            "successThreshold": 1,
+                            "failureThreshold": 63,
                         },
                         "readinessProbe": {
                             "httpGet": {
                                 "path": "/openmano/tenants",
                                 "port": port,
+                                "scheme": "HTTP",
                             },
                             "periodSeconds": 10,
                             "timeoutSeconds": 5,
@@ -222,8 +238,8 @@ class TestPodSpec(unittest.TestCase):
                             "httpGet": {
                                 "path": "/openmano/tenants",
                                 "port": port,
+                                "scheme": "HTTP",
                             },
-                            "initialDelaySeconds": 600,
                             "periodSeconds": 10,
                             "timeoutSeconds": 5,
                             "successThreshold": 1,
@@ -295,14 +311,21 @@ class TestPodSpec(unittest.TestCase):
                     },
                     "kubernetes": {
                         "startupProbe": {
-                            "exec": {"command": ["/usr/bin/pgrep", "python3"]},
-                            "initialDelaySeconds": 60,
+                            "httpGet": {
+                                "path": "/openmano/tenants",
+                                "port": port,
+                                "scheme": "HTTP",
+                            },
+                            "periodSeconds": 10,
                             "timeoutSeconds": 5,
+                            "successThreshold": 1,
+                            "failureThreshold": 63,
                         },
                         "readinessProbe": {
                             "httpGet": {
                                 "path": "/openmano/tenants",
                                 "port": port,
+                                "scheme": "HTTP",
                             },
                             "periodSeconds": 10,
                             "timeoutSeconds": 5,
@@ -313,8 +336,8 @@ class TestPodSpec(unittest.TestCase):
                             "httpGet": {
                                 "path": "/openmano/tenants",
                                 "port": port,
+                                "scheme": "HTTP",
                             },
-                            "initialDelaySeconds": 600,
                             "periodSeconds": 10,
                             "timeoutSeconds": 5,
                             "successThreshold": 1,
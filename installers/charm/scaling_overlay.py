@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# Copyright 2021 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact: legal@canonical.com
+#
+# To get in touch with the maintainers, please contact:
+# osm-charmers@lists.launchpad.net
+##
+"""Generate a bundle overlay scaling the OSM components.
+
+Juju owns the Deployment of each application, and podspec v3 has no keys for
+container resources, pod affinity or a HorizontalPodAutoscaler, so the charms
+cannot set them. The overlay sets what Juju allows instead:
+
+- scale: number of units, that is of pods, of the application.
+- mem and cpu-power constraints: Juju sets them as the memory and CPU limits
+  of the workload container, mem in MiB ("2048Mi") and cpu-power in
+  millicores ("1000m"). Kubernetes requests the same, as no request is set.
+- anti-pod tags constraint (--spread): Juju adds a required pod anti-affinity
+  on the application label, so that no two pods of the application run in the
+  same node. Pods that find no node of their own are not scheduled.
+
+The constraints are applied when the application is deployed:
+
+    python3 scaling_overlay.py --scale nbi=3 --mem nbi=2G --spread nbi > scaling.yaml
+    ../charmed_install.sh --overlay scaling.yaml
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+
+# Label Juju sets on the pods of an application
+APP_LABEL = "app.kubernetes.io/name"
+TOPOLOGY_KEY = "kubernetes.io/hostname"
+MEMORY = re.compile(r"^(\d+(\.\d+)?)([MGTP]?)$")
+MEMORY_UNITS = {"": 1, "M": 1, "G": 1024, "T": 1024 ** 2, "P": 1024 ** 3}
+
+
+def parse_mem(value):
+    """Parse a Juju mem constraint, in MiB unless suffixed by M, G, T or P.
+
+    Returns:
+        int: MiB, rounded up.
+    """
+    match = MEMORY.match(value)
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError("invalid mem constraint: {}".format(value))
+    return math.ceil(float(match.group(1)) * MEMORY_UNITS[match.group(3)])
+
+
+def parse_cpu_power(value):
+    """Parse a Juju cpu-power constraint, in millicores in kubernetes."""
+    if not value.isdigit() or int(value) == 0:
+        raise ValueError("invalid cpu-power constraint: {}".format(value))
+    return int(value)
+
+
+def make_constraints(app, mem=None, cpu_power=None, spread=False):
+    """Juju constraints of an application.
+
+    Args:
+        app: application name.
+        mem: memory limit of the pods, in MiB.
+        cpu_power: CPU limit of the pods, in millicores.
+        spread: run each pod of the application in a different node.
+
+    Returns:
+        str: constraints, empty if none.
+    """
+    constraints = []
+    if mem:
+        constraints.append("mem={}M".format(mem))
+    if cpu_power:
+        constraints.append("cpu-power={}".format(cpu_power))
+    if spread:
+        constraints.append(
+            "tags=anti-pod.{}={},anti-pod.topology-key={}".format(
+                APP_LABEL, app, TOPOLOGY_KEY
+            )
+        )
+    return " ".join(constraints)
+
+
+def container_limits(constraints):
+    """Resource limits Juju sets on the workload container for the constraints."""
+    limits = {}
+    for constraint in constraints.split():
+        key, _, value = constraint.partition("=")
+        if key == "mem":
+            limits["memory"] = "{}Mi".format(parse_mem(value))
+        elif key == "cpu-power":
+            limits["cpu"] = "{}m".format(parse_cpu_power(value))
+    return limits
+
+
+def make_overlay(scales=None, mems=None, cpu_powers=None, spread=()):
+    """Bundle overlay scaling the applications.
+
+    Args:
+        scales: number of units by application.
+        mems: memory limit in MiB by application.
+        cpu_powers: CPU limit in millicores by application.
+        spread: applications with each pod in a different node.
+
+    Returns:
+        dict: overlay.
+    """
+    scales, mems, cpu_powers = scales or {}, mems or {}, cpu_powers or {}
+    applications = {}
+    for app in sorted(set(scales) | set(mems) | set(cpu_powers) | set(spread)):
+        application = {}
+        if app in scales:
+            application["scale"] = scales[app]
+        constraints = make_constraints(
+            app, mems.get(app), cpu_powers.get(app), app in spread
+        )
+        if constraints:
+            application["constraints"] = constraints
+        applications[app] = application
+    return {"applications": applications}
+
+
+def dump_overlay(overlay):
+    """YAML of the overlay, with the constraints quoted."""
+    lines = ["applications:"]
+    for app, application in overlay["applications"].items():
+        lines.append("  {}:".format(app))
+        for key, value in application.items():
+            lines.append("    {}: {}".format(key, json.dumps(value)))
+    return "\n".join(lines) + "\n"
+
+
+def app_values(parse):
+    """Argument type of the APP=VALUE options."""
+
+    def parse_app_value(argument):
+        app, _, value = argument.partition("=")
+        if not app or not value:
+            raise argparse.ArgumentTypeError("expected APP=VALUE: " + argument)
+        try:
+            return app, parse(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    return parse_app_value
+
+
+def parse_scale(value):
+    if not value.isdigit() or int(value) == 0:
+        raise ValueError("invalid scale: {}".format(value))
+    return int(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scale",
+        type=app_values(parse_scale),
+        action="append",
+        default=[],
+        metavar="APP=UNITS",
+        help="Number of pods of the application",
+    )
+    parser.add_argument(
+        "--mem",
+        type=app_values(parse_mem),
+        action="append",
+        default=[],
+        metavar="APP=MEM",
+        help="Memory limit of the pods, in MiB or suffixed by M, G, T or P",
+    )
+    parser.add_argument(
+        "--cpu-power",
+        type=app_values(parse_cpu_power),
+        action="append",
+        default=[],
+        metavar="APP=MILLICORES",
+        help="CPU limit of the pods, in millicores",
+    )
+    parser.add_argument(
+        "--spread",
+        action="append",
+        default=[],
+        metavar="APP",
+        help="Run each pod of the application in a different node",
+    )
+    args = parser.parse_args(argv)
+
+    if not (args.scale or args.mem or args.cpu_power or args.spread):
+        parser.error("nothing to scale")
+
+    overlay = make_overlay(
+        dict(args.scale), dict(args.mem), dict(args.cpu_power), args.spread
+    )
+    sys.stdout.write(dump_overlay(overlay))
+
+
+if __name__ == "__main__":
+    main()
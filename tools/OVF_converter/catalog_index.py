@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+# #
+# Copyright 2019 VMware Inc.
+# This file is part of ETSI OSM
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact:  osslegalrouting@vmware.com
+# #
+
+"""
+Index of the catalogs of a vCD org by name, shared by the uploader tools. The catalog list is requested once and kept
+for some time, instead of listing all the catalogs of the org to look up each name
+"""
+
+import threading
+import time
+
+# Seconds the catalog list of an org is kept before requesting it again
+CATALOG_TTL = 300
+
+
+class CatalogIndex(object):
+    """
+    Catalog name to id of an org. Catalogs created through the tools must be notified with add. Users of an id must
+    invalidate the index and look it up again if the catalog is not found, as it may have been deleted since
+    """
+
+    def __init__(self, org, ttl=CATALOG_TTL):
+        self.org = org
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.catalogs = None
+        self.loaded = 0
+
+    def _load(self):
+        if self.catalogs is None or time.time() - self.loaded > self.ttl:
+            self.catalogs = {catalog['name']: catalog['id'] for catalog in self.org.list_catalogs()}
+            self.loaded = time.time()
+        return self.catalogs
+
+    def get_id(self, name):
+        """
+            Method to get the id of a catalog
+            Args :
+                name : catalog name
+            Return : catalog id, None if the org has no catalog with that name
+        """
+        with self.lock:
+            return self._load().get(name)
+
+    def add(self, name, catalog_id):
+        with self.lock:
+            if self.catalogs is not None:
+                self.catalogs[name] = catalog_id
+
+    def invalidate(self):
+        """ Method to discard the catalog list, so that it is requested again on next use """
+        with self.lock:
+            self.catalogs = None
+
+
+# CatalogIndex by org href
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_catalog_index(org):
+    """
+        Method to get the shared catalog index of an org
+        Args :
+            org : pyvcloud Org
+        Return : CatalogIndex
+    """
+    with _lock:
+        index = _indexes.get(org.href)
+        if index is None:
+            index = CatalogIndex(org)
+            _indexes[org.href] = index
+        else:
+            # keep the most recent Org object, whose client has a live session
+            index.org = org
+        return index
@@ -22,12 +22,23 @@
 # contact:  osslegalrouting@vmware.com
 # #
 
+import difflib
+import functools
+import json
 import logging
 import os
+import re
+import selectors
 import subprocess
+import tempfile
+import threading
+import time
 import yaml
+from collections import namedtuple
 from lxml import etree as ET
 
+import vmdk
+
 # file paths
 MODULE_DIR = os.path.dirname(__file__)
 OVF_TEMPLATE_PATH = os.path.join(MODULE_DIR,
@@ -52,6 +63,24 @@ logger.setLevel(10)
 __version__ = "1.2"
 __description__ = "OVF Hardware Version 14 compatible"
 
+# size of each read from the output pipes of executed commands
+READ_CHUNK_SIZE = 64 * 1024
+# qemu-img -p progress, as "    (12.34/100%)"
+PROGRESS_RE = re.compile(rb"\((\d+(?:\.\d+)?)/100%\)")
+
+# qemu-img info results, by source image path
+IMAGE_INFO_CACHE_FILE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                     "ovf_converter", "image_info.json")
+_image_info_lock = threading.Lock()
+
+# Source image properties given by qemu-img info.
+# format: qemu-img format name, virtual_size: disk capacity in bytes, actual_size: bytes used on disk
+ImageInfo = namedtuple("ImageInfo", ["format", "virtual_size", "actual_size"])
+
+# Progress of an image conversion, passed to the progress callback.
+# source: source image path, percent: 0 to 100, elapsed: seconds since start, eta: estimated seconds left or None
+ConversionProgress = namedtuple("ConversionProgress", ["source", "percent", "elapsed", "eta"])
+
 
 def get_version(*args, **kwargs):
     """ get version of this application"""
@@ -59,13 +88,131 @@ def get_version(*args, **kwargs):
     return version
 
 
+def _read_yaml_file(file_path):
+    with open(file_path) as data_file:
+        return yaml.load(data_file, Loader=yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=None)
+def get_os_types():
+    """
+        Method to get the supported OS types, read once per process
+        Return : dict of OS ID: OS type name, in file order. It must not be changed
+    """
+    return {str(os_id): str(os_type) for os_id, os_type in (_read_yaml_file(OS_INFO_FILE_PATH) or {}).items()}
+
+
+@functools.lru_cache(maxsize=None)
+def _os_type_index():
+    # case folded OS type name: (OS ID, OS type name)
+    return {os_type.casefold(): (os_id, os_type) for os_id, os_type in get_os_types().items()}
+
+
+def find_os_type(os_type):
+    """
+        Method to look for an OS type, ignoring case
+        Args :
+            os_type : OS type name
+        Return : tuple (OS ID, OS type name), (None, None) if not found
+    """
+    return _os_type_index().get(str(os_type).strip().casefold(), (None, None))
+
+
+def suggest_os_types(os_type, count=3):
+    """
+        Method to get the OS types most similar to a wrong one
+        Args :
+            os_type : OS type name not found
+            count : maximum number of suggestions
+        Return : list of OS type names, most similar first
+    """
+    index = _os_type_index()
+    matches = difflib.get_close_matches(str(os_type).strip().casefold(), index, n=count, cutoff=0.6)
+    return [index[match][1] for match in matches]
+
+
+@functools.lru_cache(maxsize=None)
+def _disk_controller_index():
+    # case folded controller name, with and without " controller":
+    #   (controller name, controller info, dict of case folded subtype: subtype)
+    index = {}
+    for name, info in (_read_yaml_file(DISK_CONTROLLER_INFO_FILE_PATH) or {}).items():
+        entry = (name, info, {subtype.casefold(): subtype for subtype in info.get("ResourceSubTypes") or ()})
+        index[name.casefold()] = entry
+        short_name = name.casefold().replace(" controller", "")
+        index.setdefault(short_name, entry)
+    return index
+
+
+def _read_image_info_cache(cache_file):
+    try:
+        with open(cache_file) as data_file:
+            return json.load(data_file)
+    except (IOError, ValueError):
+        return {}
+
+
+def _write_image_info_cache(cache_file, cache):
+    # written to a temporary file that replaces the cache, so concurrent readers never see a partial file
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as data_file:
+            json.dump(cache, data_file)
+        os.replace(tmp_file, cache_file)
+    except Exception:
+        os.remove(tmp_file)
+        raise
+
+
+def get_image_info(image_path, cache_file=IMAGE_INFO_CACHE_FILE):
+    """
+        Method to get the properties of a disk image with qemu-img info. Results are
+        cached on disk, and reused while the image path, size, modification time and
+        inode do not change
+        Args :
+            image_path : disk image
+            cache_file : json file where results are cached. None to not use the cache
+        Return : ImageInfo
+        Raises : Exception if qemu-img fails or its output cannot be parsed
+    """
+    image_path = os.path.realpath(image_path)
+    st = os.stat(image_path)
+    signature = [st.st_size, st.st_mtime_ns, st.st_ino]
+    if cache_file:
+        with _image_info_lock:
+            cached = _read_image_info_cache(cache_file).get(image_path)
+        if cached and cached["signature"] == signature:
+            return ImageInfo(**cached["info"])
+
+    proc = subprocess.run(["qemu-img", "info", "--output=json", image_path], stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, stdin=subprocess.DEVNULL)
+    if proc.returncode:
+        raise Exception("qemu-img info failed with return code {}: {}".format(
+            proc.returncode, proc.stderr.decode(errors="replace").strip()))
+    data = json.loads(proc.stdout.decode())
+    info = ImageInfo(format=data["format"], virtual_size=int(data["virtual-size"]),
+                     actual_size=int(data.get("actual-size", st.st_size)))
+
+    if cache_file:
+        with _image_info_lock:
+            cache = _read_image_info_cache(cache_file)
+            cache[image_path] = {"signature": signature, "info": info._asdict()}
+            try:
+                _write_image_info_cache(cache_file, cache)
+            except (IOError, OSError):
+                pass    # the cache is an optimization only
+    return info
+
+
 # converter class
 class OVFConverter(object):
     """ Class to convert input image into OVF format """
 
     def __init__(self, source_img_path, output_location=None, output_ovf_name=None,
                  memory=None, cpu=None, disk=None, os_type=None,
-                 disk_controller=None, cdrom=None, hwversion=14):
+                 disk_controller=None, cdrom=None, hwversion=14, progress_callback=None, logger=None,
+                 console=True):
         """
             Constructor to initialize object of class OVFConverter
             Args:
@@ -84,12 +231,21 @@ class OVFConverter(object):
                               (default controller SCSI with lsilogicsas)
                               (SATA, IDE, Paravirtual, Buslogic, Lsilogic, Lsilogicsas) (optional)
             hwversion -       VMware ESXi hardware family version (optional)
+            progress_callback - function called with a ConversionProgress each time the disk
+                              conversion progresses. If not given, qemu-img progress is
+                              printed (optional)
+            logger -          logger for this conversion. If not given, module logger writing
+                              to logs/ovf_converter.log is used (optional)
+            console -         print the steps of the conversion on stdout. If False, as when
+                              several images are converted at once, they are only logged (optional)
 
             Returns:
                 Nothing.
         """
-        self.logger = logger
+        self.logger = logger or logging.getLogger(__name__)
+        self.console = console
         self.ovf_template_path = OVF_TEMPLATE_PATH
+        self.progress_callback = progress_callback
 
         self.source_img_path = source_img_path
         self.source_img_filename, file_extension = os.path.splitext(os.path.basename(self.source_img_path))
@@ -103,7 +259,9 @@ class OVFConverter(object):
         self.output_path = os.path.join(self.output_location, self.output_ovf_name_ext)
 
         self.output_diskimage_format = "vmdk"
-        self.output_diskimage_name = self.source_img_filename + "." + self.output_diskimage_format
+        # named as the OVF, so that images with the same name in different folders can be converted to the same
+        # location with different OVF names
+        self.output_diskimage_name = self.output_ovf_name + "." + self.output_diskimage_format
         self.output_diskimage_path = os.path.join(self.output_location, self.output_diskimage_name)
 
         self.logger.info("Input parameters to Converter: \n ovf_template_path = {}, \n source_img_path = {}, \n"
@@ -118,8 +276,8 @@ class OVFConverter(object):
                                                                self.output_location, self.output_path,
                                                                self.output_diskimage_name, self.output_diskimage_path))
 
-        self.disk_capacity = 1
-        self.disk_populated_size = 0
+        self.image_info = None
+        self.vmdk_header = None
 
         self.vm_name = self.output_ovf_name
         self.memory = str(memory) if memory is not None else None
@@ -132,6 +290,9 @@ class OVFConverter(object):
             self.osID, self.osType = self.__get_osType()
             if self.osID is None or self.osType is None:
                 error_msg = "ERROR: Invalid input can not find OS type {} ".format(self.os_type)
+                suggestions = suggest_os_types(self.os_type)
+                if suggestions:
+                    error_msg = error_msg.rstrip() + ". Did you mean: {}?".format(", ".join(suggestions))
                 self.__raise_exception(error_msg)
 
         self.disk_controller = str(disk_controller).strip() if disk_controller else None
@@ -173,41 +334,15 @@ class OVFConverter(object):
             Return : True on success else False
         """
         try:
-            print("Getting source image information")
-            command = "qemu-img info \t " + self.source_img_path
-            output, error, returncode = self.__execute_command(command)
-
-            if error or returncode:
-                self.logger.error("ERROR: Error occurred while getting information about source image : {} \n "
-                                  "return code : {} ".format(error, returncode))
-                return False
-
-            elif output:
-                self.logger.info("Get Image Info Output : {} \n ".format(output))
-                split_output = output.decode().split("\n")
-                for line in split_output:
-                    line = line.strip()
-                    if "virtual size" in line:
-                        virtual_size_info = line.split(":")[1].split()
-                        if len(virtual_size_info) == 3 and virtual_size_info[2].strip(")") == "bytes":
-                            self.disk_capacity = int(virtual_size_info[1].strip("("))
-                        else:
-                            self.disk_capacity = self.__convert_size(virtual_size_info[0])
-
-                    elif "disk size" in line:
-                        size = line.split(":")[1].split()[0]
-                        self.disk_populated_size = self.__convert_size(size)
-                    elif "file format" in line:
-                        self.source_format = line.split(":")[1]
-
-                self.logger.info("Updated source image virtual disk capacity : {} ,"
-                                 "Updated source image populated size: {}".format(self.disk_capacity,
-                                                                                  self.disk_populated_size))
-                return True
+            self.__report("Getting source image information")
+            self.image_info = get_image_info(self.source_img_path)
+            self.source_format = self.image_info.format
+            self.logger.info("Source image info: {}".format(self.image_info))
+            return True
         except Exception as exp:
             error_msg = "ERROR: Error occurred while getting information about source image : {}".format(exp)
             self.logger.error(error_msg)
-            print(error_msg)
+            self.__report(error_msg, logged=True)
             return False
 
     def __convert_image(self):
@@ -217,18 +352,19 @@ class OVFConverter(object):
             Return : True on success else False
         """
 
-        print("Converting source disk image to .vmdk ")
+        self.__report("Converting source disk image to .vmdk ")
 
         command = "qemu-img convert -p -f " + self.source_format + " -O " + self.output_diskimage_format + \
             " -o subformat=streamOptimized " + self.source_img_path + " " + self.output_diskimage_path
 
-        _, error, returncode = self.__execute_command(command, show_output=True)
+        _, error, returncode = self.__execute_command(command, show_output=True,
+                                                      progress_callback=self.progress_callback)
 
         if error or returncode:
             error_msg = "ERROR: Error occurred while converting source disk image into vmdk: {}\n" + \
                 "return code : {} ".format(error, returncode)
             self.logger.error(error_msg)
-            print(error_msg)
+            self.__report(error_msg, logged=True)
             return False
         else:
             if os.path.isfile(self.output_diskimage_path):
@@ -239,36 +375,43 @@ class OVFConverter(object):
                 result = self.__make_image_bootable()
                 if result:
                     self.logger.info("Made {} bootable".format(self.output_diskimage_path))
-                    print("Output VMDK is at: {}".format(self.output_diskimage_path))
+                    self.__report("Output VMDK is at: {}".format(self.output_diskimage_path))
                     return True
                 else:
                     self.logger.error("Cannot make {} bootable".format(self.output_diskimage_path))
-                    print("ERROR: Fail to convert source image into .vmdk")
+                    self.__report("ERROR: Fail to convert source image into .vmdk")
                     return False
             else:
                 self.logger.error("Converted vmdk disk file {} is not present \n ".format(
                     self.output_diskimage_path))
-                print("Fail to convert source image into .vmdk")
+                self.__report("Fail to convert source image into .vmdk")
                 return False
 
+    def __report(self, message, logged=False):
+        """
+            Private method to show a step of the conversion: it is printed on the console, or logged if it is not
+            already
+        """
+        if self.console:
+            print(message)
+        elif not logged:
+            self.logger.info(message)
+
     def __make_image_bootable(self):
         """
             Private method to make source disk image bootable.
             Args  : None
             Return : True on success else False
         """
-        command = "printf '\x03' | dd conv=notrunc of=" + self.output_diskimage_path + "\t bs=1 seek=$((0x4))"
-        output, error, returncode = self.__execute_command(command)
-
-        if error and returncode:
-            error_msg = "ERROR:Error occurred while making source disk image bootable : {} \n "\
-                "return code : {} ".format(error, returncode)
+        try:
+            self.vmdk_header = vmdk.make_bootable(self.output_diskimage_path)
+        except (vmdk.VmdkError, OSError) as exp:
+            error_msg = "ERROR:Error occurred while making source disk image bootable : {}".format(exp)
             self.logger.error(error_msg)
-            print(error_msg)
+            self.__report(error_msg, logged=True)
             return False
-        else:
-            self.logger.info("Make Image Bootable Output : {} ".format(output))
-            return True
+        self.logger.info("Output VMDK header : {} ".format(self.vmdk_header))
+        return True
 
     def __edit_ovf_template(self):
         """
@@ -277,7 +420,7 @@ class OVFConverter(object):
             Return : True on success else False
         """
         try:
-            print("Creating OVF")
+            self.__report("Creating OVF")
             # Read OVF template file
             OVF_tree = ET.parse(self.ovf_template_path)
             root = OVF_tree.getroot()
@@ -297,11 +440,11 @@ class OVFConverter(object):
             if disksection is not None:
                 diak_tag = disksection.find('xmlns:Disk', nsmap)
                 if diak_tag is not None:
-                    if self.disk_size and self.disk_size > self.disk_capacity:
-                        self.disk_capacity = self.disk_size
-
-                    diak_tag.attrib['{' + nsmap['ovf'] + '}capacity'] = str(self.disk_capacity)
-                    diak_tag.attrib['{' + nsmap['ovf'] + '}populatedSize'] = str(self.disk_populated_size)
+                    # exact capacity of the generated disk, as the source one may be rounded
+                    disk_capacity = self.vmdk_header.capacity if self.vmdk_header else self.image_info.virtual_size
+                    disk_capacity = max(self.disk_size or 0, disk_capacity)
+                    diak_tag.attrib['{' + nsmap['ovf'] + '}capacity'] = str(disk_capacity)
+                    diak_tag.attrib['{' + nsmap['ovf'] + '}populatedSize'] = str(self.image_info.actual_size)
 
             virtuasystem = root.find('xmlns:VirtualSystem', nsmap)
             if virtuasystem is not None:
@@ -373,51 +516,18 @@ class OVFConverter(object):
                            method="xml")
 
             if os.path.isfile(self.output_path):
-                logger.info("Successfully written output OVF at {}".format(self.output_path))
-                print("Output OVF is at: {}".format(self.output_path))
+                self.logger.info("Successfully written output OVF at {}".format(self.output_path))
+                self.__report("Output OVF is at: {}".format(self.output_path))
                 return self.output_path
             else:
                 error_msg = "ERROR: Error occurred while creating OVF file"
-                print(error_msg)
+                self.__report(error_msg)
                 return False
 
         except Exception as exp:
             error_msg = "ERROR: Error occurred while editing OVF template : {}".format(exp)
             self.logger.error(error_msg)
-            print(error_msg)
-            return False
-
-    def __convert_size(self, size):
-        """
-            Private method to convert disk size from GB,MB to bytes.
-            Args :
-                size  : disk size with prefix 'G' for GB and 'M' for MB
-            Return :  disk size in bytes
-        """
-        byte_size = 0
-        try:
-            if not size:
-                self.logger.error("No size {} to convert in bytes".format(size))
-            else:
-                size = str(size)
-                disk_size = float(size[:-1])
-                input_type = size[-1].strip()
-
-                self.logger.info("Disk size : {} , size type : {} ".format(disk_size, input_type))
-
-                if input_type == "G":
-                    byte_size = disk_size * 1024 * 1024 * 1024
-                elif input_type == "M":
-                    byte_size = disk_size * 1024 * 1024
-
-                self.logger.info("Disk size in bytes: {} ".format(byte_size))
-
-            return int(byte_size)
-
-        except Exception as exp:
-            error_msg = "ERROR:Error occurred while converting disk size in bytes : {}".format(exp)
-            self.logger.error(error_msg)
-            print(error_msg)
+            self.__report(error_msg, logged=True)
             return False
 
     def __get_osType(self):
@@ -429,23 +539,13 @@ class OVFConverter(object):
                 osID : OS ID
                 osType: OS Type
         """
-        osID = None
-        osType = None
-        os_info = self.__read_yaml_file(OS_INFO_FILE_PATH)
-
         try:
-            if self.os_type and os_info:
-                for os_id, os_type in os_info.items():
-                    if self.os_type.lower() == os_type.lower():
-                        osID = os_id
-                        osType = os_type
-                        break
+            return find_os_type(self.os_type)
         except Exception as exp:
             error_msg = "ERROR:Error occurred while getting OS details : {}".format(exp)
             self.logger.error(error_msg)
-            print(error_msg)
-
-        return osID, osType
+            self.__report(error_msg, logged=True)
+            return None, None
 
     def __get_diskcontroller(self):
         """
@@ -461,48 +561,32 @@ class OVFConverter(object):
             scsi_subtype = self.disk_controller
             self.disk_controller = "SCSI"
 
-        disk_controller_info = self.__read_yaml_file(DISK_CONTROLLER_INFO_FILE_PATH)
         try:
-            if self.disk_controller and disk_controller_info:
-                for key, value in disk_controller_info.items():
-                    if self.disk_controller.lower() in key.lower():
-                        disk_controller['controllerName'] = key
-                        disk_controller['resourceType'] = str(value["ResourceType"])
-                        resourceSubTypes = value["ResourceSubTypes"] if "ResourceSubTypes" in value else None
-                        if key == "SATA Controller":
-                            disk_controller["resourceSubType"] = resourceSubTypes[0]
-                        elif key == "SCSI Controller":
-                            if scsi_subtype:
-                                if scsi_subtype.lower() == "paravirtual":
-                                    scsi_subtype = "VirtualSCSI"
-                                for subtype in resourceSubTypes:
-                                    if scsi_subtype.lower() == subtype.lower():
-                                        disk_controller["resourceSubType"] = subtype
-                                        break
-                                else:
-                                    error_msg = "ERROR: Invalid inputs can not "\
-                                        "find SCSI subtype {}".format(scsi_subtype)
-                                    self.__raise_exception(error_msg)
+            entry = _disk_controller_index().get(self.disk_controller.casefold())
+            if entry:
+                key, value, subtypes = entry
+                disk_controller['controllerName'] = key
+                disk_controller['resourceType'] = str(value["ResourceType"])
+                if key == "SATA Controller":
+                    disk_controller["resourceSubType"] = value["ResourceSubTypes"][0]
+                elif key == "SCSI Controller":
+                    if scsi_subtype:
+                        if scsi_subtype.lower() == "paravirtual":
+                            scsi_subtype = "VirtualSCSI"
+                        if scsi_subtype.casefold() in subtypes:
+                            disk_controller["resourceSubType"] = subtypes[scsi_subtype.casefold()]
+                        else:
+                            error_msg = "ERROR: Invalid inputs can not "\
+                                "find SCSI subtype {}".format(scsi_subtype)
+                            self.__raise_exception(error_msg)
 
         except KeyError as exp:
             error_msg = "ERROR:Error occurred while getting Disk Controller details : {}".format(exp)
             self.logger.error(error_msg)
-            print(error_msg)
+            self.__report(error_msg, logged=True)
 
         return disk_controller
 
-    def __read_yaml_file(self, file_path):
-        """
-            Private method to execute command
-            Args :
-                command  : command to execute
-            Return :
-                Dict of yaml data
-        """
-        with open(file_path) as data_file:
-            data = yaml.load(data_file, Loader=yaml.SafeLoader)
-        return data
-
     def __raise_exception(self, error_msg, exception_type="Generic"):
         """
             Private method to execute command
@@ -513,51 +597,75 @@ class OVFConverter(object):
         """
         if error_msg:
             self.logger.debug(error_msg)
-            print(error_msg)
+            self.__report(error_msg, logged=True)
             if exception_type == "Generic":
                 raise Exception(error_msg)
             elif exception_type == "IO":
                 raise Exception(error_msg)
 
-    def __execute_command(self, command, show_output=False):
+    def __execute_command(self, command, show_output=False, progress_callback=None):
         """
             Private method to execute command
+            stdout and stderr are read concurrently in chunks as they become ready, so
+            the command never blocks writing to a full pipe
             Args :
                 command  : command to execute
+                show_output : print command stdout as it is received
+                progress_callback : if given, it is called with a ConversionProgress for each
+                                    qemu-img progress line, instead of printing the output
             Return :
                 stdout : output of command
                 stderr: error occurred while executing command if any
                 returncode : return code of command execution
         """
+        stdout = []
+        stderr = []
+        returncode = None
         try:
             self.logger.info("Execute command: {} ".format(command))
-
-            proc = subprocess.Popen(command, stdout=subprocess.PIPE, stdin=subprocess.PIPE,
-                                    stderr=subprocess.PIPE, shell=True, bufsize=1)
-
-            stdout = b''
-            stderr = b''
-
-            while True:
-                output = proc.stdout.read(1)
-                stdout += output
-                if show_output:
-                    print(output.decode(), end='')
-                returncode = proc.poll()
-                if returncode is not None:
-                    for output in proc.stdout.readlines():
-                        stdout += output
-                        if show_output:
-                            print(output.decode(), end='')
-                    break
-
-            for output in proc.stderr.readlines():
-                stderr += output
+            start = time.time()
+
+            proc = subprocess.Popen(command, stdout=subprocess.PIPE, stdin=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE, shell=True)
+
+            with selectors.DefaultSelector() as selector:
+                selector.register(proc.stdout, selectors.EVENT_READ, stdout)
+                selector.register(proc.stderr, selectors.EVENT_READ, stderr)
+                # last incomplete progress line
+                pending_line = b''
+                last_percent = None
+                while selector.get_map():
+                    for key, _ in selector.select():
+                        data = os.read(key.fd, READ_CHUNK_SIZE)
+                        if not data:
+                            selector.unregister(key.fileobj)
+                            continue
+                        key.data.append(data)
+                        if key.data is not stdout:
+                            continue
+                        if progress_callback:
+                            lines = re.split(rb"[\r\n]", pending_line + data)
+                            pending_line = lines.pop()
+                            for line in lines:
+                                match = PROGRESS_RE.search(line)
+                                if not match or float(match.group(1)) == last_percent:
+                                    continue
+                                last_percent = float(match.group(1))
+                                elapsed = time.time() - start
+                                eta = elapsed * (100 - last_percent) / last_percent if last_percent else None
+                                progress_callback(ConversionProgress(self.source_img_path, last_percent,
+                                                                     elapsed, eta))
+                        elif show_output and self.console:
+                            print(data.decode(errors="replace"), end='', flush=True)
+
+            returncode = proc.wait()
 
         except Exception as exp:
             self.logger.error("Error {} occurred while executing command {} ".format(exp, command))
+            if returncode is None:
+                returncode = -1
 
-        return stdout, stderr, returncode
+        return b''.join(stdout), b''.join(stderr), returncode
 
     def create_ovf(self):
         """
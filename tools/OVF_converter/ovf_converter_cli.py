@@ -23,9 +23,154 @@
 ##
 
 import argparse
+import logging
+import os
+import threading
+import time
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 
-from converter import OVFConverter, get_version, OS_INFO_FILE_PATH
+from converter import OVFConverter, get_version, get_os_types, MODULE_DIR
+
+# default folder for the per image logs of batch mode
+BATCH_LOG_DIR = os.path.join(MODULE_DIR, "logs")
+# default number of conversions writing to the same disk at the same time
+DEFAULT_DISK_JOBS = 2
+# OVFConverter arguments that can be set per image at the manifest, and their CLI argument name
+MANIFEST_KEYS = {
+    "output_location": "output_location",
+    "ovf_name": "output_ovf_name",
+    "memory": "memory",
+    "cpu": "cpu",
+    "disk": "disk",
+    "osType": "os_type",
+    "disk_Controller": "disk_controller",
+    "cdrom": "cdrom",
+    "hwversion": "hwversion",
+}
+
+
+def read_manifest(manifest_file, defaults):
+    """
+        Method to read the images to convert from a manifest yaml file
+        Args :
+            manifest_file : yaml file with a list of images, or a dict with "images" list and
+                            optional "defaults". Each image is a path, or a dict with "path"
+                            and any of the CLI long option names, e.g. osType
+            defaults : OVFConverter arguments taken from CLI
+        Return : list of (path, OVFConverter arguments)
+    """
+    with open(manifest_file) as data_file:
+        manifest = yaml.load(data_file, Loader=yaml.SafeLoader) or []
+    if isinstance(manifest, dict):
+        defaults = dict(defaults, **{MANIFEST_KEYS[k]: v for k, v in (manifest.get("defaults") or {}).items()
+                                     if k in MANIFEST_KEYS})
+        manifest = manifest.get("images") or []
+    images = []
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    for entry in manifest:
+        if not isinstance(entry, dict):
+            entry = {"path": entry}
+        unknown = set(entry) - set(MANIFEST_KEYS) - {"path"}
+        if "path" not in entry or unknown:
+            raise ValueError("Invalid manifest entry {}: needs 'path' and only {}".format(
+                entry, ", ".join(MANIFEST_KEYS)))
+        kwargs = dict(defaults, **{MANIFEST_KEYS[k]: v for k, v in entry.items() if k in MANIFEST_KEYS})
+        images.append((os.path.join(base_dir, entry["path"]), kwargs))
+    return images
+
+
+def output_name(path, kwargs):
+    """ Name of the OVF and the VMDK of an image, as OVFConverter names them, and of its log in batch mode """
+    if kwargs.get("output_ovf_name"):
+        return kwargs["output_ovf_name"].split('.')[0]
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def convert_batch(images, jobs=None, disk_jobs=DEFAULT_DISK_JOBS, log_dir=BATCH_LOG_DIR):
+    """
+        Method to convert several images concurrently. At most jobs conversions run at the
+        same time, and at most disk_jobs of them write to the same output device
+        Args :
+            images : list of (path, OVFConverter arguments)
+            jobs : number of concurrent conversions. By default the number of cpus
+            disk_jobs : number of concurrent conversions per output device
+            log_dir : folder for the log of each image, named as the output ovf
+        Return : list of result dicts with path, ovf, error, seconds and size of the source image
+        Raises : ValueError if two images have the same output name, as they would overwrite the OVF, the VMDK
+                 and the log of each other
+    """
+    paths = {}
+    for path, kwargs in images:
+        name = output_name(path, kwargs)
+        if name in paths:
+            raise ValueError("Images {} and {} have the same output name {}, set a different ovf_name to one of "
+                             "them".format(paths[name], path, name))
+        paths[name] = path
+    os.makedirs(log_dir, exist_ok=True)
+    disk_locks = {}
+    disk_locks_lock = threading.Lock()
+
+    def convert(path, kwargs):
+        result = {"path": path, "ovf": None, "error": None, "seconds": 0.0, "size": 0}
+        name = output_name(path, kwargs)
+        logger = logging.getLogger("{}.{}".format(__name__, name))
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        handler = logging.FileHandler(os.path.join(log_dir, name + ".log"))
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.addHandler(handler)
+
+        def progress(status):
+            if int(status.percent) % 10 == 0:
+                logger.info("Conversion progress: {:.0f}%, elapsed {:.0f}s".format(status.percent, status.elapsed))
+
+        try:
+            output_location = kwargs.get("output_location") or "."
+            device = os.stat(output_location).st_dev if os.path.isdir(output_location) else None
+            with disk_locks_lock:
+                disk_lock = disk_locks.setdefault(device, threading.BoundedSemaphore(disk_jobs))
+            with disk_lock:
+                start = time.time()
+                result["size"] = os.path.getsize(path) if os.path.isfile(path) else 0
+                converter = OVFConverter(path, progress_callback=progress, logger=logger, console=False, **kwargs)
+                result["ovf"] = converter.create_ovf()
+                result["seconds"] = time.time() - start
+            if not result["ovf"]:
+                result["error"] = "conversion failed, see {}".format(handler.baseFilename)
+        except Exception as exp:
+            result["error"] = str(exp)
+            logger.error("Conversion failed: {}".format(exp))
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+        return result
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = [executor.submit(convert, path, kwargs) for path, kwargs in images]
+        return [future.result() for future in futures]
+
+
+def print_summary(results):
+    """
+        Method to print a table with the result of each conversion
+        Args :
+            results : list of result dicts returned by convert_batch
+        Return : number of failed conversions
+    """
+    width = max([len("Image")] + [len(os.path.basename(r["path"])) for r in results])
+    print("\n{:<{w}}  {:>6}  {:>10}  {:>9}  {:>8}  {}".format(
+        "Image", "Result", "Size(MB)", "Time(s)", "MB/s", "Output", w=width))
+    failed = 0
+    for r in results:
+        size_mb = r["size"] / (1024.0 * 1024)
+        throughput = size_mb / r["seconds"] if r["seconds"] else 0.0
+        if r["error"]:
+            failed += 1
+        print("{:<{w}}  {:>6}  {:>10.1f}  {:>9.1f}  {:>8.1f}  {}".format(
+            os.path.basename(r["path"]), "FAILED" if r["error"] else "OK", size_mb, r["seconds"], throughput,
+            r["error"] or r["ovf"], w=width))
+    return failed
 
 
 def execute_cli():
@@ -36,11 +181,8 @@ def execute_cli():
         Return : None
     """
 
-    with open(OS_INFO_FILE_PATH) as data_file:
-        os_info = yaml.load(data_file, Loader=yaml.SafeLoader)
-
     valid_os_strings = "Valid values for osType are:\n"
-    for os_name in os_info.values():
+    for os_name in get_os_types().values():
         valid_os_strings += os_name + ", "
 
     valid_os_strings = valid_os_strings[:-2]
@@ -50,8 +192,9 @@ def execute_cli():
     parser.add_argument("-v", "--version", action="version", version=str(get_version()),
                         help="shows version of OVF Converter tool")
 
-    parser.add_argument("path", action="store",
-                        help="absolute path to source image which will get converted into ovf")
+    parser.add_argument("path", action="store", nargs="*",
+                        help="absolute path to source image which will get converted into ovf. "
+                        "Several images are converted in batch mode")
 
     parser.add_argument("-o", "--output_location", action="store",
                         help="location where created OVF will be kept. This location "
@@ -87,10 +230,39 @@ def execute_cli():
     parser.add_argument("-hw", "--hwversion", action="store", default=14,
                         help="Virtual hardware version (default 14)")
 
-    args = parser.parse_args()
+    parser.add_argument("--manifest", action="store",
+                        help="yaml file with the list of images to convert in batch mode, each one with "
+                        "its path and optionally any of the long options above, e.g. osType (optional)")
+
+    parser.add_argument("-j", "--jobs", action="store", type=int,
+                        help="batch mode: number of concurrent conversions (default number of cpus)")
+
+    parser.add_argument("--disk_jobs", action="store", type=int, default=DEFAULT_DISK_JOBS,
+                        help="batch mode: number of concurrent conversions writing to the same disk "
+                        "(default {})".format(DEFAULT_DISK_JOBS))
+
+    parser.add_argument("--log_dir", action="store", default=BATCH_LOG_DIR,
+                        help="batch mode: folder for the log of each image (default {})".format(BATCH_LOG_DIR))
+
+    args = parser.parse_intermixed_args()
 
-    if args.path:
-        con = OVFConverter(args.path,
+    if args.manifest or len(args.path) > 1:
+        kwargs = {"output_location": args.output_location, "memory": args.memory, "cpu": args.cpu,
+                  "disk": args.disk, "os_type": args.osType, "disk_controller": args.disk_Controller,
+                  "cdrom": args.cdrom, "hwversion": args.hwversion}
+        if args.ovf_name:
+            parser.error("--ovf_name cannot be used with several images")
+        images = [(path, dict(kwargs)) for path in args.path]
+        try:
+            if args.manifest:
+                images += read_manifest(args.manifest, kwargs)
+            results = convert_batch(images, args.jobs, args.disk_jobs, args.log_dir)
+        except ValueError as exp:
+            parser.error(str(exp))
+        if print_summary(results):
+            exit(1)
+    elif args.path:
+        con = OVFConverter(args.path[0],
                            output_location=args.output_location,
                            output_ovf_name=args.ovf_name,
                            memory=args.memory,
@@ -103,6 +275,8 @@ def execute_cli():
                            )
 
         con.create_ovf()
+    else:
+        parser.error("a source image path or --manifest is required")
 
 
 if __name__ == "__main__":
@@ -20,7 +20,10 @@
 ##
 
 import argparse
-from uploader import OVFUploader, get_version
+import asyncio
+from transfer import JOBS
+from vcd_session import DEFAULT_LOG_LEVEL, LOG_LEVELS
+from uploader import OVFUploader, get_version, wait_for_uploads
 
 
 def execute_cli():
@@ -35,8 +38,9 @@ def execute_cli():
     parser.add_argument("-v", "--version", action="version", version=str(get_version()),
                         help="shows version of vCD Uploader tool")
 
-    parser.add_argument("ovf_file", action="store",
-                        help="filename of OVF file to upload to vCD")
+    parser.add_argument("ovf_file", action="store", nargs="+",
+                        help="filename of OVF file to upload to vCD. When several are given, they are uploaded one "
+                        "after the other and their imports are awaited together")
 
     parser.add_argument("-l", "--vcd_url", action="store",
                         required=True,
@@ -54,21 +58,47 @@ def execute_cli():
                         required=True,
                         help="Organization name for vCD login")
 
+    parser.add_argument("-j", "--jobs", action="store", type=int, default=JOBS,
+                        help="Number of ranges of the disk uploaded at the same time, default {}".format(JOBS))
+
+    parser.add_argument("--vcd_log", action="store", choices=sorted(LOG_LEVELS), default=DEFAULT_LOG_LEVEL,
+                        help="Logging of the requests sent to vCD, default {}. Bodies are never logged".format(
+                            DEFAULT_LOG_LEVEL))
+
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Skip the upload if the catalog item already has the same content")
+
     args = parser.parse_args()
 
-    if args.ovf_file:
+    uploaders = []
+    failed = 0
+    for ovf_file in args.ovf_file:
         try:
-            uploader = OVFUploader(args.ovf_file,
+            uploader = OVFUploader(ovf_file,
                                    vcd_url=args.vcd_url,
                                    username=args.username,
                                    password=args.password,
-                                   orgname=args.orgname)
+                                   orgname=args.orgname,
+                                   jobs=args.jobs,
+                                   log_level=args.vcd_log,
+                                   dedupe=args.dedupe)
             uploader.make_catalog()
             uploader.upload_ovf()
-            uploader.wait_for_task_completion()
+            if len(args.ovf_file) == 1:
+                uploader.wait_for_task_completion()
+            else:
+                uploaders.append(uploader)
         except Exception as exp:
             print(exp)
-            exit(1)
+            failed += 1
+
+    if uploaders:
+        for uploader, error in zip(uploaders, asyncio.run(wait_for_uploads(uploaders))):
+            print("{}: {}".format(uploader.ovf_file, error or "ready"))
+            if error:
+                failed += 1
+    if failed:
+        exit(1)
 
 
 if __name__ == "__main__":
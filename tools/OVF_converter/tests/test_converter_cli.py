@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# #
+# Copyright 2019 VMware Inc.
+# This file is part of ETSI OSM
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact:  osslegalrouting@vmware.com
+# #
+
+"""
+Tests of the batch mode of the OVF converter CLI
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from converter import OVFConverter
+from ovf_converter_cli import convert_batch
+
+
+class TestConvertBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.output = os.path.join(self.folder, "output")
+        self.log_dir = os.path.join(self.folder, "logs")
+        os.makedirs(self.output)
+        self.images = []
+        for subfolder in ("a", "b"):
+            os.makedirs(os.path.join(self.folder, subfolder))
+            path = os.path.join(self.folder, subfolder, "disk.qcow2")
+            open(path, "wb").close()
+            self.images.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_same_image_name_rejected(self):
+        images = [(path, {"output_location": self.output}) for path in self.images]
+
+        with self.assertRaisesRegex(ValueError, "same output name disk"):
+            convert_batch(images, log_dir=self.log_dir)
+
+        self.assertFalse(os.path.exists(self.log_dir))
+
+    def test_same_image_name_with_ovf_names(self):
+        images = [(path, {"output_location": self.output, "output_ovf_name": name})
+                  for path, name in zip(self.images, ("disk_a", "disk_b"))]
+
+        converters = [OVFConverter(path, **kwargs) for path, kwargs in images]
+
+        # each conversion writes its own VMDK, named as its OVF
+        self.assertEqual([converter.output_diskimage_path for converter in converters],
+                         [os.path.join(self.output, "disk_a.vmdk"), os.path.join(self.output, "disk_b.vmdk")])
+        self.assertEqual([converter.output_path for converter in converters],
+                         [os.path.join(self.output, "disk_a.ovf"), os.path.join(self.output, "disk_b.ovf")])
+
+    def test_same_ovf_name_rejected(self):
+        images = [(path, {"output_location": self.output, "output_ovf_name": "disk.ovf"}) for path in self.images]
+
+        with self.assertRaisesRegex(ValueError, "same output name disk"):
+            convert_batch(images, log_dir=self.log_dir)
+
+    def test_steps_logged_per_image(self):
+        images = [(path, {"output_location": self.output, "output_ovf_name": name})
+                  for path, name in zip(self.images, ("disk_a", "disk_b"))]
+        stdout = io.StringIO()
+
+        with contextlib.redirect_stdout(stdout):
+            results = convert_batch(images, jobs=2, log_dir=self.log_dir)
+
+        # the source images are empty, so the conversions fail
+        self.assertTrue(all(result["error"] for result in results))
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertEqual(sorted(os.listdir(self.log_dir)), ["disk_a.log", "disk_b.log"])
+        for name, path in (("disk_a", self.images[0]), ("disk_b", self.images[1])):
+            with open(os.path.join(self.log_dir, name + ".log")) as f:
+                log = f.read()
+            self.assertIn("Getting source image information", log)
+            self.assertIn(path, log)
+            self.assertNotIn(self.images[1] if name == "disk_a" else self.images[0], log)
+
+
+if __name__ == "__main__":
+    unittest.main()
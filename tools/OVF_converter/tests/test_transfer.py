@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+# #
+# Copyright 2019 VMware Inc.
+# This file is part of ETSI OSM
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact:  osslegalrouting@vmware.com
+# #
+
+"""
+Tests of the range uploads of transfer.py against a local HTTP server
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import transfer
+from transfer import ChunkedUploader, TransferError, UploadJournal
+
+CHUNK_SIZE = 1024
+
+
+class TransferServer(ThreadingHTTPServer):
+    """ Server that stores the ranges PUT to it, answering some of them with an error status """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), TransferHandler)
+        self.lock = threading.Lock()
+        # list of (Content-Range header, body) of every request
+        self.requests = []
+        # content received, by offset
+        self.ranges = {}
+        # status codes answered to the next requests of a range, by offset
+        self.errors = {}
+        # events the answer to a range waits for, by offset
+        self.holds = {}
+
+    def content(self):
+        return b"".join(self.ranges[offset] for offset in sorted(self.ranges))
+
+
+class TransferHandler(BaseHTTPRequestHandler):
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        content_range = self.headers.get("Content-Range")
+        offset = int(content_range.split()[1].split("-")[0]) if content_range else 0
+        hold = self.server.holds.get(offset)
+        if hold:
+            hold.wait(10)
+        with self.server.lock:
+            self.server.requests.append((content_range, body))
+            errors = self.server.errors.get(offset)
+            status = errors.pop(0) if errors else 200
+            if status == 200:
+                self.server.ranges[offset] = body
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@mock.patch.object(transfer, "RETRY_DELAY", 0)
+class TestChunkedUploader(unittest.TestCase):
+
+    def setUp(self):
+        self.server = TransferServer()
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.href = "http://127.0.0.1:{}/transfer/disk.vmdk".format(self.server.server_port)
+        self.folder = tempfile.mkdtemp()
+        self.journal_file = os.path.join(self.folder, "disk.upload.json")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.folder)
+
+    def make_file(self, size):
+        path = os.path.join(self.folder, "disk.vmdk")
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        return path
+
+    def upload(self, path, jobs=2):
+        uploader = ChunkedUploader(jobs=jobs, chunk_size=CHUNK_SIZE, retries=2)
+        try:
+            return uploader.upload(path, self.href, UploadJournal(self.journal_file))
+        finally:
+            uploader.close()
+
+    def test_upload(self):
+        path = self.make_file(3 * CHUNK_SIZE + 100)
+
+        stats = self.upload(path)
+
+        with open(path, "rb") as f:
+            self.assertEqual(self.server.content(), f.read())
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual((stats.bytes, stats.skipped), (3 * CHUNK_SIZE + 100, 0))
+        self.assertIn("bytes 3072-3171/3172", [request[0] for request in self.server.requests])
+
+    def test_retry(self):
+        path = self.make_file(2 * CHUNK_SIZE)
+        self.server.errors[CHUNK_SIZE] = [503, 500]
+
+        self.upload(path)
+
+        with open(path, "rb") as f:
+            self.assertEqual(self.server.content(), f.read())
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_retries_exhausted(self):
+        path = self.make_file(2 * CHUNK_SIZE)
+        self.server.errors[CHUNK_SIZE] = [503, 503, 503]
+
+        with self.assertRaises(TransferError):
+            self.upload(path)
+
+        self.assertEqual(self.server.ranges.keys(), {0})
+
+    def test_client_error_aborts(self):
+        path = self.make_file(4 * CHUNK_SIZE)
+        self.server.errors[CHUNK_SIZE] = [403]
+
+        with self.assertRaisesRegex(TransferError, "HTTP 403"):
+            self.upload(path, jobs=1)
+
+        # the range is not retried, and the ranges confirmed before the abort are kept in the journal
+        sent = [request[0] for request in self.server.requests]
+        self.assertEqual(sent.count("bytes 1024-2047/4096"), 1)
+        with open(self.journal_file) as f:
+            done = json.load(f)["files"]["disk.vmdk"]["done"]
+        self.assertIn(0, done)
+        self.assertNotIn(1, done)
+
+    def test_resume(self):
+        path = self.make_file(4 * CHUNK_SIZE)
+        self.server.errors[2 * CHUNK_SIZE] = [404]
+        with self.assertRaises(TransferError):
+            self.upload(path, jobs=1)
+        with open(self.journal_file) as f:
+            done = json.load(f)["files"]["disk.vmdk"]["done"]
+        del self.server.requests[:]
+
+        stats = self.upload(path)
+
+        with open(path, "rb") as f:
+            self.assertEqual(self.server.content(), f.read())
+        sent = {int(request[0].split()[1].split("-")[0]) // CHUNK_SIZE for request in self.server.requests}
+        self.assertIn(2, sent)
+        self.assertEqual(sent, {0, 1, 2, 3} - set(done))
+        self.assertEqual(len(self.server.requests), len(sent))
+        self.assertEqual(stats.skipped, len(done) * CHUNK_SIZE)
+
+    def read_journal(self):
+        try:
+            with open(self.journal_file) as f:
+                return f.read()
+        except OSError:
+            return "{}"
+
+    @mock.patch.object(transfer, "JOURNAL_SAVE_INTERVAL", 0)
+    def test_ranges_recorded_as_completed(self):
+        path = self.make_file(3 * CHUNK_SIZE)
+        self.server.holds[0] = threading.Event()
+        self.server.errors[0] = [404]
+        upload = threading.Thread(target=self.assertRaises, args=(TransferError, self.upload, path, 3))
+        upload.start()
+        try:
+            # the process dies while the first range is still being sent, after the later ones are confirmed
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                journal_at_kill = self.read_journal()
+                done = json.loads(journal_at_kill).get("files", {}).get("disk.vmdk", {}).get("done", [])
+                if sorted(done) == [1, 2]:
+                    break
+                time.sleep(0.01)
+        finally:
+            self.server.holds[0].set()
+            upload.join()
+        self.assertEqual(sorted(done), [1, 2])
+        with open(self.journal_file, "w") as f:
+            f.write(journal_at_kill)
+        del self.server.requests[:]
+
+        stats = self.upload(path)
+
+        self.assertEqual([request[0] for request in self.server.requests], ["bytes 0-1023/3072"])
+        self.assertEqual(stats.skipped, 2 * CHUNK_SIZE)
+        with open(path, "rb") as f:
+            self.assertEqual(self.server.content(), f.read())
+
+    def test_resume_changed_file(self):
+        path = self.make_file(2 * CHUNK_SIZE)
+        self.server.errors[CHUNK_SIZE] = [404]
+        with self.assertRaises(TransferError):
+            self.upload(path, jobs=1)
+        path = self.make_file(2 * CHUNK_SIZE)
+        os.utime(path, ns=(0, 0))
+        del self.server.requests[:]
+
+        stats = self.upload(path)
+
+        with open(path, "rb") as f:
+            self.assertEqual(self.server.content(), f.read())
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(stats.skipped, 0)
+
+    def test_empty_file(self):
+        path = self.make_file(0)
+
+        stats = self.upload(path)
+
+        self.assertEqual(self.server.requests, [(None, b"")])
+        self.assertEqual((stats.bytes, stats.skipped), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
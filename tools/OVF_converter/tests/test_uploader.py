@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# #
+# Copyright 2019 VMware Inc.
+# This file is part of ETSI OSM
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact:  osslegalrouting@vmware.com
+# #
+
+"""
+Tests of the wait for the import tasks of a batch of uploads, with fake vCD task resources
+"""
+
+import asyncio
+import itertools
+import threading
+import unittest
+from unittest import mock
+
+import uploader
+from uploader import OVFUploader, wait_for_uploads
+
+
+class FakeTask(object):
+    """ Task resource of vCD, with its status attribute and its Error element if it failed """
+
+    def __init__(self, status, error=None):
+        self.attrib = {"status": status}
+        if error:
+            self.Error = {"Message": error}
+
+    def get(self, key, default=None):
+        return self.attrib.get(key, default)
+
+
+class FakeClient(object):
+    """ pyvcloud client answering each task href with its next status, the last one forever """
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.threads = set()
+
+    def get_resource(self, href):
+        self.threads.add(threading.get_ident())
+        statuses = self.statuses[href]
+        return statuses.pop(0) if len(statuses) > 1 else statuses[0]
+
+
+def make_uploader(client, name):
+    upload = OVFUploader.__new__(OVFUploader)
+    upload.ovf_file = "/images/{}.ovf".format(name)
+    upload.client = client
+    upload.entity_href = "https://vcd/api/vAppTemplate/{}".format(name)
+    upload.task_href = "https://vcd/api/task/{}".format(name)
+    upload.task_progress = None
+    upload.checksum = None
+    return upload
+
+
+@mock.patch.object(uploader, "poll_intervals", lambda: itertools.repeat(0.01))
+class TestWaitForUploads(unittest.TestCase):
+
+    def test_mixed_results(self):
+        client = FakeClient({
+            "https://vcd/api/task/ready": [FakeTask("queued"), FakeTask("running"), FakeTask("success")],
+            "https://vcd/api/task/failed": [FakeTask("running"), FakeTask("error", "disk is corrupt")],
+            "https://vcd/api/task/stuck": [FakeTask("running")],
+        })
+        uploads = [make_uploader(client, name) for name in ("ready", "failed", "stuck")]
+
+        results = asyncio.run(wait_for_uploads(uploads, timeout=0.2))
+
+        self.assertIsNone(results[0])
+        self.assertRegex(str(results[1]), "failed to import OVF /images/failed.ovf:\nerror: disk is corrupt")
+        self.assertRegex(str(results[2]), "Timeout importing OVF /images/stuck.ovf after 0.2 seconds")
+
+    def test_each_upload_polled_until_done(self):
+        client = FakeClient({
+            "https://vcd/api/task/first": [FakeTask("running"), FakeTask("success")],
+            "https://vcd/api/task/second": [FakeTask("running"), FakeTask("running"), FakeTask("running"),
+                                            FakeTask("success")],
+        })
+        uploads = [make_uploader(client, name) for name in ("first", "second")]
+
+        results = asyncio.run(wait_for_uploads(uploads))
+
+        self.assertEqual(results, [None, None])
+        self.assertEqual(client.statuses["https://vcd/api/task/second"][0].get("status"), "success")
+
+    def test_clients_not_shared_between_threads(self):
+        client = FakeClient({
+            "https://vcd/api/task/first": [FakeTask("running"), FakeTask("success")],
+            "https://vcd/api/task/second": [FakeTask("success")],
+        })
+
+        asyncio.run(wait_for_uploads([make_uploader(client, name) for name in ("first", "second")]))
+
+        self.assertEqual(client.threads, {threading.get_ident()})
+
+
+if __name__ == "__main__":
+    unittest.main()
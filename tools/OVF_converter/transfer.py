@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+# #
+# Copyright 2019 VMware Inc.
+# This file is part of ETSI OSM
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact:  osslegalrouting@vmware.com
+# #
+
+"""
+Upload of files to an HTTP transfer URL, as the vCD transfer service ones, by byte ranges (PUT with Content-Range).
+The ranges are sent in parallel over a pool of keep-alive sessions, each one retried on its own, and the confirmed
+ones are kept in a journal file so that an interrupted upload continues where it stopped
+"""
+
+from collections import namedtuple
+from concurrent.futures import as_completed, CancelledError, ThreadPoolExecutor
+import json
+import logging
+import os
+import requests
+import threading
+import time
+
+CHUNK_SIZE = 8 * 1024 * 1024
+JOBS = 4
+RETRIES = 5
+# Seconds to wait before the first retry of a range, doubled on each retry
+RETRY_DELAY = 1
+# Minimum seconds between two writes of the journal while uploading
+JOURNAL_SAVE_INTERVAL = 1
+# Session headers of the vCD client that authenticate the transfer requests
+AUTH_HEADERS = ("x-vcloud-authorization", "authorization", "x-vmware-vcloud-access-token")
+
+UploadStats = namedtuple("UploadStats", ["bytes", "skipped", "seconds"])
+
+
+class TransferError(Exception):
+    pass
+
+
+def auth_headers(client):
+    """
+        Method to get the authentication headers of a logged in pyvcloud client, to be used in transfer requests
+        Args :
+            client : pyvcloud Client
+        Return : dict of headers
+    """
+    return {k: v for k, v in client._session.headers.items() if k.lower() in AUTH_HEADERS}
+
+
+def rate(stats):
+    """ MB/s of the bytes really sent of an UploadStats """
+    return (stats.bytes - stats.skipped) / 1e6 / stats.seconds if stats.seconds else 0.0
+
+
+class UploadJournal(object):
+    """
+    Ranges confirmed by the server for each file of an upload, stored as JSON so that a later run resumes the upload.
+    Content: {"entity": <href of the uploaded entity>, "files": {<name>: {"href", "size", "mtime_ns", "chunk_size",
+    "done": [chunk indexes]}}}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.last_save = 0
+        try:
+            with open(path) as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+        self.data.setdefault("files", {})
+
+    @property
+    def entity(self):
+        return self.data.get("entity")
+
+    @entity.setter
+    def entity(self, href):
+        self.data = {"entity": href, "files": {}}
+        self.save()
+
+    def done_chunks(self, name, href, path, chunk_size):
+        """
+            Method to get the chunks already uploaded of a file. They are discarded if the file, the target or the
+            chunk size have changed
+            Return : set of chunk indexes
+        """
+        stat = os.stat(path)
+        entry = self.data["files"].get(name)
+        if not entry or [entry.get("href"), entry.get("size"), entry.get("mtime_ns"), entry.get("chunk_size")] != \
+                [href, stat.st_size, stat.st_mtime_ns, chunk_size]:
+            entry = {"href": href, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "chunk_size": chunk_size,
+                     "done": []}
+            with self.lock:
+                self.data["files"][name] = entry
+        return set(entry["done"])
+
+    def add_chunk(self, name, index):
+        with self.lock:
+            self.data["files"][name]["done"].append(index)
+            if time.time() - self.last_save >= JOURNAL_SAVE_INTERVAL:
+                self._save()
+
+    def save(self):
+        with self.lock:
+            self._save()
+
+    def _save(self):
+        tmp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+        self.last_save = time.time()
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ChunkedUploader(object):
+    """
+    Uploads files by ranges over a pool of keep-alive HTTP sessions, one per worker thread
+    """
+
+    def __init__(self, headers=None, jobs=JOBS, chunk_size=CHUNK_SIZE, retries=RETRIES, verify=False,
+                 progress_callback=None, logger=None):
+        """
+            Args :
+                headers : dict of headers added to every request, as the authentication ones
+                jobs : number of ranges uploaded at the same time
+                chunk_size : size in bytes of each range
+                retries : number of times a failed range is sent again before giving up
+                verify : verify the server certificate
+                progress_callback : function called with the number of bytes of each range confirmed
+                logger : logger used, by default the one of this module
+        """
+        self.headers = dict(headers or {})
+        self.jobs = max(1, jobs)
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.verify = verify
+        self.progress_callback = progress_callback
+        self.logger = logger or logging.getLogger(__name__)
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(self.headers)
+            session.verify = self.verify
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+
+    def _put_chunk(self, fd, href, index, size):
+        offset = index * self.chunk_size
+        data = os.pread(fd, min(self.chunk_size, size - offset), offset)
+        headers = {"Content-Type": "application/octet-stream"}
+        if data:
+            headers["Content-Range"] = "bytes {}-{}/{}".format(offset, offset + len(data) - 1, size)
+        # an empty file is sent in a single request without range
+        content_range = headers.get("Content-Range", "bytes */0")
+        delay = RETRY_DELAY
+        for attempt in range(self.retries + 1):
+            try:
+                response = self._session().put(href, data=data, headers=headers)
+                if response.status_code < 300:
+                    return len(data)
+                error = "HTTP {} {}".format(response.status_code, response.reason)
+                # client errors other than timeouts and throttling will not be solved by retrying
+                if response.status_code < 500 and response.status_code not in (408, 429):
+                    break
+            except requests.exceptions.RequestException as exp:
+                error = exp
+                # the connection of this session may be broken, open a new one on the next attempt
+                self._local.session = None
+            if attempt < self.retries:
+                self.logger.debug("Retrying range {} of {} in {}s: {}".format(content_range, href, delay, error))
+                time.sleep(delay)
+                delay *= 2
+        raise TransferError("Failed to upload range {} to {}: {}".format(content_range, href, error))
+
+    def upload(self, path, href, journal=None, name=None):
+        """
+            Method to upload a file, skipping the ranges that the journal records as already uploaded
+            Args :
+                path : file to upload
+                href : URL where it is uploaded
+                journal : UploadJournal where confirmed ranges are recorded, or None
+                name : key of the file in the journal, by default its base name
+            Return : UploadStats
+            Raises : TransferError if some range cannot be uploaded
+        """
+        name = name or os.path.basename(path)
+        size = os.path.getsize(path)
+        chunks = range(max(1, (size + self.chunk_size - 1) // self.chunk_size))
+        done = journal.done_chunks(name, href, path, self.chunk_size) if journal else set()
+        pending = [index for index in chunks if index not in done]
+        skipped = sum(min(self.chunk_size, size - index * self.chunk_size) for index in done if index in chunks)
+        if skipped:
+            self.logger.info("Resuming upload of {}, {} of {} bytes already uploaded".format(name, skipped, size))
+            if self.progress_callback:
+                self.progress_callback(skipped)
+
+        start = time.time()
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.jobs, len(pending) or 1)) as executor:
+                futures = {executor.submit(self._put_chunk, fd, href, index, size): index for index in pending}
+                error = None
+                # each range is recorded as soon as it is confirmed, so that it is not sent again on resume if the
+                # process dies while earlier ranges are still being sent
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        sent = future.result()
+                    except CancelledError:
+                        continue
+                    except TransferError as exp:
+                        # keep the confirmed ranges of the other workers in the journal
+                        error = error or exp
+                        for other in futures:
+                            other.cancel()
+                        continue
+                    if journal:
+                        journal.add_chunk(name, index)
+                    if self.progress_callback:
+                        self.progress_callback(sent)
+                if error:
+                    raise error
+        finally:
+            os.close(fd)
+            if journal:
+                journal.save()
+        stats = UploadStats(size, skipped, time.time() - start)
+        self.logger.info("Uploaded {}: {} bytes in {:.1f}s, {:.2f} MB/s".format(
+            name, size - skipped, stats.seconds, rate(stats)))
+        return stats
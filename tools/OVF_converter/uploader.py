@@ -19,15 +19,19 @@
 # contact:  osslegalrouting@vmware.com
 # #
 
+import asyncio
+import hashlib
 import logging
 from lxml import etree
 import os
-from pyvcloud.vcd.client import BasicLoginCredentials, Client, QueryResultFormat, ResourceType, TaskStatus, ApiVersion
-from pyvcloud.vcd.exceptions import EntityNotFoundException, InternalServerException
+from pyvcloud.vcd.client import QueryResultFormat, ResourceType, TaskStatus, ApiVersion, E, EntityType, NSMAP
+from pyvcloud.vcd.exceptions import EntityNotFoundException, InternalServerException, UnauthorizedException
 from pyvcloud.vcd.org import Org
 import sys
-import tarfile
 import time
+from catalog_index import get_catalog_index
+from transfer import ChunkedUploader, UploadJournal, auth_headers, CHUNK_SIZE, JOBS
+from vcd_session import get_client, invalidate, DEFAULT_LOG_LEVEL
 
 MODULE_DIR = os.path.dirname(__file__)
 
@@ -46,6 +50,23 @@ logger.addHandler(stdout_handler)
 logger.setLevel(10)
 logging.captureWarnings(True)
 
+OVF_NAMESPACE = "http://schemas.dmtf.org/ovf/envelope/1"
+# Name given by vCD to the uploaded OVF, and seconds to wait for vCD to parse it and list the disk files
+DESCRIPTOR_NAME = "descriptor.ovf"
+DESCRIPTOR_TIMEOUT = 300
+# Task of the vAppTemplate that imports the uploaded files, and seconds to wait for it
+IMPORT_OPERATION = "vdcUploadOvfContents"
+TASK_TIMEOUT = 3600
+# Seconds between polls of the import task, doubled after each poll up to the maximum
+POLL_INTERVAL = 1
+POLL_MAX_INTERVAL = 30
+# Status of a vAppTemplate whose content is ready, and of one that failed to import
+TEMPLATE_RESOLVED = 8
+TEMPLATE_FAILED = -1
+# Metadata of the vAppTemplate with the checksum of its content, to skip uploading it again in dedupe mode
+CHECKSUM_METADATA_KEY = "ovf_content_sha256"
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
 __version__ = "1.0"
 __description__ = "Initial Release"
 
@@ -61,27 +82,95 @@ def report_progress(bytes_written, total_size):
     print("{}% complete  \r".format(percent_complete), end='')
 
 
+def content_checksum(paths):
+    """
+        Method to get the SHA-256 of the content of several files, in order
+        Args :
+            paths : list of files
+        Return : hex digest
+    """
+    sha256 = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b""):
+                sha256.update(block)
+    return sha256.hexdigest()
+
+
+def poll_intervals(start=POLL_INTERVAL, maximum=POLL_MAX_INTERVAL):
+    """ Generator of exponentially growing seconds to wait between polls """
+    interval = start
+    while True:
+        yield interval
+        interval = min(interval * 2, maximum)
+
+
+async def wait_for_uploads(uploaders, timeout=TASK_TIMEOUT):
+    """
+        Method to wait for the import tasks of several uploads at once. A single loop polls the task of each pending
+        upload in turn, in the event loop thread, so that no pyvcloud client is used from two threads, and then waits
+        with exponential backoff
+        Args :
+            uploaders : list of OVFUploader whose upload_ovf has finished
+            timeout : seconds to wait for all of them
+        Return : list with, for each uploader, None if its content is ready or the exception of its failure
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    intervals = poll_intervals()
+    errors = {}
+    pending = list(uploaders)
+    while pending:
+        running = []
+        for uploader in pending:
+            try:
+                if uploader.poll_task():
+                    logger.info("OVF {} upload and import complete, content is ready to use".format(uploader.ovf_file))
+                else:
+                    running.append(uploader)
+            except Exception as exp:
+                errors[uploader] = exp
+                logger.error(exp)
+        pending = running
+        if pending and loop.time() > deadline:
+            for uploader in pending:
+                errors[uploader] = Exception("Timeout importing OVF {} after {} seconds".format(
+                    uploader.ovf_file, timeout))
+                logger.error(errors[uploader])
+            break
+        if pending:
+            await asyncio.sleep(min(next(intervals), max(0, deadline - loop.time())))
+    return [errors.get(uploader) for uploader in uploaders]
+
+
 class OVFUploader(object):
     """ Class to convert input image into OVF format """
 
-    def __init__(self, ovf_file, vcd_url=None, username=None, password=None, orgname=None):
+    def __init__(self, ovf_file, vcd_url=None, username=None, password=None, orgname=None, jobs=JOBS,
+                 chunk_size=CHUNK_SIZE, log_level=DEFAULT_LOG_LEVEL, dedupe=False):
         self.ovf_file = os.path.abspath(ovf_file)
+        # Ranges already uploaded, kept if the upload is interrupted to resume it on the next run
+        self.journal_file = os.path.splitext(self.ovf_file)[0] + ".upload.json"
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        # catalog resource, known once make_catalog has found or created it
+        self.catalog = None
+        # vAppTemplate being uploaded and its import task, known once upload_ovf has started
+        self.entity_href = None
+        self.task_href = None
+        self.task_progress = None
+        # If set, the upload is skipped when the catalog item already has the same content
+        self.dedupe = dedupe
+        self.checksum = None
         self.vcd_url = vcd_url
         self.username = username
         self.password = password
         self.orgname = orgname
         try:
-            client = Client(self.vcd_url, verify_ssl_certs=False, api_version=ApiVersion.VERSION_32.value,
-                            log_requests=True,
-                            log_headers=True,
-                            log_bodies=True,
-                            log_file=LOG_FILE)
-            # sclient.set_highest_supported_version()
-            client.set_credentials(BasicLoginCredentials(self.username, self.orgname,
-                                                         self.password))
-            logger.info("Logged into {} using version {}".format(self.vcd_url, client.get_api_version()))
-            self.client = client
-            self.org = Org(self.client, resource=self.client.get_org())
+            self.client, org_resource = self.__connect(log_level)
+            logger.info("Logged into {} using version {}".format(self.vcd_url, self.client.get_api_version()))
+            self.org = Org(self.client, resource=org_resource)
+            self.catalogs = get_catalog_index(self.org)
 
         except Exception as exp:
             problem = Exception("Failed to connect to vCD at {}, org {}, username {}:\n{}".format(
@@ -94,7 +183,7 @@ class OVFUploader(object):
             OVF_tree = etree.parse(self.ovf_file)
             root = OVF_tree.getroot()
             nsmap = {k: v for k, v in root.nsmap.items() if k}
-            nsmap["xmlns"] = "http://schemas.dmtf.org/ovf/envelope/1"
+            nsmap["xmlns"] = OVF_NAMESPACE
 
             virtuasystem = root.find('xmlns:VirtualSystem', nsmap)
             name_tag = virtuasystem.find('xmlns:Name', nsmap)
@@ -102,11 +191,13 @@ class OVFUploader(object):
             info_tag = virtuasystem.find('xmlns:Info', nsmap)
             self.image_description = info_tag.text
 
+            # Files referenced by the OVF, by name. They are uploaded from the folder of the OVF
             references = root.find('xmlns:References', nsmap)
-            file = references.find('xmlns:File', nsmap)
-            self.vmdk_file = "{}/{}".format(
-                os.path.dirname(self.ovf_file),
-                file.attrib['{http://schemas.dmtf.org/ovf/envelope/1}href'])
+            self.files = {}
+            for file in references.findall('xmlns:File', nsmap):
+                href = file.attrib['{{{}}}href'.format(OVF_NAMESPACE)]
+                self.files[href] = os.path.join(os.path.dirname(self.ovf_file), href)
+            self.vmdk_file = next(iter(self.files.values()))
             logger.info("Loaded VM {}: {}".format(self.image_name, self.image_description))
 
         except Exception as exp:
@@ -115,19 +206,42 @@ class OVFUploader(object):
             logger.error(problem)
             raise problem
 
+    def __connect(self, log_level):
+        # The cached client may have a session that vCD has already closed, which the first request finds out
+        for attempt in range(2):
+            client = get_client(self.vcd_url, self.orgname, self.username, self.password,
+                                api_version=ApiVersion.VERSION_32.value, log_level=log_level, log_file=LOG_FILE)
+            try:
+                return client, client.get_org()
+            except UnauthorizedException:
+                if attempt:
+                    raise
+                logger.debug("Session of {} at {} rejected, logging in again".format(self.username, self.vcd_url))
+                invalidate(self.vcd_url, self.orgname, self.username, client)
+
     def make_catalog(self):
-        self.catalog_id = None
         try:
-            for catalog in self.org.list_catalogs():
-                if catalog['name'] == self.image_name:
-                    self.catalog_id = catalog['id']
-            if self.catalog_id is None:
-                logger.info("Creating a new catalog entry {} in vCD".format(self.image_name))
-                result = self.org.create_catalog(self.image_name, self.image_description)
-                if result is None:
-                    raise Exception("Failed to create new catalog entry")
-                self.catalog_id = result.attrib['id'].split(':')[-1]
-                self.org.reload()
+            for attempt in range(2):
+                self.catalog_id = self.catalogs.get_id(self.image_name)
+                if self.catalog_id is None:
+                    logger.info("Creating a new catalog entry {} in vCD".format(self.image_name))
+                    result = self.org.create_catalog(self.image_name, self.image_description)
+                    if result is None:
+                        raise Exception("Failed to create new catalog entry")
+                    self.catalog_id = result.attrib['id'].split(':')[-1]
+                    self.catalogs.add(self.image_name, self.catalog_id)
+                    self.org.reload()
+                try:
+                    self.catalog = self.org.get_catalog(self.image_name)
+                    break
+                except EntityNotFoundException:
+                    # the index may keep a catalog deleted since it was loaded
+                    if attempt:
+                        raise
+                    logger.debug("Catalog {}, id {} not found, reloading catalogs".format(
+                        self.image_name, self.catalog_id))
+                    self.catalogs.invalidate()
+                    self.org.reload()
 
             logger.debug("Using catalog {}, id {}".format(self.image_name, self.catalog_id))
 
@@ -137,93 +251,215 @@ class OVFUploader(object):
             raise problem
 
     def upload_ovf(self):
-
-        ova_tarfilename, _ = os.path.splitext(self.ovf_file)
-        ova_tarfilename += '.ova'
+        """
+            Method to upload the OVF and its disk files to the catalog. The files are sent by ranges in parallel,
+            straight from the folder of the OVF, without bundling them into an OVA first. If a previous upload of the
+            same OVF was interrupted, it is resumed from the ranges recorded in its journal. In dedupe mode, nothing
+            is uploaded if the catalog item already has the same content
+            Args : None
+            Return : vAppTemplate resource created
+        """
+        journal = UploadJournal(self.journal_file)
         try:
-            # Check if the content already exists:
-            resource_type = ResourceType.CATALOG_ITEM.value
-            q = self.client.get_typed_query(
-                resource_type,
-                query_result_format=QueryResultFormat.ID_RECORDS,
-                equality_filter=('catalogName', self.image_name))
-            for item in list(q.execute()):
-                if item.get('name') == self.image_name:
-                    logger.info("Removing old version from catalog")
-                    try:
-                        self.org.delete_catalog_item(self.image_name, self.image_name)
-                    except InternalServerException as exp:
-                        problem = Exception(
-                            "Cannot delete vAppTemplate {}. Please check in vCD if "
-                            "the content is still being imported into the catalog".format(
-                                self.image_name))
-                        raise problem
-
-            # Create a single OVA bundle
-            ova = tarfile.open(name=ova_tarfilename,
-                               mode='w')
-            ova.add(self.ovf_file, arcname=os.path.basename(self.ovf_file))
-            ova.add(self.vmdk_file, arcname=os.path.basename(self.vmdk_file))
-            ova.close()
-            logger.info("Uploading content to vCD")
-            self.org.upload_ovf(self.image_name,
-                                ova_tarfilename,
-                                item_name=self.image_name,
-                                description=self.image_description,
-                                callback=report_progress)
+            if self.dedupe:
+                self.checksum = content_checksum([self.ovf_file] + list(self.files.values()))
+            entity_href = self.__resumable_entity(journal)
+            if entity_href is None:
+                existing_href = self.__existing_entity()
+                if existing_href and self.checksum and self.__stored_checksum(existing_href) == self.checksum:
+                    logger.info("Catalog item {} has the same content, skipping upload".format(self.image_name))
+                    self.entity_href = existing_href
+                    self.task_href = None
+                    self.checksum = None
+                    return self.client.get_resource(existing_href)
+                if existing_href:
+                    self.__delete_existing()
+                entity_href = self.__create_entity()
+                journal.entity = entity_href
+            entity = self.client.get_resource(entity_href)
+            self.entity_href = entity_href
+            self.task_href = self.__import_task(entity)
+
+            # Total size, known before starting, for the progress
+            sizes = {name: os.path.getsize(path) for name, path in self.files.items()}
+            self.total_size = os.path.getsize(self.ovf_file) + sum(sizes.values())
+            self.bytes_uploaded = 0
+            start = time.time()
+            transfer = ChunkedUploader(headers=auth_headers(self.client), jobs=self.jobs,
+                                       chunk_size=self.chunk_size, progress_callback=self.__report_progress,
+                                       logger=logger)
+            try:
+                logger.info("Uploading content to vCD")
+                stats = [transfer.upload(self.ovf_file, entity.Files.File.Link.get('href'), journal,
+                                         DESCRIPTOR_NAME)]
+
+                # vCD lists the files referenced by the OVF once it has parsed it
+                deadline = time.time() + DESCRIPTOR_TIMEOUT
+                while len(entity.Files.File) < 1 + len(self.files):
+                    if time.time() > deadline:
+                        raise Exception("vCD did not accept the OVF descriptor after {} seconds".format(
+                            DESCRIPTOR_TIMEOUT))
+                    time.sleep(2)
+                    entity = self.client.get_resource(entity_href)
+
+                for source_file in entity.Files.File:
+                    name = source_file.get('name')
+                    if name == DESCRIPTOR_NAME:
+                        continue
+                    if name not in self.files:
+                        raise Exception("vCD requests file {} that is not referenced by the OVF".format(name))
+                    stats.append(transfer.upload(self.files[name], source_file.Link.get('href'), journal, name))
+            finally:
+                transfer.close()
+
+            elapsed = time.time() - start
+            sent = sum(s.bytes - s.skipped for s in stats)
+            logger.info("Uploaded {} bytes in {:.1f}s, {:.2f} MB/s".format(
+                sent, elapsed, sent / 1e6 / elapsed if elapsed else 0.0))
+            journal.remove()
+            return entity
+
         except Exception as exp:
             problem = Exception("Failed to upload OVF {}:\n{} ".format(self.ovf_file, exp))
             logger.error(problem)
             raise problem
-        finally:
-            if os.path.exists(ova_tarfilename):
-                os.remove(ova_tarfilename)
-
-    def wait_for_task_completion(self):
 
-        logger.info("Importing content to vCD")
+    def __resumable_entity(self, journal):
+        # vAppTemplate of an interrupted upload of this OVF, if it is still waiting for its files
+        if not journal.entity:
+            return None
         try:
-
-            query = self.client.get_typed_query(
-                query_type_name=ResourceType.TASK.value,
-                qfilter='ownerName==' + self.username + ';(status==queued,status==preRunning,status==running)',
-                query_result_format=QueryResultFormat.REFERENCES)
-
-            upload_task = None
-            tasks = list(query.execute())
-            for task in tasks:
-                if task.get('name') == 'VDC_UPLOAD_OVF_CONTENTS':
-                    upload_task = self.client.get_resource(task.get('href'))
-                    break
-
-            bad_statuses = [
-                TaskStatus.ABORTED,
-                TaskStatus.CANCELED,
-                TaskStatus.ERROR
-            ]
-
+            entity = self.client.get_resource(journal.entity)
         except Exception as exp:
-            problem = Exception("Failed to import OVF {}:\n{} ".format(self.ovf_file, exp))
-            logger.error(problem)
+            logger.debug("Cannot resume upload of {}: {}".format(journal.entity, exp))
+            return None
+        if entity.get('name') != self.image_name or not hasattr(entity, 'Files'):
+            return None
+        logger.info("Resuming interrupted upload of {}".format(self.image_name))
+        return journal.entity
+
+    def __existing_entity(self):
+        # href of the vAppTemplate of the catalog item already in the catalog, if any
+        q = self.client.get_typed_query(
+            ResourceType.CATALOG_ITEM.value,
+            query_result_format=QueryResultFormat.RECORDS,
+            equality_filter=('catalogName', self.image_name))
+        for item in list(q.execute()):
+            if item.get('name') == self.image_name:
+                return item.get('entity')
+        return None
+
+    def __delete_existing(self):
+        logger.info("Removing old version from catalog")
+        try:
+            self.org.delete_catalog_item(self.image_name, self.image_name)
+        except InternalServerException as exp:
+            problem = Exception(
+                "Cannot delete vAppTemplate {}. Please check in vCD if "
+                "the content is still being imported into the catalog".format(
+                    self.image_name))
             raise problem
 
-        while(True):
-            task_status = upload_task.get('status').lower()
-            if(hasattr(upload_task, 'Progress')):
-                print("{}% complete  \r".format(upload_task.Progress), end='')
-
-            for status in bad_statuses:
-                if task_status == status.value.lower():
-                    problem = Exception(
-                        "vCD failed to import OVF {}:\n{}: {} ".format(self.ovf_file,
-                                                                       task_status,
-                                                                       upload_task.Error.get('Message')))
-                    logger.error(problem)
-                    raise problem
-            if task_status == str(TaskStatus.SUCCESS.value).lower():
-                break
-
-            time.sleep(2)
-            upload_task = self.client.get_resource(upload_task.get('href'))
+    def __stored_checksum(self, entity_href):
+        try:
+            value = self.client.get_resource("{}/metadata/{}".format(entity_href, CHECKSUM_METADATA_KEY))
+            return value.TypedValue.Value.text
+        except Exception as exp:
+            logger.debug("No content checksum at {}: {}".format(entity_href, exp))
+            return None
+
+    def __store_checksum(self):
+        value = E.MetadataValue(E.TypedValue(E.Value(self.checksum),
+                                             {"{{{}}}type".format(NSMAP["xsi"]): "MetadataStringValue"}))
+        self.client.put_resource("{}/metadata/{}".format(self.entity_href, CHECKSUM_METADATA_KEY), value,
+                                 EntityType.METADATA_VALUE.value)
+        self.checksum = None
+
+    def __create_entity(self):
+        if self.catalog is None:
+            self.make_catalog()
+        params = E.UploadVAppTemplateParams(name=self.image_name)
+        params.append(E.Description(self.image_description or ""))
+        catalog_item = self.client.post_resource(self.catalog.get('href') + '/action/upload', params,
+                                                 EntityType.UPLOAD_VAPP_TEMPLATE_PARAMS.value)
+        return catalog_item.Entity.get('href')
+
+    def __report_progress(self, size):
+        self.bytes_uploaded += size
+        report_progress(self.bytes_uploaded, self.total_size)
+
+    @staticmethod
+    def __import_task(entity):
+        # href of the task importing the content of a vAppTemplate, None if it has no task
+        if not hasattr(entity, 'Tasks'):
+            return None
+        tasks = list(entity.Tasks.Task)
+        for task in tasks:
+            if task.get('operationName') == IMPORT_OPERATION:
+                return task.get('href')
+        return tasks[0].get('href') if tasks else None
+
+    def poll_task(self):
+        """
+            Method to check once the import task of the uploaded content
+            Args : None
+            Return : True if the content is ready, False if it is still being imported
+            Raises : Exception if the import failed
+        """
+        if self.entity_href is None:
+            raise Exception("OVF {} has not been uploaded".format(self.ovf_file))
+        if self.task_href is None:
+            # vCD may not have created the task yet, or it may have already finished and been removed
+            entity = self.client.get_resource(self.entity_href)
+            self.task_href = self.__import_task(entity)
+            if self.task_href is None:
+                status = int(entity.get('status', 0))
+                if status == TEMPLATE_FAILED:
+                    raise Exception("vCD failed to import OVF {}".format(self.ovf_file))
+                return self.__import_done(status == TEMPLATE_RESOLVED)
+
+        upload_task = self.client.get_resource(self.task_href)
+        task_status = upload_task.get('status').lower()
+        if hasattr(upload_task, 'Progress'):
+            self.task_progress = upload_task.Progress
+
+        for status in (TaskStatus.ABORTED, TaskStatus.CANCELED, TaskStatus.ERROR):
+            if task_status == status.value.lower():
+                error = upload_task.Error.get('Message') if hasattr(upload_task, 'Error') else ""
+                raise Exception("vCD failed to import OVF {}:\n{}: {} ".format(self.ovf_file, task_status, error))
+        return self.__import_done(task_status == str(TaskStatus.SUCCESS.value).lower())
+
+    def __import_done(self, done):
+        # the checksum of the content is recorded when vCD has imported it, as the vAppTemplate is busy until then
+        if done and self.checksum:
+            self.__store_checksum()
+        return done
+
+    def wait_for_task_completion(self, timeout=TASK_TIMEOUT):
+        """
+            Method to wait for vCD to import the uploaded content, polling its import task with exponential backoff
+            Args :
+                timeout : seconds to wait
+            Return : None
+            Raises : Exception if the import fails or does not finish in time
+        """
+        logger.info("Importing content to vCD")
+        deadline = time.time() + timeout
+        intervals = poll_intervals()
+        while True:
+            try:
+                if self.poll_task():
+                    break
+            except Exception as exp:
+                problem = Exception("Failed to import OVF {}:\n{} ".format(self.ovf_file, exp))
+                logger.error(problem)
+                raise problem
+            if self.task_progress is not None:
+                print("{}% complete  \r".format(self.task_progress), end='')
+            if time.time() > deadline:
+                problem = Exception("Timeout importing OVF {} after {} seconds".format(self.ovf_file, timeout))
+                logger.error(problem)
+                raise problem
+            time.sleep(min(next(intervals), max(0, deadline - time.time())))
 
         logger.info("OVF upload and import complete, content is ready to use")
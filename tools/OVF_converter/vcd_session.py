@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+# #
+# Copyright 2019 VMware Inc.
+# This file is part of ETSI OSM
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact:  osslegalrouting@vmware.com
+# #
+
+"""
+Cache of logged in pyvcloud clients, shared by the vCD uploader tools. A client is created and authenticated once per
+(url, org, user) and reused, instead of logging in again for every operation. A cached client is never logged out, as
+other callers may still be using it: when vCD rejects its session, the caller discards it with invalidate and gets a
+new one
+"""
+
+import logging
+import threading
+
+from pyvcloud.vcd.client import BasicLoginCredentials, Client
+import requests
+
+# Connections kept open by the HTTP session of each client
+POOL_SIZE = 8
+# Logging of the requests sent to vCD: options of pyvcloud Client for each level. Bodies are never logged, as they
+# include the content of uploaded files
+LOG_LEVELS = {
+    "none": {"log_requests": False, "log_headers": False},
+    "requests": {"log_requests": True, "log_headers": False},
+    "headers": {"log_requests": True, "log_headers": True},
+}
+DEFAULT_LOG_LEVEL = "requests"
+
+logger = logging.getLogger(__name__)
+
+
+class _Session(object):
+
+    def __init__(self, client, password):
+        self.client = client
+        self.password = password
+
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _login(client, username, orgname, password):
+    client.set_credentials(BasicLoginCredentials(username, orgname, password))
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    client._session.mount("https://", adapter)
+    client._session.mount("http://", adapter)
+
+
+def get_client(vcd_url, orgname, username, password, api_version=None, log_level=DEFAULT_LOG_LEVEL, log_file=None):
+    """
+        Method to get a logged in client for a vCD org and user, reusing the cached one. The caller must call
+        invalidate if vCD rejects the session of the client, as it expires after some time without use
+        Args :
+            vcd_url : URL of vCD
+            orgname : organization to log in
+            username : user name
+            password : password of the user
+            api_version : vCD API version of the client, if it has to be created. By default, the pyvcloud one
+            log_level : logging of the requests, one of LOG_LEVELS, if the client has to be created
+            log_file : file where requests are logged, if the client has to be created
+        Return : pyvcloud Client
+        Raises : Exception if the login fails
+    """
+    key = (vcd_url, orgname, username)
+    with _lock:
+        session = _sessions.get(key)
+        if session is not None and session.password == password:
+            return session.client
+
+        kwargs = {"verify_ssl_certs": False, "log_bodies": False}
+        kwargs.update(LOG_LEVELS[log_level])
+        if kwargs["log_requests"] and log_file:
+            kwargs["log_file"] = log_file
+        if api_version:
+            kwargs["api_version"] = api_version
+        client = Client(vcd_url, **kwargs)
+        _login(client, username, orgname, password)
+        _sessions[key] = _Session(client, password)
+        return client
+
+
+def invalidate(vcd_url, orgname, username, client=None):
+    """
+        Method to discard the cached client of a vCD org and user, as when vCD rejects its session. The next
+        get_client logs in again. The client is not logged out, as other callers may still hold it
+        Args :
+            vcd_url : URL of vCD
+            orgname : organization
+            username : user name
+            client : client whose session was rejected. If another client has already replaced it in the cache,
+                     that one is kept
+    """
+    with _lock:
+        session = _sessions.get((vcd_url, orgname, username))
+        if session is not None and (client is None or session.client is client):
+            logger.debug("Discarding session of {} at {}, org {}".format(username, vcd_url, orgname))
+            del _sessions[(vcd_url, orgname, username)]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+# #
+# Copyright 2016-2017 VMware Inc.
+# This file is part of ETSI OSM
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# For those usages not covered by the Apache License, Version 2.0 please
+# contact:  osslegalrouting@vmware.com
+# #
+
+"""
+Reading and patching of the header of streamOptimized VMDK disk images, as generated by
+qemu-img convert -O vmdk -o subformat=streamOptimized
+"""
+
+import os
+import re
+import struct
+from collections import namedtuple
+
+SECTOR_SIZE = 512
+VMDK_MAGIC = b"KDMV"
+# magic, version, flags, capacity, grainSize, descriptorOffset, descriptorSize, numGTEsPerGT,
+# rgdOffset, gdOffset, overHead, uncleanShutdown, 4 end of line chars, compressAlgorithm
+HEADER_FORMAT = "<4sIIQQQQIQQQB4sH"
+HEADER_SIZE = SECTOR_SIZE
+# position of the version field, and version that vSphere and vCD require to boot streamOptimized disks
+VERSION_OFFSET = 4
+BOOTABLE_VERSION = 3
+# flag of streamOptimized disks: grains are compressed
+FLAG_COMPRESSED = 1 << 16
+CREATE_TYPE_RE = re.compile(rb'createType\s*=\s*"([^"]*)"')
+
+# Fields of the VMDK header. Sizes in bytes
+VmdkHeader = namedtuple("VmdkHeader", ["version", "flags", "capacity", "grain_size", "compress_algorithm",
+                                       "create_type"])
+
+
+class VmdkError(Exception):
+    pass
+
+
+def read_header(fd):
+    """
+        Method to parse the header and the embedded descriptor of a VMDK file
+        Args :
+            fd : file descriptor of the VMDK, open for reading
+        Return : VmdkHeader
+        Raises : VmdkError if it is not a streamOptimized VMDK
+    """
+    data = os.pread(fd, HEADER_SIZE, 0)
+    if len(data) < struct.calcsize(HEADER_FORMAT) or data[:4] != VMDK_MAGIC:
+        raise VmdkError("not a sparse VMDK file, wrong magic number")
+    (_, version, flags, capacity, grain_size, descriptor_offset, descriptor_size, _, _, _, _, _, _,
+     compress_algorithm) = struct.unpack_from(HEADER_FORMAT, data)
+    create_type = None
+    if descriptor_offset and descriptor_size:
+        descriptor = os.pread(fd, descriptor_size * SECTOR_SIZE, descriptor_offset * SECTOR_SIZE)
+        match = CREATE_TYPE_RE.search(descriptor)
+        if match:
+            create_type = match.group(1).decode(errors="replace")
+    if create_type != "streamOptimized" or not flags & FLAG_COMPRESSED:
+        raise VmdkError("not a streamOptimized VMDK file, createType is {}".format(create_type))
+    return VmdkHeader(version, flags, capacity * SECTOR_SIZE, grain_size * SECTOR_SIZE, compress_algorithm,
+                      create_type)
+
+
+def make_bootable(vmdk_path):
+    """
+        Method to set the version of a streamOptimized VMDK header to the one required to
+        boot it, with a single positioned write
+        Args :
+            vmdk_path : VMDK file
+        Return : VmdkHeader, after the change
+        Raises : VmdkError if it is not a streamOptimized VMDK, OSError if it cannot be written
+    """
+    fd = os.open(vmdk_path, os.O_RDWR)
+    try:
+        header = read_header(fd)
+        if header.version != BOOTABLE_VERSION:
+            os.pwrite(fd, bytes([BOOTABLE_VERSION]), VERSION_OFFSET)
+            header = header._replace(version=BOOTABLE_VERSION)
+        return header
+    finally:
+        os.close(fd)
@@ -24,7 +24,6 @@
 import logging
 import os
 from progressbar import Percentage, Bar, ETA, FileTransferSpeed, ProgressBar
-from pyvcloud.vcd.client import BasicLoginCredentials, Client
 from pyvcloud.vcd.org import Org
 import re
 import requests
@@ -32,6 +31,11 @@ import sys
 import time
 from xml.etree import ElementTree as XmlElementTree
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "OVF_converter"))
+from transfer import ChunkedUploader, TransferError  # noqa: E402
+from catalog_index import get_catalog_index  # noqa: E402
+from vcd_session import get_client  # noqa: E402
+
 API_VERSION = '5.6'
 
 
@@ -46,7 +50,8 @@ class vCloudconfig(object):
         self.logger.setLevel(10)
 
     def connect(self):
-        """ Method connect as normal user to vCloud director.
+        """ Method connect as normal user to vCloud director. The logged in client is cached and shared with the
+            other calls and tools using the same vCloud director, org and user.
 
             Returns:
                 The return vca object that letter can be used to connect to vCloud director as admin for VDC
@@ -55,8 +60,7 @@ class vCloudconfig(object):
         try:
             self.logger.debug("Logging in to a vcd {} as user {}".format(self.org,
                                                                          self.user))
-            client = Client(self.url, verify_ssl_certs=False)
-            client.set_credentials(BasicLoginCredentials(self.user, self.org, self.password))
+            client = get_client(self.url, self.org, self.user, self.password)
         except Exception:
             raise Exception("Can't connect to a vCloud director org: "
                             "{} as user: {}".format(self.org, self.user))
@@ -97,40 +101,31 @@ class vCloudconfig(object):
             if not client:
                 raise Exception("Failed to connect vCD")
             org = Org(client, resource=client.get_org())
-            catalogs = org.list_catalogs()
+            catalogs = get_catalog_index(org)
+            catalog_id = catalogs.get_id(catalog_name)
         except Exception as exp:
             self.logger.debug("Failed get catalogs() with Exception {} ".format(exp))
             raise Exception("Failed get catalogs() with Exception {} ".format(exp))
 
-        if len(catalogs) == 0:
-            self.logger.info("Creating a new catalog entry {} in vcloud director".format(catalog_name))
-            result = org.create_catalog(catalog_name, catalog_name)
-            if result is None:
-                raise Exception("Failed to create new catalog {} ".format(catalog_name))
-            result = self.upload_ovf(org=org, catalog_name=catalog_name, image_name=filename.split(".")[0],
-                                     media_file_name=path, description='medial_file_name', progress=progress)
-            if not result:
-                raise Exception("Failed to create vApp template for catalog {} ".format(catalog_name))
-            return self.get_catalogid(catalog_name, catalogs)
-        else:
-            for catalog in catalogs:
-                # search for existing catalog if we find same name we return ID
-                if catalog['name'] == catalog_name:
-                    self.logger.debug("Found existing catalog entry for {} "
-                                      "catalog id {}".format(catalog_name,
-                                                             self.get_catalogid(catalog_name, catalogs)))
-                    return self.get_catalogid(catalog_name, catalogs)
+        if catalog_id is not None:
+            # search for existing catalog if we find same name we return ID
+            self.logger.debug("Found existing catalog entry for {} "
+                              "catalog id {}".format(catalog_name, catalog_id))
+            return catalog_id
 
         # if we didn't find existing catalog we create a new one and upload image.
-        self.logger.debug("Creating new catalog entry {} - {}".format(catalog_name, catalog_name))
+        self.logger.info("Creating a new catalog entry {} in vcloud director".format(catalog_name))
         result = org.create_catalog(catalog_name, catalog_name)
         if result is None:
             raise Exception("Failed to create new catalog {} ".format(catalog_name))
+        catalog_id = result.attrib['id'].split(':')[-1]
+        catalogs.add(catalog_name, catalog_id)
 
         result = self.upload_ovf(org=org, catalog_name=catalog_name, image_name=filename.split(".")[0],
                                  media_file_name=path, description='medial_file_name', progress=progress)
         if not result:
             raise Exception("Failed create vApp template for catalog {} ".format(catalog_name))
+        return catalog_id
 
     def get_catalogid(self, catalog_name=None, catalogs=None):
         """  Method check catalog and return catalog ID in UUID format.
@@ -149,7 +144,7 @@ class vCloudconfig(object):
         return None
 
     def upload_ovf(self, org=None, catalog_name=None, image_name=None, media_file_name=None,
-                   description='', progress=False, chunk_bytes=128 * 1024):
+                   description='', progress=False, chunk_bytes=8 * 1024 * 1024):
         """
         Uploads a OVF file to a vCloud catalog
 
@@ -170,10 +165,9 @@ class vCloudconfig(object):
         #  status change.
         #  if VCD can parse OVF we upload VMDK file
         try:
-            for catalog in org.list_catalogs():
-                if catalog_name != catalog['name']:
-                    continue
-                catalog_href = "{}/api/catalog/{}/action/upload".format(self.url, catalog['id'])
+            catalog_id = get_catalog_index(org).get_id(catalog_name)
+            if catalog_id is not None:
+                catalog_href = "{}/api/catalog/{}/action/upload".format(self.url, catalog_id)
                 data = """
                 <UploadVAppTemplateParams name="{}" xmlns="http://www.vmware.com/vcloud/v1.5"
                 xmlns:ovf="http://schemas.dmtf.org/ovf/envelope/1">
@@ -240,7 +234,7 @@ class vCloudconfig(object):
                             link_href = result.group(1)
                         # we skip ovf since it already uploaded.
                         if 'ovf' in link_href:
-                            continue
+                            return False
                         # The OVF file and VMDK must be in a same directory
                         head, _ = os.path.split(media_file_name)
                         file_vmdk = head + '/' + link_href.split("/")[-1]
@@ -255,30 +249,23 @@ class vCloudconfig(object):
                                        FileTransferSpeed()]
                             progress_bar = ProgressBar(widgets=widgets, maxval=statinfo.st_size).start()
 
-                        bytes_transferred = 0
-                        f = open(file_vmdk, 'rb')
-                        while bytes_transferred < statinfo.st_size:
-                            my_bytes = f.read(chunk_bytes)
-                            if len(my_bytes) <= chunk_bytes:
-                                headers['Content-Range'] = 'bytes %s-%s/%s' % (
-                                    bytes_transferred, len(my_bytes) - 1, statinfo.st_size)
-                                headers['Content-Length'] = str(len(my_bytes))
-                                response = requests.put(url=hrefvmdk,
-                                                        headers=headers,
-                                                        data=my_bytes,
-                                                        verify=False)
-                                if response.status_code == requests.codes.ok:
-                                    bytes_transferred += len(my_bytes)
-                                    if progress:
-                                        progress_bar.update(bytes_transferred)
-                                else:
-                                    self.logger.debug(
-                                        'file upload failed with error: [%s] %s' % (response.status_code,
-                                                                                    response.content))
-
-                                    f.close()
-                                    return False
-                        f.close()
+                        uploaded = [0]
+
+                        def update_progress(size):
+                            uploaded[0] += size
+                            progress_bar.update(uploaded[0])
+
+                        transfer = ChunkedUploader(
+                            headers={'x-vcloud-authorization': headers['x-vcloud-authorization']},
+                            chunk_size=chunk_bytes, progress_callback=update_progress if progress else None,
+                            logger=self.logger)
+                        try:
+                            transfer.upload(file_vmdk, hrefvmdk)
+                        except TransferError as exp:
+                            self.logger.debug('file upload failed with error: {}'.format(exp))
+                            return False
+                        finally:
+                            transfer.close()
                         if progress:
                             progress_bar.finish()
                             time.sleep(60)